@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks dos caminhos críticos do dashboard."""
@@ -0,0 +1,384 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark dos caminhos críticos do dashboard (carga, filtros e agregações).
+
+Executa, sem o Streamlit, as mesmas etapas que as páginas executam a cada
+rerun: leitura e limpeza do CSV, cache colunar, índices e cubo, filtros da
+barra lateral, funções de dados de cada página e construção do mapa. As
+funções das páginas são carregadas diretamente dos arquivos em pages/.
+
+Os datasets maiores são o zomato.csv replicado N vezes (com restaurant_id
+deslocado a cada réplica) ou, com --synthetic, gerados com N vezes o
+tamanho da amostra por benchmarks.synthetic. Para cada etapa são medidos o tempo de parede
+(melhor de --repeat execuções) e o pico de memória alocada (tracemalloc,
+em uma execução à parte).
+
+Com --search, a busca da página principal também é medida sobre um CSV
+sintético de 1 milhão de linhas (ou N linhas, com --search N), para termos
+comuns e com erro de digitação, contra a meta de SEARCH_TARGET_MS por busca.
+
+Uso:
+    python -m benchmarks.bench_dashboard [--scale 1 10 100 1000] [--synthetic] [--search [N]] [--json resultados.json]
+"""
+
+# Importação de bibliotecas
+import argparse
+import ast
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import synthetic
+from utils import storage
+from utils.analytics import answer_questions
+from utils.cube import build_cube, filter_cube, rollup
+from utils.cuisines import CuisineIndex
+from utils.filters import FilterIndex
+from utils.leaderboard import build_leaderboards
+from utils.maps import marker_layer, render_map_html, viewport_markers
+from utils.pipeline import DATA_PATH, clean_data
+from utils.search import SearchIndex
+from utils.spatial import SpatialIndex, city_centers
+from utils.sql import SQLDatabase
+
+# Raiz do projeto e páginas do dashboard
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = {
+    'principal': os.path.join(ROOT, 'pages', '1_Principal_Page.py'),
+    'country': os.path.join(ROOT, 'pages', '2_Country_Views.py'),
+    'city': os.path.join(ROOT, 'pages', '3_City_Views.py'),
+    'cuisines': os.path.join(ROOT, 'pages', '4_Cuisines_Views.py'),
+    'nearby': os.path.join(ROOT, 'pages', '5_Nearby_Views.py'),
+}
+
+# Área visível de um mapa aproximado sobre Nova Délhi (formato do Leaflet)
+VIEWPORT_BOUNDS = {'_southWest': {'lat': 28.4, 'lng': 76.9}, '_northEast': {'lat': 28.8, 'lng': 77.4}}
+
+# Culinárias pré-selecionadas na página de culinárias
+DEFAULT_CUISINES = ['Home-made', 'BBQ', 'Japanese', 'Brazilian', 'Arabian', 'American', 'Italian']
+
+# Buscas medidas com --search (termos curtos e comuns, prefixo e erro de digitação) e a meta por busca
+SEARCH_QUERIES = ['bar', 'the', 'cafe', 'piz', 'conaught plase']
+SEARCH_TARGET_MS = 50
+
+
+# Funções
+def load_page_functions(path):
+    """
+    Carrega as funções de uma página sem executar o código do Streamlit.
+
+    Apenas os imports e as definições de função do arquivo são executados.
+
+    Parâmetros:
+        path (str): Caminho do arquivo da página.
+
+    Retorna:
+        dict: Namespace com as funções da página.
+    """
+    with open(path, encoding='utf-8') as file:
+        tree = ast.parse(file.read(), filename=path)
+
+    body = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom, ast.FunctionDef))]
+    namespace = {'__file__': path, '__name__': 'benchmark_page'}
+    exec(compile(ast.Module(body=body, type_ignores=[]), path, 'exec'), namespace)
+    return namespace
+
+
+def use_leaderboards(pages, leaderboards):
+    """
+    Faz as funções das páginas usarem os rankings do dataset do benchmark.
+
+    Parâmetros:
+        pages (dict): Funções de cada página (ver load_page_functions).
+        leaderboards (dict): Rankings construídos por build_leaderboards.
+
+    Retorna:
+        dict: Os próprios rankings.
+    """
+    for namespace in pages.values():
+        if 'load_leaderboards' in namespace:
+            namespace['load_leaderboards'] = lambda path=None: leaderboards
+    return leaderboards
+
+
+def use_cuisine_index(pages, cuisine_index, df):
+    """
+    Faz as funções das páginas usarem o dataset do benchmark e a sua associação de culinárias.
+
+    Parâmetros:
+        pages (dict): Funções de cada página (ver load_page_functions).
+        cuisine_index (CuisineIndex): Associação restaurante x culinária.
+        df (pd.DataFrame): O DataFrame tratado do benchmark.
+
+    Retorna:
+        CuisineIndex: A própria associação.
+    """
+    for namespace in pages.values():
+        if 'load_cuisine_index' in namespace:
+            namespace['load_cuisine_index'] = lambda path=None: cuisine_index
+        if 'load_data' in namespace:
+            namespace['load_data'] = lambda path=None: df
+    return cuisine_index
+
+
+def write_scaled_csv(source, scale, directory, generated=False):
+    """
+    Grava o CSV de origem replicado scale vezes, com restaurant_id distintos por réplica.
+
+    Parâmetros:
+        source (str): CSV de origem.
+        scale (int): Fator de replicação.
+        directory (str): Diretório de saída.
+        generated (bool): Gera linhas sintéticas (benchmarks.synthetic) em vez de replicar.
+
+    Retorna:
+        str: Caminho do CSV gerado.
+    """
+    if scale == 1:
+        return source
+
+    if generated:
+        path = os.path.join(directory, f'synthetic_x{scale}.csv')
+        synthetic.write_csv(path, scale * len(pd.read_csv(source)), sample_path=source)
+        return path
+
+    raw = pd.read_csv(source)
+    offset = int(raw['Restaurant ID'].max()) + 1
+    path = os.path.join(directory, f'zomato_x{scale}.csv')
+
+    # Grava réplica a réplica para não materializar o dataset inteiro
+    for replica in range(scale):
+        raw.assign(**{'Restaurant ID': raw['Restaurant ID'] + replica * offset}).to_csv(
+            path, mode='w' if replica == 0 else 'a', header=replica == 0, index=False
+        )
+    return path
+
+
+def measure(func, repeat):
+    """
+    Mede o tempo (melhor de repeat execuções) e o pico de memória de func.
+
+    Parâmetros:
+        func (callable): Etapa a medir, sem argumentos.
+        repeat (int): Quantidade de execuções cronometradas.
+
+    Retorna:
+        tuple: (resultado, segundos, pico de memória em MB).
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, min(times), peak / 2**20
+
+
+def dashboard_stages(csv_path, cache_path, pages):
+    """
+    Lista as etapas do dashboard, na ordem em que dependem umas das outras.
+
+    Cada etapa é (nome, função); as funções recebem o dicionário de resultados
+    das etapas anteriores.
+
+    Parâmetros:
+        csv_path (str): CSV do dataset.
+        cache_path (str): Arquivo colunar temporário.
+        pages (dict): Funções de cada página (ver load_page_functions).
+
+    Retorna:
+        list: Etapas a executar.
+    """
+    principal, country, city, cuisines, nearby = (
+        pages[name] for name in ('principal', 'country', 'city', 'cuisines', 'nearby')
+    )
+
+    def half(values):
+        # Metade dos valores distintos, para um filtro parcial
+        values = list(values)
+        return values[:max(len(values) // 2, 1)]
+
+    return [
+        # Carga
+        ('load.read_csv', lambda r: pd.read_csv(csv_path)),
+        ('load.clean_data', lambda r: clean_data(r['load.read_csv'])),
+        ('load.write_cache', lambda r: storage.write_cache(r['load.clean_data'], csv_path, cache_path)),
+        ('load.read_cache', lambda r: storage.read_cache(cache_path)),
+        ('load.read_cache_shared', lambda r: storage.read_cache(cache_path, shared=True)),
+        ('load.filter_index', lambda r: FilterIndex(r['load.clean_data'])),
+        ('load.metrics_cube', lambda r: build_cube(r['load.clean_data'])),
+        ('load.leaderboards', lambda r: use_leaderboards(pages, build_leaderboards(r['load.clean_data'], r['load.metrics_cube']))),
+        ('load.cuisine_index', lambda r: use_cuisine_index(pages, CuisineIndex(r['load.clean_data']), r['load.clean_data'])),
+        ('load.spatial_index', lambda r: SpatialIndex(r['load.clean_data'])),
+        ('load.city_centers', lambda r: city_centers(r['load.clean_data'])),
+        ('load.search_index', lambda r: SearchIndex(r['load.clean_data'])),
+        ('load.sql_database', lambda r: SQLDatabase(r['load.clean_data'])),
+
+        # Filtros da barra lateral
+        ('filter.isin_countries_all', lambda r: (lambda df: df[df['country_name'].isin(df['country_name'].unique())])(r['load.clean_data'])),
+        ('filter.index_countries_all', lambda r: r['load.filter_index'].filter(r['load.clean_data'], country_name=r['load.clean_data']['country_name'].unique())),
+        ('filter.isin_cities_half', lambda r: (lambda df: df[df['city'].isin(half(df['city'].unique()))])(r['load.clean_data'])),
+        ('filter.index_cities_half', lambda r: r['load.filter_index'].filter(r['load.clean_data'], city=half(r['load.clean_data']['city'].unique()))),
+        ('filter.index_cuisines_default', lambda r: r['load.filter_index'].filter(r['load.clean_data'], cuisines=DEFAULT_CUISINES)),
+        ('filter.cube_cuisines_default', lambda r: filter_cube(r['load.metrics_cube'], cuisines=DEFAULT_CUISINES)),
+        ('filter.all_cuisines_default', lambda r: r['load.cuisine_index'].filter(r['load.clean_data'], DEFAULT_CUISINES)),
+
+        # Página principal
+        ('principal.metrics', lambda r: [principal['unicos'](r['load.clean_data'], coluna) for coluna in ('restaurant_id', 'country_code', 'city', 'cuisines')] + [r['load.clean_data']['votes'].sum()]),
+        ('principal.map_grid', lambda r: render_map_html(r['load.clean_data'], 'grid')),
+        ('principal.map_fast', lambda r: render_map_html(r['load.clean_data'], 'fast')),
+        ('principal.viewport_world', lambda r: marker_layer(viewport_markers(r['load.clean_data'], r['load.spatial_index'], np.arange(len(r['load.clean_data'])))[0])),
+        ('principal.search_prefix', lambda r: principal['search_restaurants'](r['load.clean_data'], r['load.search_index'], 'piz', np.arange(len(r['load.clean_data'])))),
+        ('principal.search_typo', lambda r: principal['search_restaurants'](r['load.clean_data'], r['load.search_index'], 'conaught plase', np.arange(len(r['load.clean_data'])))),
+        ('principal.search_common', lambda r: principal['search_restaurants'](r['load.clean_data'], r['load.search_index'], 'bar', np.arange(len(r['load.clean_data'])))),
+        ('principal.viewport_city', lambda r: marker_layer(viewport_markers(r['load.clean_data'], r['load.spatial_index'], np.arange(len(r['load.clean_data'])), VIEWPORT_BOUNDS, 11)[0])),
+
+        # Página de países
+        ('country.summary', lambda r: country['country_summary'](r['load.metrics_cube'])),
+        ('country.restaurants_graph', lambda r: country['restaurant_statistics_graphs'](r['country.summary'], graph_type='restaurants')),
+        ('country.cities_graph', lambda r: country['restaurant_statistics_graphs'](r['country.summary'], graph_type='cities')),
+        ('country.rating_table', lambda r: country['calculate_country_statistics'](r['country.summary'], 'rating')),
+        ('country.price_table', lambda r: country['calculate_country_statistics'](r['country.summary'], 'price')),
+
+        # Página de cidades
+        ('city.top_restaurants', lambda r: city['top_cities_analysis'](r['load.clean_data']['city'].unique(), 'restaurants')),
+        ('city.top_cuisines', lambda r: city['top_cities_analysis'](r['load.clean_data']['city'].unique(), 'cuisines')),
+        ('city.top_all_cuisines', lambda r: city['top_cities_analysis'](r['load.clean_data']['city'].unique(), 'cuisines', all_cuisines=True)),
+        ('city.rollup', lambda r: rollup(r['load.metrics_cube'], 'city')),
+        ('city.rating_above_4', lambda r: city['cities_with_rating_range'](r['city.rollup'], 4, 5)),
+        ('city.rating_below_2_5', lambda r: city['cities_with_rating_range'](r['city.rollup'], 0, 2.5)),
+        ('city.average_cost_usd', lambda r: city['cities_by_average_cost'](r['city.rollup'])),
+
+        # Página de culinárias
+        ('cuisines.best_restaurants', lambda r: cuisines['best_restaurants_by_cuisine'](r['filter.index_cuisines_default'], top_n_cuisines=5)),
+        ('cuisines.best_restaurants_all', lambda r: cuisines['best_restaurants_by_all_cuisines'](r['load.clean_data'], DEFAULT_CUISINES, top_n_cuisines=5)),
+        ('cuisines.top_10_restaurants', lambda r: cuisines['top_10_restaurants'](r['load.clean_data'], r['load.clean_data']['country_name'].unique())),
+        ('cuisines.top_10_cuisines', lambda r: cuisines['top_10_cuisines_by_rating'](DEFAULT_CUISINES, top_or_bottom='top')),
+        ('cuisines.bottom_10_cuisines', lambda r: cuisines['top_10_cuisines_by_rating'](DEFAULT_CUISINES, top_or_bottom='bottom')),
+        ('cuisines.top_10_all_cuisines', lambda r: cuisines['top_10_cuisines_by_rating'](DEFAULT_CUISINES, top_or_bottom='top', all_cuisines=True)),
+
+        # Página de restaurantes próximos (centro da primeira cidade)
+        ('nearby.city_center_5km', lambda r: nearby['nearby_restaurants'](r['load.clean_data'], r['load.spatial_index'], *r['load.city_centers'].iloc[0], 5)),
+        ('nearby.city_center_50km', lambda r: nearby['nearby_restaurants'](r['load.clean_data'], r['load.spatial_index'], *r['load.city_centers'].iloc[0], 50)),
+
+        # Perguntas de negócio em lote (relatório noturno)
+        ('analytics.answer_questions', lambda r: answer_questions(r['load.clean_data'])),
+
+        # Agregações das páginas via SQL (ZOMATO_SQL_AGGREGATIONS=1)
+        ('sql.rollup_country', lambda r: r['load.sql_database'].rollup('country_name', country_name=r['load.clean_data']['country_name'].unique())),
+        ('sql.rollup_city', lambda r: r['load.sql_database'].rollup('city', city=r['load.clean_data']['city'].unique())),
+    ]
+
+
+def run_benchmark(csv_path, repeat=1, skip=()):
+    """
+    Executa todas as etapas sobre um CSV.
+
+    Parâmetros:
+        csv_path (str): CSV do dataset.
+        repeat (int): Execuções cronometradas por etapa.
+        skip (iterable): Prefixos de etapas a ignorar (ex.: 'principal.map').
+
+    Retorna:
+        tuple: (linhas do dataset tratado, lista com um dicionário por etapa).
+    """
+    pages = {name: load_page_functions(path) for name, path in PAGES.items()}
+    results = {}
+    report = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache_path = os.path.join(directory, 'bench.feather')
+
+        for name, stage in dashboard_stages(csv_path, cache_path, pages):
+            if any(name.startswith(prefix) for prefix in skip):
+                continue
+            results[name], seconds, peak_mb = measure(lambda: stage(results), repeat)
+            report.append({'stage': name, 'seconds': seconds, 'peak_mb': peak_mb})
+
+    return len(results.get('load.clean_data', [])), report
+
+
+def run_search_benchmark(n_rows, directory, source=DATA_PATH, repeat=5):
+    """
+    Mede a busca da página principal sobre um CSV sintético com n_rows linhas.
+
+    Parâmetros:
+        n_rows (int): Linhas do CSV sintético (antes da limpeza).
+        directory (str): Diretório do CSV gerado.
+        source (str): CSV usado como amostra.
+        repeat (int): Execuções cronometradas por busca.
+
+    Retorna:
+        tuple: (linhas do dataset tratado, lista com um dicionário por busca).
+    """
+    principal = load_page_functions(PAGES['principal'])
+    csv_path = os.path.join(directory, f'search_{n_rows}.csv')
+    synthetic.write_csv(csv_path, n_rows, sample_path=source)
+    df = clean_data(pd.read_csv(csv_path))
+    os.remove(csv_path)
+
+    search_index = SearchIndex(df)
+    rows = np.arange(len(df))
+    report = []
+    for query in SEARCH_QUERIES:
+        _, seconds, peak_mb = measure(lambda: principal['search_restaurants'](df, search_index, query, rows), repeat)
+        report.append({'stage': f'search.{query}', 'seconds': seconds, 'peak_mb': peak_mb})
+    return len(df), report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark das etapas de carga, filtro e agregação do dashboard.")
+    parser.add_argument("--csv", default=DATA_PATH, help="CSV de origem")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10, 100],
+                        help="Fatores de replicação do dataset (ex.: 1 10 100 1000)")
+    parser.add_argument("--synthetic", action="store_true",
+                        help="Usa dados sintéticos em vez de replicar o CSV")
+    parser.add_argument("--repeat", type=int, default=1, help="Execuções cronometradas por etapa")
+    parser.add_argument("--skip", nargs="*", default=[], help="Prefixos de etapas a ignorar")
+    parser.add_argument("--search", type=int, nargs="?", const=1_000_000,
+                        help="Mede a busca sobre um CSV sintético de N linhas (padrão: 1 milhão)")
+    parser.add_argument("--json", help="Arquivo para salvar os resultados em JSON")
+    args = parser.parse_args(argv)
+
+    all_results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for scale in args.scale:
+            csv_path = write_scaled_csv(args.csv, scale, directory, args.synthetic)
+            rows, report = run_benchmark(csv_path, args.repeat, args.skip)
+
+            print(f"\n# escala {scale}x ({rows} linhas tratadas)")
+            print(f"{'etapa':<34} {'tempo (s)':>10} {'pico (MB)':>10}")
+            for item in report:
+                print(f"{item['stage']:<34} {item['seconds']:>10.4f} {item['peak_mb']:>10.1f}")
+                all_results.append({'scale': scale, 'rows': rows, **item})
+
+            if csv_path != args.csv:
+                os.remove(csv_path)
+
+        if args.search:
+            rows, report = run_search_benchmark(args.search, directory, args.csv, max(args.repeat, 5))
+
+            print(f"\n# busca ({rows} linhas tratadas, meta {SEARCH_TARGET_MS} ms)")
+            print(f"{'busca':<34} {'tempo (ms)':>10} {'meta':>10}")
+            for item in report:
+                status = 'ok' if item['seconds'] * 1000 <= SEARCH_TARGET_MS else 'ACIMA'
+                print(f"{item['stage']:<34} {item['seconds'] * 1000:>10.1f} {status:>10}")
+                all_results.append({'scale': 'search', 'rows': rows, **item})
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(all_results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark dos mapeamentos da limpeza: .apply(lambda) x versão vetorizada.
+
+Replica o zomato.csv N vezes, executa as duas implementações, confere que o
+resultado é idêntico e mostra o tempo de cada uma.
+
+Uso:
+    python -m benchmarks.bench_transforms [--scale 1 10 100]
+"""
+
+# Importação de bibliotecas
+import argparse
+import time
+
+import pandas as pd
+
+from utils.pipeline import (
+    COLORS,
+    COUNTRIES,
+    DATA_PATH,
+    RATING_MEANING,
+    color_names,
+    country_names,
+    first_cuisine,
+    rating_descriptions,
+)
+
+
+# Funções
+def legacy_transforms(df):
+    # Implementação original, linha a linha, usada como referência
+    result = pd.DataFrame(index=df.index)
+    result['country_name'] = df['Country Code'].apply(lambda x: COUNTRIES.get(x, 'Unknown'))
+    result['colors_name'] = df['Rating color'].apply(lambda x: COLORS.get(x, 'Unknown'))
+    result['rating_description'] = result['colors_name'].apply(lambda x: RATING_MEANING.get(x, 'Desconhecido'))
+    result['cuisines'] = df['Cuisines'].apply(lambda x: x.split(",")[0])
+    return result
+
+
+def vectorized_transforms(df):
+    # Implementação atual do utils.pipeline
+    result = pd.DataFrame(index=df.index)
+    result['country_name'] = country_names(df['Country Code'])
+    result['colors_name'] = color_names(df['Rating color'])
+    result['rating_description'] = rating_descriptions(result['colors_name'])
+    result['cuisines'] = first_cuisine(df['Cuisines'])
+    return result
+
+
+def timed(func, *args):
+    # Executa a função e retorna (resultado, segundos)
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara os mapeamentos .apply x vetorizados.")
+    parser.add_argument("--csv", default=DATA_PATH, help="CSV de origem")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10, 100],
+                        help="Fatores de replicação do dataset")
+    args = parser.parse_args(argv)
+
+    base = pd.read_csv(args.csv).dropna()
+
+    print(f"{'escala':>8} {'linhas':>10} {'apply (s)':>10} {'vetor (s)':>10} {'ganho':>7}")
+    for scale in args.scale:
+        df = pd.concat([base] * scale, ignore_index=True)
+
+        expected, legacy_time = timed(legacy_transforms, df)
+        result, vector_time = timed(vectorized_transforms, df)
+
+        # Os dois caminhos precisam produzir exatamente o mesmo resultado
+        pd.testing.assert_frame_equal(result, expected)
+
+        print(f"{scale:>8} {len(df):>10} {legacy_time:>10.3f} {vector_time:>10.3f} "
+              f"{legacy_time / vector_time:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+Gerador de datasets sintéticos no esquema do zomato.csv.
+
+As distribuições são aprendidas da amostra real: cada linha gerada parte de
+uma linha da amostra sorteada (o que preserva as combinações de país,
+cidade, moeda, preço, nota, cor e texto da nota) e recebe novo id, nome,
+localidade e endereço, coordenadas sorteadas em torno do centro da cidade,
+culinárias recombinadas a partir das culinárias do país e votos
+perturbados. Linhas duplicadas e culinárias ausentes aparecem na mesma
+proporção da amostra.
+
+A saída é gravada em blocos, então arquivos de vários GB podem ser gerados
+sem manter o dataset em memória:
+
+    python -m benchmarks.synthetic --rows 7500000 --output zomato_x1000.csv
+"""
+
+# Importação de bibliotecas
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from utils.pipeline import COLORS, COUNTRIES, DATA_PATH
+
+# Linhas geradas por bloco
+CHUNKSIZE = 100_000
+
+# Limites do espalhamento (em graus) das coordenadas em torno do centro da cidade
+MIN_SPREAD = 0.005
+MAX_SPREAD = 0.1
+
+
+# Funções
+def fit_profile(sample):
+    """
+    Extrai da amostra as distribuições usadas pelo gerador.
+
+    Parâmetros:
+        sample (pd.DataFrame): CSV bruto do Zomato (colunas originais).
+
+    Retorna:
+        dict: Perfil da amostra.
+    """
+    unique = sample.drop_duplicates()
+
+    # Somente países e cores conhecidos pelo dashboard
+    templates = unique[unique['Country Code'].isin(COUNTRIES.keys()) & unique['Rating color'].isin(COLORS.keys())]
+    templates = templates.reset_index(drop=True)
+
+    # Centro e espalhamento (desvio absoluto mediano) das coordenadas por cidade
+    coordinates = templates.groupby('City')[['Latitude', 'Longitude']]
+    center = coordinates.median()
+    spread = (coordinates.transform(lambda values: (values - values.median()).abs()).groupby(templates['City']).median()
+              * 1.4826).clip(MIN_SPREAD, MAX_SPREAD)
+
+    # Culinárias individuais por país e quantidade de culinárias por restaurante
+    cuisines = templates[['Country Code', 'Cuisines']].dropna()
+    tokens = cuisines.assign(Cuisines=cuisines['Cuisines'].str.split(', ')).explode('Cuisines')
+    cuisine_tokens = {
+        code: group['Cuisines'].value_counts(normalize=True)
+        for code, group in tokens.groupby('Country Code')
+    }
+
+    return {
+        'columns': list(sample.columns),
+        'templates': templates,
+        'center': center,
+        'spread': spread,
+        'localities': templates.groupby('City')['Locality'].unique(),
+        'names': templates['Restaurant Name'].to_numpy(),
+        'cuisine_tokens': cuisine_tokens,
+        'cuisine_counts': (cuisines['Cuisines'].str.count(', ') + 1).value_counts(normalize=True).sort_index(),
+        'duplicate_rate': 1 - len(unique) / len(sample),
+        'missing_cuisine_rate': templates['Cuisines'].isna().mean(),
+        'first_id': int(sample['Restaurant ID'].max()) + 1,
+    }
+
+
+def _cuisines(profile, country_codes, rng):
+    # Culinárias separadas por vírgula, sorteadas entre as culinárias do país
+    counts = profile['cuisine_counts']
+    n_cuisines = rng.choice(counts.index.to_numpy(), size=len(country_codes), p=counts.to_numpy())
+    result = pd.Series('', index=country_codes.index, dtype=object)
+
+    for code, rows in country_codes.groupby(country_codes).groups.items():
+        distribution = profile['cuisine_tokens'][code]
+        drawn = rng.choice(distribution.index.to_numpy(), size=(len(rows), counts.index.max()), p=distribution.to_numpy())
+
+        # Junta as k primeiras culinárias distintas de cada linha
+        result[rows] = [
+            ', '.join(dict.fromkeys(row[:k]))
+            for row, k in zip(drawn, n_cuisines[result.index.get_indexer(rows)])
+        ]
+
+    return result
+
+
+def generate_chunk(profile, n_rows, first_id, rng):
+    """
+    Gera um bloco de linhas sintéticas.
+
+    Parâmetros:
+        profile (dict): Perfil da amostra (ver fit_profile).
+        n_rows (int): Quantidade de linhas do bloco (duplicatas incluídas).
+        first_id (int): Primeiro restaurant_id do bloco.
+        rng (np.random.Generator): Gerador de números aleatórios.
+
+    Retorna:
+        pd.DataFrame: Bloco com as colunas do CSV original.
+    """
+    n_duplicates = rng.binomial(n_rows, profile['duplicate_rate'])
+    n_unique = n_rows - n_duplicates
+
+    templates = profile['templates']
+    chunk = templates.iloc[rng.integers(len(templates), size=n_unique)].reset_index(drop=True)
+    cities = chunk['City']
+
+    chunk['Restaurant ID'] = np.arange(first_id, first_id + n_unique)
+    chunk['Restaurant Name'] = rng.choice(profile['names'], size=n_unique)
+
+    # Localidade sorteada entre as localidades da própria cidade
+    localities = np.empty(n_unique, dtype=object)
+    for city, rows in cities.groupby(cities).indices.items():
+        localities[rows] = rng.choice(profile['localities'][city], size=len(rows))
+    chunk['Locality'] = localities
+    chunk['Locality Verbose'] = chunk['Locality'] + ', ' + cities
+    chunk['Address'] = (pd.Series(rng.integers(1, 500, size=n_unique)).astype(str)
+                        + ', ' + chunk['Locality Verbose'])
+
+    # Coordenadas agrupadas em torno do centro de cada cidade
+    center = profile['center'].reindex(cities).to_numpy()
+    spread = profile['spread'].reindex(cities).to_numpy()
+    coordinates = center + rng.normal(size=center.shape) * spread
+    chunk['Latitude'] = coordinates[:, 0].clip(-90, 90)
+    chunk['Longitude'] = coordinates[:, 1].clip(-180, 180)
+
+    chunk['Cuisines'] = _cuisines(profile, chunk['Country Code'], rng)
+    chunk.loc[rng.random(n_unique) < profile['missing_cuisine_rate'], 'Cuisines'] = np.nan
+
+    chunk['Votes'] = np.round(chunk['Votes'] * rng.lognormal(0, 0.3, size=n_unique)).astype('int64')
+
+    # Duplicatas de linhas do próprio bloco, em posições aleatórias
+    if n_duplicates and n_unique:
+        chunk = pd.concat([chunk, chunk.iloc[rng.integers(n_unique, size=n_duplicates)]])
+        chunk = chunk.iloc[rng.permutation(len(chunk))]
+
+    return chunk[profile['columns']].reset_index(drop=True)
+
+
+def generate_chunks(n_rows, sample_path=DATA_PATH, chunksize=CHUNKSIZE, seed=0):
+    """
+    Gera o dataset sintético bloco a bloco.
+
+    Parâmetros:
+        n_rows (int): Quantidade total de linhas.
+        sample_path (str): CSV usado como amostra.
+        chunksize (int): Linhas por bloco.
+        seed (int): Semente do gerador (mesma semente, mesmo dataset).
+
+    Retorna:
+        generator: Blocos pd.DataFrame com as colunas do CSV original.
+    """
+    profile = fit_profile(pd.read_csv(sample_path))
+    rng = np.random.default_rng(seed)
+    next_id = profile['first_id']
+
+    for start in range(0, n_rows, chunksize):
+        chunk = generate_chunk(profile, min(chunksize, n_rows - start), next_id, rng)
+        next_id += chunksize
+        yield chunk
+
+
+def write_csv(output, n_rows, sample_path=DATA_PATH, chunksize=CHUNKSIZE, seed=0):
+    """
+    Grava o dataset sintético em CSV, bloco a bloco.
+
+    Parâmetros:
+        output (str or file): Caminho ou arquivo de saída.
+        n_rows (int): Quantidade total de linhas.
+        sample_path (str): CSV usado como amostra.
+        chunksize (int): Linhas por bloco.
+        seed (int): Semente do gerador.
+    """
+    for index, chunk in enumerate(generate_chunks(n_rows, sample_path, chunksize, seed)):
+        if isinstance(output, str):
+            chunk.to_csv(output, mode='w' if index == 0 else 'a', header=index == 0, index=False)
+        else:
+            chunk.to_csv(output, header=index == 0, index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera um dataset sintético no esquema do zomato.csv.")
+    parser.add_argument("--rows", type=int, required=True, help="Quantidade de linhas")
+    parser.add_argument("--output", default="-", help="Arquivo de saída ('-' para a saída padrão)")
+    parser.add_argument("--sample", default=DATA_PATH, help="CSV usado como amostra")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE, help="Linhas por bloco")
+    parser.add_argument("--seed", type=int, default=0, help="Semente do gerador")
+    args = parser.parse_args(argv)
+
+    write_csv(sys.stdout if args.output == "-" else args.output,
+              args.rows, args.sample, args.chunksize, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -33,12 +33,18 @@ O **Growth Dashboard** foi desenvolvido para monitorar e analisar as principais
 - **Cuisines**:  
   - Explore os tipos de culinária oferecidos em cada localidade, identificando as opções mais populares e os padrões de avaliações para diferentes tipos de comida.  
 
+- **Nearby**:  
+  - Encontre os restaurantes mais bem avaliados a até N km do centro de uma cidade ou de coordenadas informadas.  
+
+- **SQL**:  
+  - Consulte a tabela `restaurants` (o dataset tratado) com SQL de leitura e veja o resultado em uma tabela.  
+
 #### Colunas e Métricas Trabalhadas  
 
 Este dashboard é baseado em dados detalhados extraídos das seguintes colunas:  
 - **Restaurantes**: `restaurant_id`, `restaurant_name`, `aggregate_rating`, `rating_text`, `votes`.  
 - **Localização**: `country_name`, `city`, `latitude`, `longitude`, `address`.  
-- **Culinária**: `cuisines`, `average_cost_for_two`, `currency`.  
+- **Culinária**: `cuisines` (principal), `all_cuisines` (todas), `average_cost_for_two`, `currency`, `average_cost_for_two_usd` (convertido para dólares).  
 - **Avaliações**: `rating_color`, `rating_text`, `colors_name`.  
 
 #### Solicitações e Suporte  
@@ -5,179 +5,195 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import streamlit as st
+import streamlit.components.v1 as components
 from PIL import Image
 import folium
 from folium.plugins import MarkerCluster
-from streamlit_folium import folium_static
-import re
+from streamlit_folium import folium_static, st_folium
+
+from utils.filters import load_filter_index
+from utils.instrumentation import RunTimer
+from utils.maps import MAP_MODES, marker_layer, render_map_html, viewport_markers
+from utils.pipeline import dataset_version, load_data
+from utils.search import load_search_index
+from utils.spatial import load_spatial_index
 
 # Configuração inicial do Streamlit
 st.set_page_config(page_title='Principal Page', layout='wide')
 
-# Funções
-def rename_columns(dataframe):
-    # Renomeia colunas
-    renamed_dataframe = dataframe.copy()
-
-    # Funções de transformação para as colunas
-    title = lambda x: x.title()
-    snakecase = lambda x: re.sub(r'([a-z])([A-Z])', r'\1_\2', x).lower().replace(" ", "_")
-    spaces = lambda x: x.replace(" ", "")
-
-    cols_old = [title(str(x)) for x in renamed_dataframe.columns]
-    cols_old = [spaces(x) for x in cols_old]
-    cols_new = [snakecase(x) for x in cols_old]
-
-    renamed_dataframe.columns = cols_new
-    return renamed_dataframe
+# Cronômetro das etapas deste rerun
+timer = RunTimer('Principal Page')
 
+# Funções
 def unicos(dataframe, coluna):
     # Retorna valores únicos
     return dataframe[coluna].nunique()
 
-def Country_Maps(df):
+def Country_Maps(df, mode='fast', cache_key=None):
     """
     Exibe um mapa com marcadores agrupados em clusters e cores personalizadas por país e rating.
+
+    No modo 'fast' os marcadores são criados no navegador a partir de um único
+    array; no modo 'grid' os restaurantes são agregados em células no servidor.
+    O HTML gerado é reaproveitado entre reruns e sessões com o mesmo cache_key.
+    """
+    html = render_map_html(df, mode, cache_key)
+
+    # Renderizando o mapa (mesmo resultado do folium_static)
+    components.html(html, width=1024, height=600 + 10)
+
+def Viewport_Map(df, rows):
+    """
+    Exibe um mapa interativo que materializa apenas os marcadores da área visível.
+
+    Os limites e o zoom voltam do navegador a cada movimento do mapa; os
+    restaurantes da área vêm do índice espacial e são limitados por nível de
+    zoom. Só a camada de marcadores muda entre reruns: o mapa base não é
+    recarregado.
     """
-    # Criando o mapa base
-    map = folium.Map()
-
-    # Cluster para agrupamento de marcadores
-    marker_cluster = MarkerCluster().add_to(map)
-
-    # Adicionando marcadores com cores personalizadas
-    for _, row in df.iterrows():
-        folium.Marker(
-            location=[row['latitude'], row['longitude']],
-            popup=f"""
-                Restaurante: {row['restaurant_name']}<br>
-                País: {row['country_name']}<br>
-                Rating: {row['aggregate_rating']} ({row['rating_text']})
-            """,
-            icon=folium.Icon(color=row['colors_name'], icon_color='white')
-        ).add_to(marker_cluster)
-
-    # Renderizando o mapa
-    folium_static(map, width=1024, height=600)
+    # Área visível na última interação (nenhuma na primeira renderização)
+    state = st.session_state.get('viewport_map') or {}
+    markers, total = viewport_markers(df, load_spatial_index(), rows, state.get('bounds'), state.get('zoom'))
+
+    st_folium(
+        folium.Map(location=[20, 0], zoom_start=2),
+        key='viewport_map',
+        width=1024,
+        height=600,
+        returned_objects=['bounds', 'zoom'],
+        feature_group_to_add=marker_layer(markers),
+    )
+    hint = " Aproxime o mapa para ver os demais." if len(markers) < total else ""
+    st.caption(f"Exibindo {len(markers)} de {total} restaurantes da área visível.{hint}")
+
+def search_restaurants(df, search_index, query, rows, limit=20):
+    """
+    Busca restaurantes por nome, localidade ou endereço, tolerando prefixos e erros de digitação.
+
+    Parâmetros:
+        df (pd.DataFrame): O DataFrame tratado completo.
+        search_index (SearchIndex): Índice de busca do mesmo dataset (utils.search).
+        query (str): Texto digitado.
+        rows (np.ndarray): Posições das linhas que passam pelos filtros da página.
+        limit (int): Quantidade máxima de resultados.
+
+    Retorna:
+        pd.DataFrame: Restaurantes encontrados, por pontuação e depois por avaliação.
+    """
+    scores = search_index.search(query)
+    if len(rows) < len(df):
+        scores = scores[np.isin(scores.index, rows)]
+
+    # Maior pontuação, depois maior avaliação, depois ordem no dataset
+    positions = scores.index.to_numpy()
+    ratings = df['aggregate_rating'].to_numpy()[positions]
+    best = np.lexsort((positions, -ratings, -scores.to_numpy()))[:limit]
+
+    return df.iloc[positions[best]].assign(score=scores.to_numpy()[best].round(2))
 
 @st.cache_data
 def convert_df_to_csv(dataframe):
     """Converte o DataFrame em CSV e retorna como bytes."""
     return dataframe.to_csv(index=False).encode('utf-8')
 
-# Importando dados
-df = pd.read_csv("zomato.csv")
-df1 = df.dropna()
-
-# Configurações iniciais
-COUNTRIES = {
-    1: "India",
-    14: "Australia",
-    30: "Brazil",
-    37: "Canada",
-    94: "Indonesia",
-    148: "New Zealand",
-    162: "Philippines",
-    166: "Qatar",
-    184: "Singapore",
-    189: "South Africa",
-    191: "Sri Lanka",
-    208: "Turkey",
-    214: "United Arab Emirates",
-    215: "England",
-    216: "United States of America"
-}
-df1['country_name'] = df1['Country Code'].apply(lambda x: COUNTRIES.get(x, 'Unknown'))
-
-COLORS = {
-    "3F7E00": 'darkgreen',
-    "5BA829": 'green',
-    "9ACD32": 'lightgreen',
-    "CDD614": 'orange',
-    "FFBA00": 'red',
-    "CBCBC8": 'darkred',
-    "FF7800": 'darkred'
-}
-df1['Colors_name'] = df1['Rating color'].apply(lambda x: COLORS.get(x, 'Unknown'))
-
-# Definindo as cores e seus significados de rating
-RATING_MEANING = {
-    "darkgreen": "Excelente (4.5 - 5.0)",
-    "green": "Muito bom (4.0 - 4.5)",
-    "lightgreen": "Bom (3.5 - 4.0)",
-    "orange": "Médio (3.0 - 3.5)",
-    "red": "Ruim (2.5 - 3.0)",
-    "darkred": "Péssimo (1.5 - 2.5)",
-    "Unknown": "Desconhecido"
-}
-
-# Criando a coluna 'Rating_description' baseada na 'Colors_name'
-df1['Rating_description'] = df1['Colors_name'].apply(lambda x: RATING_MEANING.get(x, 'Desconhecido'))
-
-df2 = rename_columns(df1)
-df2['cuisines'] = df2.loc[:, "cuisines"].apply(lambda x: x.split(",")[0])
-df3 = df2.drop('switch_to_order_menu', axis=1)
-df4 = df3.drop_duplicates()
-
-# Barra lateral
-st.sidebar.markdown('# FOME ZERO!')
-st.sidebar.markdown('---')
-
-# Filtro de países
-unique_countries = df4['country_name'].unique()
-selected_countries = st.sidebar.multiselect(
-    "Escolha os países que deseja visualizar os restaurantes:",
-    options=unique_countries,
-    default=unique_countries  # Preseleciona todos os países
-)
-
-st.sidebar.header("Download do Dataset")
-csv_data = convert_df_to_csv(df4)
-st.sidebar.download_button(
-    label="Baixar Dataset Tratado",
-    data=csv_data,
-    file_name="dataset_tratado.csv",
-    mime="text/csv"
-)
-
-st.sidebar.markdown('---')
-st.sidebar.markdown('### Powered by Lucy Souza')
-
-# Filtrar o DataFrame com base nos países selecionados
-filtered_df = df4[df4['country_name'].isin(selected_countries)]
-
-# Layout principal
-tab1, = st.tabs(['Visão Principal'])
-
-with tab1:
-    with st.container():
-      st.markdown('# FOME ZERO!')
-      st.markdown('## O melhor lugar para encontrar seu mais novo restaurante favorito!')
-      st.markdown('### Temos as seguintes marcas dentro da nossa plataforma:')
-
-      st.title("Overall Metrics")
-      col1, col2, col3, col4, col5 = st.columns(5, gap='large')
-
-      with col1:
-        restaurantes_unicos = unicos(filtered_df, coluna="restaurant_id")
-        col1.metric('Restaurantes', restaurantes_unicos)
-
-      with col2:
-        paises = unicos(filtered_df, coluna="country_code")
-        col2.metric('Países', paises)
-
-      with col3:
-        cidades = unicos(filtered_df, coluna="city")
-        col3.metric('Cidades', cidades)
-
-      with col4:
-        avaliacoes = filtered_df['votes'].sum()
-        col4.metric('Avaliações', avaliacoes)
-
-      with col5:
-        cuisines = unicos(filtered_df, coluna="cuisines")
-        col5.metric('Culinárias', cuisines)
-
-    with st.container():
-       Country_Maps(filtered_df)
+# Rerun cronometrado: registrado mesmo se falhar ou for interrompido
+with timer:
+    # Importando dados
+    df4 = load_data()
+    filter_index = load_filter_index()
+    search_index = load_search_index()
+    timer.lap('carga')
+
+    # Barra lateral
+    st.sidebar.markdown('# FOME ZERO!')
+    st.sidebar.markdown('---')
+
+    # Filtro de países
+    unique_countries = df4['country_name'].unique()
+    selected_countries = st.sidebar.multiselect(
+        "Escolha os países que deseja visualizar os restaurantes:",
+        options=unique_countries,
+        default=unique_countries  # Preseleciona todos os países
+    )
+
+    # Modo de renderização do mapa
+    map_mode = st.sidebar.radio(
+        "Modo do mapa:",
+        options=list(MAP_MODES),
+        format_func=MAP_MODES.get
+    )
+
+    st.sidebar.header("Download do Dataset")
+    csv_data = convert_df_to_csv(df4)
+    st.sidebar.download_button(
+        label="Baixar Dataset Tratado",
+        data=csv_data,
+        file_name="dataset_tratado.csv",
+        mime="text/csv"
+    )
+
+    st.sidebar.markdown('---')
+    st.sidebar.markdown('### Powered by Lucy Souza')
+    timer.lap('barra_lateral')
+
+    # Filtrar o DataFrame com base nos países selecionados
+    filtered_df = filter_index.filter(df4, country_name=selected_countries)
+    selected_rows = filter_index.select(country_name=selected_countries)
+    timer.lap('filtros')
+
+    # Layout principal
+    tab1, = st.tabs(['Visão Principal'])
+
+    with tab1:
+        with st.container():
+          st.markdown('# FOME ZERO!')
+          st.markdown('## O melhor lugar para encontrar seu mais novo restaurante favorito!')
+          st.markdown('### Temos as seguintes marcas dentro da nossa plataforma:')
+
+          st.title("Overall Metrics")
+          col1, col2, col3, col4, col5 = st.columns(5, gap='large')
+
+          with col1:
+            restaurantes_unicos = unicos(filtered_df, coluna="restaurant_id")
+            col1.metric('Restaurantes', restaurantes_unicos)
+
+          with col2:
+            paises = unicos(filtered_df, coluna="country_code")
+            col2.metric('Países', paises)
+
+          with col3:
+            cidades = unicos(filtered_df, coluna="city")
+            col3.metric('Cidades', cidades)
+
+          with col4:
+            avaliacoes = filtered_df['votes'].sum()
+            col4.metric('Avaliações', avaliacoes)
+
+          with col5:
+            cuisines = unicos(filtered_df, coluna="cuisines")
+            col5.metric('Culinárias', cuisines)
+        timer.lap('metricas')
+
+        with st.container():
+          st.markdown('## Buscar restaurantes')
+          query = st.text_input("Nome, localidade ou endereço do restaurante:", placeholder="ex.: pizza hut, connaught place")
+
+          if query:
+            found = search_restaurants(df4, search_index, query, selected_rows)
+            if found.empty:
+              st.warning("Nenhum restaurante encontrado.")
+            else:
+              st.dataframe(
+                found[['restaurant_name', 'locality_verbose', 'address', 'country_name', 'aggregate_rating', 'score']],
+                hide_index=True,
+                use_container_width=True
+              )
+        timer.lap('busca')
+
+        with st.container():
+           if map_mode == 'viewport':
+             Viewport_Map(df4, selected_rows)
+           else:
+             Country_Maps(filtered_df, map_mode, cache_key=(frozenset(selected_countries), dataset_version()))
+        timer.lap('mapa')
 
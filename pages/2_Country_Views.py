@@ -9,42 +9,54 @@ from PIL import Image
 import folium
 from folium.plugins import MarkerCluster
 from streamlit_folium import folium_static
-import re
+
+from utils.cube import RATING_SCALE, USD_SCALE, filter_cube, load_cube
+from utils.figures import memoize_figure, selection_key
+from utils.instrumentation import RunTimer
+from utils.pipeline import COLORS, load_data
+from utils.sql import SQL_AGGREGATIONS, load_database
 
 # Configuração inicial do Streamlit
 st.set_page_config(page_title='Country Views', layout='wide')
 
-# Funções
-def rename_columns(dataframe):
-    # Renomeia colunas
-    renamed_dataframe = dataframe.copy()
-
-    # Funções de transformação para as colunas
-    title = lambda x: x.title()
-    snakecase = lambda x: re.sub(r'([a-z])([A-Z])', r'\1_\2', x).lower().replace(" ", "_")
-    spaces = lambda x: x.replace(" ", "")
-
-    cols_old = [title(str(x)) for x in renamed_dataframe.columns]
-    cols_old = [spaces(x) for x in cols_old]
-    cols_new = [snakecase(x) for x in cols_old]
+# Cronômetro das etapas deste rerun
+timer = RunTimer('Country Views')
 
-    renamed_dataframe.columns = cols_new
-    return renamed_dataframe
-
-def restaurant_statistics_graphs(df, graph_type):
-    # Criando a coluna 'Colors_name' que mapeia a cor
-    df['colors_name'] = df['rating_color'].apply(lambda x: COLORS.get(x, 'Unknown'))
+# Funções
+def country_summary(cube):
+    """
+    Calcula, em uma única agregação, todas as métricas por país usadas pela página.
 
-    # Criando a coluna 'Rating_description' com o significado do rating
-    df['rating_description'] = df['colors_name'].apply(lambda x: RATING_MEANING.get(x, 'Desconhecido'))
+    Parâmetros:
+        cube (pd.DataFrame): O cubo de métricas (utils.cube) já filtrado.
 
+    Retorna:
+        pd.DataFrame: Por país: quantidade de restaurantes e de cidades, média
+        de avaliação, custo médio para dois em dólares e a cor representativa
+        (a da primeira linha do país no dataset).
+    """
+    # Células na ordem do dataset: 'first' pega a cor da primeira linha
+    ordered = cube.sort_values('first_row', kind='stable')
+
+    summary = ordered.groupby('country_name', observed=True).agg(
+        restaurant_count=('restaurant_count', 'sum'),
+        city_count=('city', 'nunique'),
+        rating_sum=('rating_sum', 'sum'),
+        rating_count=('rating_count', 'sum'),
+        cost_usd_sum=('cost_usd_sum', 'sum'),
+        cost_usd_count=('cost_usd_count', 'sum'),
+        rating_color=('rating_color', 'first'),
+    )
+    summary['average_rating'] = (summary['rating_sum'] / RATING_SCALE) / summary['rating_count']
+    summary['average_cost_for_two_usd'] = (summary['cost_usd_sum'] / USD_SCALE) / summary['cost_usd_count']
+
+    return summary
+
+@memoize_figure
+def restaurant_statistics_graphs(summary, graph_type):
     if graph_type == 'restaurants':
         # 1. Quantidade de Restaurantes por País
-        restaurants_by_country = df.groupby('country_name')['restaurant_id'].nunique().reset_index()
-        restaurants_by_country = restaurants_by_country.rename(columns={'restaurant_id': 'restaurant_count'})
-
-        # Adicionar a cor do rating como uma coluna para o gráfico
-        restaurants_by_country['rating_color'] = df.groupby('country_name')['rating_color'].first().values
+        restaurants_by_country = summary[['restaurant_count', 'rating_color']].reset_index()
         
         # Gráfico de Restaurantes por País
         fig_restaurants = px.bar(restaurants_by_country,
@@ -103,11 +115,7 @@ def restaurant_statistics_graphs(df, graph_type):
 
     elif graph_type == 'cities':
         # 2. Quantidade de Cidades Registradas por País
-        cities_by_country = df.groupby('country_name')['city'].nunique().reset_index()
-        cities_by_country = cities_by_country.rename(columns={'city': 'city_count'})
-
-        # Adicionar a cor do rating como uma coluna para o gráfico
-        cities_by_country['rating_color'] = df.groupby('country_name')['rating_color'].first().values
+        cities_by_country = summary[['city_count', 'rating_color']].reset_index()
         
         # Gráfico de Cidades por País
         fig_cities = px.bar(cities_by_country,
@@ -167,12 +175,12 @@ def restaurant_statistics_graphs(df, graph_type):
     else:
         print("Tipo de gráfico inválido. Use 'restaurants' ou 'cities'.")
 
-def calculate_country_statistics(df, metric):
+def calculate_country_statistics(summary, metric):
     """
     Calcula estatísticas por país com base na métrica escolhida.
 
     Parâmetros:
-        df (pd.DataFrame): O DataFrame com os dados.
+        summary (pd.DataFrame): As métricas por país (ver country_summary).
         metric (str): A métrica para calcular ("rating" ou "price").
     
     Retorna:
@@ -180,113 +188,79 @@ def calculate_country_statistics(df, metric):
     """
     if metric == 'rating':
         # Média de avaliações por país
-        result = df.groupby('country_name')['aggregate_rating'].mean().reset_index(name='average_rating')
+        result = summary['average_rating'].reset_index(name='average_rating')
         result = result.sort_values(by='average_rating', ascending=False).reset_index(drop=True)  # Ordenando e resetando índices
         return result
 
     elif metric == 'price':
-        # Média de preço para duas pessoas por país
-        result = df.groupby('country_name')['average_cost_for_two'].mean().reset_index(name='average_cost_for_two_people')
-        result = result.sort_values(by='average_cost_for_two_people', ascending=False).reset_index(drop=True)  # Ordenando e resetando índices
+        # Média de preço para duas pessoas por país, em dólares (comparável entre moedas)
+        result = summary['average_cost_for_two_usd'].reset_index(name='average_cost_for_two_people_usd')
+        result = result.sort_values(by='average_cost_for_two_people_usd', ascending=False).reset_index(drop=True)  # Ordenando e resetando índices
         return result
 
     else:
         raise ValueError("Métrica inválida. Use 'rating' ou 'price'.")
     
-# Importando dados
-df = pd.read_csv("zomato.csv")
-df1 = df.dropna()
-
-# Configurações iniciais
-COUNTRIES = {
-    1: "India",
-    14: "Australia",
-    30: "Brazil",
-    37: "Canada",
-    94: "Indonesia",
-    148: "New Zealand",
-    162: "Philippines",
-    166: "Qatar",
-    184: "Singapore",
-    189: "South Africa",
-    191: "Sri Lanka",
-    208: "Turkey",
-    214: "United Arab Emirates",
-    215: "England",
-    216: "United States of America"
-}
-df1['country_name'] = df1['Country Code'].apply(lambda x: COUNTRIES.get(x, 'Unknown'))
-
-COLORS = {
-    "3F7E00": 'darkgreen',
-    "5BA829": 'green',
-    "9ACD32": 'lightgreen',
-    "CDD614": 'orange',
-    "FFBA00": 'red',
-    "CBCBC8": 'darkred',
-    "FF7800": 'darkred'
-}
-df1['Colors_name'] = df1['Rating color'].apply(lambda x: COLORS.get(x, 'Unknown'))
-
-# Definindo as cores e seus significados de rating
-RATING_MEANING = {
-    "darkgreen": "Excelente (4.5 - 5.0)",
-    "green": "Muito bom (4.0 - 4.5)",
-    "lightgreen": "Bom (3.5 - 4.0)",
-    "orange": "Médio (3.0 - 3.5)",
-    "red": "Ruim (2.5 - 3.0)",
-    "darkred": "Péssimo (1.5 - 2.5)",
-    "Unknown": "Desconhecido"
-}
-
-# Criando a coluna 'Rating_description' baseada na 'Colors_name'
-df1['Rating_description'] = df1['Colors_name'].apply(lambda x: RATING_MEANING.get(x, 'Desconhecido'))
-
-df2 = rename_columns(df1)
-df2['cuisines'] = df2.loc[:, "cuisines"].apply(lambda x: x.split(",")[0])
-df3 = df2.drop('switch_to_order_menu', axis=1)
-df4 = df3.drop_duplicates()
-
-# Barra lateral
-st.sidebar.markdown('# FOME ZERO!')
-st.sidebar.markdown('---')
-
-# Filtro de países
-unique_countries = df4['country_name'].unique()
-selected_countries = st.sidebar.multiselect(
-    "Escolha os países que deseja visualizar os restaurantes:",
-    options=unique_countries,
-    default=unique_countries  # Preseleciona todos os países
-)
-
-st.sidebar.markdown('---')
-st.sidebar.markdown('### Powered by Lucy Souza')
-
-# Filtrar o DataFrame com base nos países selecionados
-filtered_df = df4[df4['country_name'].isin(selected_countries)]
-
-# Layout principal
-tab1, = st.tabs(['Visão Principal'])
-
-with tab1:
-    with st.container():
-        fig = restaurant_statistics_graphs(filtered_df, graph_type='restaurants')
-        st.markdown('#  Restaurantes por País')
-        st.plotly_chart( fig, use_container_width=True)
-
-    with st.container():
-        fig = restaurant_statistics_graphs(filtered_df, graph_type='cities')
-        st.markdown('#  Cidades Registradas por País')
-        st.plotly_chart( fig, use_container_width=True)
-
-    with st.container():
-        st.title("Médias Gerais")
-        col1, col2 = st.columns(2, gap='large')
-        with col1:
-            media = calculate_country_statistics(filtered_df, 'rating')
-            st.write("Média de Avaliações por País", media)
-
-        with col2:
-            media = calculate_country_statistics(filtered_df, 'price')
-            st.write("Média de Preço para Duas Pessoas por País", media)
-        
\ No newline at end of file
+# Rerun cronometrado: registrado mesmo se falhar ou for interrompido
+with timer:
+    # Importando dados
+    df4 = load_data()
+    cube = load_cube()
+    timer.lap('carga')
+
+    # Barra lateral
+    st.sidebar.markdown('# FOME ZERO!')
+    st.sidebar.markdown('---')
+
+    # Filtro de países
+    unique_countries = df4['country_name'].unique()
+    selected_countries = st.sidebar.multiselect(
+        "Escolha os países que deseja visualizar os restaurantes:",
+        options=unique_countries,
+        default=unique_countries  # Preseleciona todos os países
+    )
+
+    st.sidebar.markdown('---')
+    st.sidebar.markdown('### Powered by Lucy Souza')
+    timer.lap('barra_lateral')
+
+    # Filtrar o cubo de métricas com base nos países selecionados
+    filtered_cube = filter_cube(cube, country_name=selected_countries)
+    selection = selection_key(selected_countries)
+
+    # Métricas por país em uma única agregação, reutilizadas pelos quatro widgets
+    # (via SQL com ZOMATO_SQL_AGGREGATIONS=1)
+    if SQL_AGGREGATIONS:
+        summary = load_database().rollup('country_name', country_name=selected_countries)
+    else:
+        summary = country_summary(filtered_cube)
+    timer.lap('filtros')
+
+    # Layout principal
+    tab1, = st.tabs(['Visão Principal'])
+
+    with tab1:
+        with st.container():
+            fig = restaurant_statistics_graphs(summary, graph_type='restaurants', cache_key=selection)
+            st.markdown('#  Restaurantes por País')
+            st.plotly_chart( fig, use_container_width=True)
+        timer.lap('grafico_restaurantes')
+
+        with st.container():
+            fig = restaurant_statistics_graphs(summary, graph_type='cities', cache_key=selection)
+            st.markdown('#  Cidades Registradas por País')
+            st.plotly_chart( fig, use_container_width=True)
+        timer.lap('grafico_cidades')
+
+        with st.container():
+            st.title("Médias Gerais")
+            col1, col2 = st.columns(2, gap='large')
+            with col1:
+                media = calculate_country_statistics(summary, 'rating')
+                st.write("Média de Avaliações por País", media)
+
+            with col2:
+                media = calculate_country_statistics(summary, 'price')
+                st.write("Média de Preço para Duas Pessoas por País (USD)", media)
+
+        timer.lap('medias')
\ No newline at end of file
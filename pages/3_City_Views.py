@@ -9,59 +9,62 @@ from PIL import Image
 import folium
 from folium.plugins import MarkerCluster
 from streamlit_folium import folium_static
-import re
+
+from utils.cube import filter_cube, load_cube, rollup
+from utils.cuisines import load_cuisine_index
+from utils.figures import memoize_figure, selection_key
+from utils.instrumentation import RunTimer
+from utils.leaderboard import load_leaderboards
+from utils.pipeline import load_data
+from utils.sql import SQL_AGGREGATIONS, load_database
 
 # Configuração inicial do Streamlit
 st.set_page_config(page_title='City Views', layout='wide')
 
-# Funções
-def rename_columns(dataframe):
-    # Renomeia colunas
-    renamed_dataframe = dataframe.copy()
-
-    # Funções de transformação para as colunas
-    title = lambda x: x.title()
-    snakecase = lambda x: re.sub(r'([a-z])([A-Z])', r'\1_\2', x).lower().replace(" ", "_")
-    spaces = lambda x: x.replace(" ", "")
+# Cronômetro das etapas deste rerun
+timer = RunTimer('City Views')
 
-    cols_old = [title(str(x)) for x in renamed_dataframe.columns]
-    cols_old = [spaces(x) for x in cols_old]
-    cols_new = [snakecase(x) for x in cols_old]
-
-    renamed_dataframe.columns = cols_new
-    return renamed_dataframe
-
-def top_cities_analysis(df, analysis_type):
+# Funções
+@memoize_figure
+def top_cities_analysis(selected_cities, analysis_type, all_cuisines=False):
     """
     Encontra o Top 10 cidades com base no tipo de análise escolhida
     (mais restaurantes ou mais tipos culinários distintos) e gera um gráfico.
 
     Parâmetros:
-        df (pd.DataFrame): O DataFrame com os dados.
+        selected_cities (list): Cidades selecionadas (o ranking é mesclado dos rankings pré-computados).
         analysis_type (str): Tipo de análise ("restaurants" ou "cuisines").
+        all_cuisines (bool): Se True, conta todas as culinárias servidas (não só a principal).
 
     Retorna:
         None: Exibe o gráfico no Streamlit.
     """
     if analysis_type == 'restaurants':
-        # Contar o número de restaurantes por cidade
+        # Top 10 cidades em número de restaurantes
         result = (
-            df.groupby('city')['restaurant_id']
-            .count()
+            load_leaderboards()['cities_by_restaurants']
+            .top(selected_cities, 10)
             .reset_index(name='restaurant_count')
-            .sort_values(by='restaurant_count', ascending=False)
-            .head(10)
         )
         y_axis = "restaurant_count"
 
+    elif analysis_type == 'cuisines' and all_cuisines:
+        # Top 10 cidades em número de tipos culinários distintos, entre todas as culinárias servidas
+        counts = load_cuisine_index().distinct_count(load_data()['city'])
+        result = (
+            counts[counts.index.isin(selected_cities)]
+            .sort_values(ascending=False, kind='stable')
+            .head(10)
+            .reset_index(name='distinct_cuisines_count')
+        )
+        y_axis = "distinct_cuisines_count"
+
     elif analysis_type == 'cuisines':
-        # Contar o número de tipos culinários distintos por cidade
+        # Top 10 cidades em número de tipos culinários distintos
         result = (
-            df.groupby('city')['cuisines']
-            .nunique()
+            load_leaderboards()['cities_by_cuisines']
+            .top(selected_cities, 10)
             .reset_index(name='distinct_cuisines_count')
-            .sort_values(by='distinct_cuisines_count', ascending=False)
-            .head(10)
         )
         y_axis = "distinct_cuisines_count"
 
@@ -87,22 +90,22 @@ def top_cities_analysis(df, analysis_type):
     # Exibir o gráfico
     return fig
 
-def cities_with_rating_range(df, min_rating, max_rating):
+@memoize_figure
+def cities_with_rating_range(by_city, min_rating, max_rating):
     """
     Cria um gráfico das 5 principais cidades com média de avaliações dentro de um intervalo definido pelo usuário.
 
     Parâmetros:
-        df (pd.DataFrame): O DataFrame com os dados.
+        by_city (pd.DataFrame): As métricas por cidade das cidades selecionadas.
         min_rating (float): Avaliação mínima.
         max_rating (float): Avaliação máxima.
 
     Retorna:
         None: Exibe o gráfico no Streamlit.
     """
-    # Agrupar os dados por cidade e calcular a média de avaliação
+    # Média de avaliação por cidade
     filtered_df = (
-        df.groupby('city')['aggregate_rating']
-        .mean()
+        by_city['average_rating']
         .reset_index(name='average_rating')
     )
     
@@ -136,105 +139,122 @@ def cities_with_rating_range(df, min_rating, max_rating):
     # Exibir o gráfico
     return fig
 
-# Importando dados
-df = pd.read_csv("zomato.csv")
-df1 = df.dropna()
-
-# Configurações iniciais
-COUNTRIES = {
-    1: "India",
-    14: "Australia",
-    30: "Brazil",
-    37: "Canada",
-    94: "Indonesia",
-    148: "New Zealand",
-    162: "Philippines",
-    166: "Qatar",
-    184: "Singapore",
-    189: "South Africa",
-    191: "Sri Lanka",
-    208: "Turkey",
-    214: "United Arab Emirates",
-    215: "England",
-    216: "United States of America"
-}
-df1['country_name'] = df1['Country Code'].apply(lambda x: COUNTRIES.get(x, 'Unknown'))
-
-COLORS = {
-    "3F7E00": 'darkgreen',
-    "5BA829": 'green',
-    "9ACD32": 'lightgreen',
-    "CDD614": 'orange',
-    "FFBA00": 'red',
-    "CBCBC8": 'darkred',
-    "FF7800": 'darkred'
-}
-df1['Colors_name'] = df1['Rating color'].apply(lambda x: COLORS.get(x, 'Unknown'))
-
-# Definindo as cores e seus significados de rating
-RATING_MEANING = {
-    "darkgreen": "Excelente (4.5 - 5.0)",
-    "green": "Muito bom (4.0 - 4.5)",
-    "lightgreen": "Bom (3.5 - 4.0)",
-    "orange": "Médio (3.0 - 3.5)",
-    "red": "Ruim (2.5 - 3.0)",
-    "darkred": "Péssimo (1.5 - 2.5)",
-    "Unknown": "Desconhecido"
-}
-
-# Criando a coluna 'Rating_description' baseada na 'Colors_name'
-df1['Rating_description'] = df1['Colors_name'].apply(lambda x: RATING_MEANING.get(x, 'Desconhecido'))
-
-df2 = rename_columns(df1)
-df2['cuisines'] = df2.loc[:, "cuisines"].apply(lambda x: x.split(",")[0])
-df3 = df2.drop('switch_to_order_menu', axis=1)
-df4 = df3.drop_duplicates()
-
-# Barra lateral
-st.sidebar.markdown('# FOME ZERO!')
-st.sidebar.markdown('---')
-
-# Filtro de países
-unique_cities = df4['city'].unique()
-selected_cities = st.sidebar.multiselect(
-    "Escolha as cidades que deseja visualizar:",
-    options=unique_cities,
-    default=unique_cities  # Preseleciona todos os países
-)
-
-st.sidebar.markdown('---')
-st.sidebar.markdown('### Powered by Lucy Souza')
-
-# Filtrar o DataFrame com base nos países selecionados
-filtered_df = df4[df4['city'].isin(selected_cities)]
-
-# Layout principal
-tab1, = st.tabs(['Visão Principal'])
-
-with tab1:
-    with st.container():
-        # Gráfico: Top 10 cidades com mais restaurantes na base de dados
-        fig = top_cities_analysis(filtered_df, 'restaurants')  # Usar o DataFrame filtrado
-        st.markdown('# Top 10 cidades com mais restaurantes na base de dados')
-        st.plotly_chart(fig, use_container_width=True)
-
-    with st.container():
-        col1, col2 = st.columns(2, gap='large')
-
-        with col1:
-            # Gráfico: Cidades com média de avaliações acima de 4
-            fig = cities_with_rating_range(filtered_df, 4, 5)  # Usar o DataFrame filtrado
-            st.markdown('# Cidades com média de avaliações acima de 4')
-            st.plotly_chart(fig, use_container_width=True)
+@memoize_figure
+def cities_by_average_cost(by_city, top_n=10):
+    """
+    Cria um gráfico das cidades com maior custo médio para duas pessoas, em dólares.
+
+    Parâmetros:
+        by_city (pd.DataFrame): As métricas por cidade das cidades selecionadas.
+        top_n (int): Quantidade de cidades exibidas.
 
-        with col2:
-            # Gráfico: Cidades com média de avaliações abaixo de 2.5
-            fig = cities_with_rating_range(filtered_df, 0, 2.5)  # Usar o DataFrame filtrado
-            st.markdown('# Cidades com média de avaliação abaixo de 2.5')
+    Retorna:
+        plotly.graph_objects.Figure: O gráfico de barras.
+    """
+    # Custo médio em dólares por cidade (comparável entre países)
+    result = (
+        by_city['average_cost_for_two_usd']
+        .round(2)
+        .reset_index(name='average_cost_for_two_usd')
+        .sort_values(by='average_cost_for_two_usd', ascending=False, kind='stable')
+        .head(top_n)
+    )
+
+    fig = px.bar(
+        result,
+        x='city',
+        y='average_cost_for_two_usd',
+        text='average_cost_for_two_usd',
+        labels={'city': 'Cidades', 'average_cost_for_two_usd': 'Custo Médio para Dois (USD)'},
+        template='plotly_white',
+    )
+    fig.update_traces(textposition='outside')
+    fig.update_layout(
+        xaxis_title='Cidades',
+        yaxis_title='Custo Médio para Dois (USD)',
+        showlegend=False,
+        title_x=0.5,
+    )
+
+    return fig
+
+# Rerun cronometrado: registrado mesmo se falhar ou for interrompido
+with timer:
+    # Importando dados
+    df4 = load_data()
+    cube = load_cube()
+    timer.lap('carga')
+
+    # Barra lateral
+    st.sidebar.markdown('# FOME ZERO!')
+    st.sidebar.markdown('---')
+
+    # Filtro de países
+    unique_cities = df4['city'].unique()
+    selected_cities = st.sidebar.multiselect(
+        "Escolha as cidades que deseja visualizar:",
+        options=unique_cities,
+        default=unique_cities  # Preseleciona todos os países
+    )
+
+    # Modo de culinárias: apenas a principal ou todas as servidas por cada restaurante
+    all_cuisines = st.sidebar.checkbox(
+        "Considerar todas as culinárias de cada restaurante",
+        value=False
+    )
+
+    st.sidebar.markdown('---')
+    st.sidebar.markdown('### Powered by Lucy Souza')
+    timer.lap('barra_lateral')
+
+    # Filtrar o cubo de métricas com base nas cidades selecionadas
+    filtered_cube = filter_cube(cube, city=selected_cities)
+    selection = selection_key(selected_cities)
+
+    # Métricas por cidade em uma única agregação (via SQL com ZOMATO_SQL_AGGREGATIONS=1)
+    if SQL_AGGREGATIONS:
+        by_city = load_database().rollup('city', city=selected_cities)
+    else:
+        by_city = rollup(filtered_cube, 'city')
+    timer.lap('filtros')
+
+    # Layout principal
+    tab1, = st.tabs(['Visão Principal'])
+
+    with tab1:
+        with st.container():
+            # Gráfico: Top 10 cidades com mais restaurantes na base de dados
+            fig = top_cities_analysis(selected_cities, 'restaurants', cache_key=selection)
+            st.markdown('# Top 10 cidades com mais restaurantes na base de dados')
             st.plotly_chart(fig, use_container_width=True)
+        timer.lap('top_restaurantes')
+
+        with st.container():
+            col1, col2 = st.columns(2, gap='large')
+
+            with col1:
+                # Gráfico: Cidades com média de avaliações acima de 4
+                fig = cities_with_rating_range(by_city, 4, 5, cache_key=selection)
+                st.markdown('# Cidades com média de avaliações acima de 4')
+                st.plotly_chart(fig, use_container_width=True)
+
+            with col2:
+                # Gráfico: Cidades com média de avaliações abaixo de 2.5
+                fig = cities_with_rating_range(by_city, 0, 2.5, cache_key=selection)
+                st.markdown('# Cidades com média de avaliação abaixo de 2.5')
+                st.plotly_chart(fig, use_container_width=True)
+        timer.lap('faixas_de_avaliacao')
+
+        with st.container():
+            # Gráfico: Top 10 cidades com mais tipos culinários distintos
+            fig = top_cities_analysis(selected_cities, 'cuisines', all_cuisines=all_cuisines, cache_key=selection)
+            st.markdown('# Top 10 cidades mais restaurantes com tipos culinários distintos')
+            st.plotly_chart(fig, use_container_width=True)
+        timer.lap('top_culinarias')
 
-    with st.container():
-        # Gráfico: Top 10 cidades com mais tipos culinários distintos
-        fig = top_cities_analysis(filtered_df, 'cuisines')  # Usar o DataFrame filtrado
-        st.markdown('# Top 10 cidades mais restaurantes com tipos culinários distintos')
-        st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+        with st.container():
+            # Gráfico: Top 10 cidades com maior custo médio para dois, em dólares
+            fig = cities_by_average_cost(by_city, cache_key=selection)
+            st.markdown('# Top 10 cidades com maior custo médio para dois (USD)')
+            st.plotly_chart(fig, use_container_width=True)
+        timer.lap('custo_medio')
\ No newline at end of file
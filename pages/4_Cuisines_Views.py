@@ -9,56 +9,85 @@ from PIL import Image
 import folium
 from folium.plugins import MarkerCluster
 from streamlit_folium import folium_static
-import re
+
+from utils.cuisines import load_cuisine_index
+from utils.figures import memoize_figure, selection_key
+from utils.filters import load_filter_index
+from utils.instrumentation import RunTimer
+from utils.leaderboard import load_leaderboards
+from utils.pipeline import load_data
 
 # Configuração inicial do Streamlit
 st.set_page_config(page_title='Cuisines Views', layout='wide')
 
-# Funções
-def rename_columns(dataframe):
-    # Renomeia colunas
-    renamed_dataframe = dataframe.copy()
-
-    # Funções de transformação para as colunas
-    title = lambda x: x.title()
-    snakecase = lambda x: re.sub(r'([a-z])([A-Z])', r'\1_\2', x).lower().replace(" ", "_")
-    spaces = lambda x: x.replace(" ", "")
-
-    cols_old = [title(str(x)) for x in renamed_dataframe.columns]
-    cols_old = [spaces(x) for x in cols_old]
-    cols_new = [snakecase(x) for x in cols_old]
-
-    renamed_dataframe.columns = cols_new
-    return renamed_dataframe
+# Cronômetro das etapas deste rerun
+timer = RunTimer('Cuisines Views')
 
+# Funções
 def best_restaurants_by_cuisine(df, top_n_cuisines=5):
     """
     Encontra os melhores restaurantes com base na avaliação agregada
     para os tipos culinários mais populares.
 
     Parâmetros:
-        df (pd.DataFrame): O DataFrame com os dados.
+        df (pd.DataFrame): O DataFrame com os dados (filtrado apenas por tipo culinário).
         top_n_cuisines (int): O número de tipos culinários mais populares a considerar.
 
     Retorna:
         pd.DataFrame: DataFrame com os melhores restaurantes por tipo culinário.
     """
-    # Contar a quantidade de restaurantes por tipo culinário
+    # Contar a quantidade de restaurantes por tipo culinário (a coluna é
+    # categórica: categorias sem linhas no recorte ficam de fora)
+    cuisine_counts = df['cuisines'].value_counts()
     cuisine_counts = (
-        df['cuisines']
-        .value_counts()
+        cuisine_counts[cuisine_counts > 0]
         .head(top_n_cuisines)
         .index
     )
 
-    # Filtrar apenas os tipos culinários mais populares
-    popular_cuisines_df = df[df['cuisines'].isin(cuisine_counts)]
+    # Encontrar os melhores restaurantes (maior avaliação) por tipo culinário,
+    # nos rankings pré-computados por culinária (na ordem das categorias)
+    ranking = load_leaderboards()['restaurants_by_cuisine']
+    best_restaurants = df.loc[[
+        label for cuisine in cuisine_counts.sort_values() for label in ranking.top([cuisine], 1).index
+        if label in df.index
+    ]]
+
+    # Selecionar colunas relevantes
+    result = best_restaurants[
+        ['restaurant_name', 'cuisines', 'aggregate_rating', 'city', 'country_name']
+    ].sort_values(by='aggregate_rating', ascending=False)
+
+    return result
+
+def best_restaurants_by_all_cuisines(df, selected_cuisines, top_n_cuisines=5):
+    """
+    Encontra os melhores restaurantes para os tipos culinários selecionados mais
+    populares, considerando todas as culinárias servidas por cada restaurante.
+
+    Parâmetros:
+        df (pd.DataFrame): O DataFrame tratado completo.
+        selected_cuisines (list): Tipos culinários selecionados.
+        top_n_cuisines (int): O número de tipos culinários mais populares a considerar.
+
+    Retorna:
+        pd.DataFrame: DataFrame com os melhores restaurantes por tipo culinário.
+    """
+    cuisine_index = load_cuisine_index()
 
-    # Encontrar os melhores restaurantes (maior avaliação) por tipo culinário
-    best_restaurants = (
-        popular_cuisines_df.loc[popular_cuisines_df.groupby('cuisines')['aggregate_rating'].idxmax()]
+    # Contar a quantidade de restaurantes que servem cada tipo culinário selecionado
+    counts = cuisine_index.counts()
+    cuisine_counts = (
+        counts[counts.index.isin(selected_cuisines)]
+        .sort_values(ascending=False, kind='stable')
+        .head(top_n_cuisines)
+        .index
     )
 
+    # Encontrar o melhor restaurante (maior avaliação) entre os que servem cada tipo culinário
+    best = cuisine_index.best(df['aggregate_rating'], cuisine_counts.sort_values())
+    best_restaurants = df.iloc[best.to_numpy()].assign(cuisines=best.index.to_numpy())
+
     # Selecionar colunas relevantes
     result = best_restaurants[
         ['restaurant_name', 'cuisines', 'aggregate_rating', 'city', 'country_name']
@@ -66,46 +95,59 @@ def best_restaurants_by_cuisine(df, top_n_cuisines=5):
 
     return result
 
-def top_10_restaurants(df):
+def top_10_restaurants(df, countries):
     """
     Função para encontrar os top 10 restaurantes com maior média de avaliação (aggregate_rating).
     
     Parâmetros:
-        df (pd.DataFrame): O DataFrame com os dados de restaurantes.
+        df (pd.DataFrame): O DataFrame tratado completo.
+        countries (list): Países selecionados.
     
     Retorna:
         pd.DataFrame: DataFrame com os top 10 restaurantes por avaliação.
     """
-    # Ordenar o DataFrame pela coluna 'aggregate_rating' em ordem decrescente
-    top_10_df = df.sort_values(by='aggregate_rating', ascending=False).head(10)
+    # Mesclar os rankings pré-computados dos países selecionados
+    ranking = load_leaderboards()['restaurants_by_country'].top(countries, 10)
+    top_10_df = df.loc[ranking.index]
     
     # Selecionando colunas relevantes para exibir
     top_10_df = top_10_df[['restaurant_name', 'country_name', 'city', 'aggregate_rating']]
     
     return top_10_df
 
-def top_10_cuisines_by_rating(df, top_or_bottom='top'):
+@memoize_figure
+def top_10_cuisines_by_rating(selected_cuisines, top_or_bottom='top', all_cuisines=False):
     """
     Calcula os 10 melhores ou 10 piores tipos culinários com base na média de avaliação (aggregate_rating)
     e gera um gráfico de barras usando Plotly Express.
     
     Parâmetros:
-        df (pd.DataFrame): O DataFrame com os dados de restaurantes.
+        selected_cuisines (list): Tipos culinários selecionados.
         top_or_bottom (str): Se 'top', retorna os 10 melhores tipos culinários. Se 'bottom', retorna os 10 piores.
+        all_cuisines (bool): Se True, a média considera todos os restaurantes que servem cada tipo culinário.
     
     Retorna:
         fig: Gráfico de barras Plotly.
     """
-    # Agrupar por tipo de culinária e calcular a média de aggregate_rating
-    cuisine_rating = df.groupby('cuisines')['aggregate_rating'].mean().reset_index()
-    
-    # Ordenar os valores com base na média de aggregate_rating
-    if top_or_bottom == 'top':
-        top_10 = cuisine_rating.sort_values(by='aggregate_rating', ascending=False).head(10)
-    elif top_or_bottom == 'bottom':
-        top_10 = cuisine_rating.sort_values(by='aggregate_rating', ascending=True).head(10)
-    else:
+    if top_or_bottom not in ('top', 'bottom'):
         raise ValueError("O parâmetro 'top_or_bottom' deve ser 'top' ou 'bottom'")
+    ascending = top_or_bottom == 'bottom'
+
+    if all_cuisines:
+        # Média de aggregate_rating entre todos os restaurantes que servem cada tipo de culinária
+        ratings = load_cuisine_index().mean(load_data()['aggregate_rating'])
+        top_10 = (
+            ratings[ratings.index.isin(selected_cuisines)]
+            .sort_values(ascending=ascending, kind='stable')
+            .head(10)
+            .rename_axis('cuisines')
+            .reset_index(name='aggregate_rating')
+        )
+    else:
+        # Ranking pré-computado da média de aggregate_rating por tipo de culinária,
+        # mesclando os rankings dos tipos selecionados
+        ranking = load_leaderboards()['cuisines_by_rating']
+        top_10 = ranking.top(selected_cuisines, 10, ascending=ascending).reset_index(name='aggregate_rating')
     
     # Criar o gráfico de barras com Plotly Express
     fig = px.bar(
@@ -121,105 +163,76 @@ def top_10_cuisines_by_rating(df, top_or_bottom='top'):
     # Exibir o gráfico
     return fig
 
-# Importando dados
-df = pd.read_csv("zomato.csv")
-df1 = df.dropna()
-
-# Configurações iniciais
-COUNTRIES = {
-    1: "India",
-    14: "Australia",
-    30: "Brazil",
-    37: "Canada",
-    94: "Indonesia",
-    148: "New Zealand",
-    162: "Philippines",
-    166: "Qatar",
-    184: "Singapore",
-    189: "South Africa",
-    191: "Sri Lanka",
-    208: "Turkey",
-    214: "United Arab Emirates",
-    215: "England",
-    216: "United States of America"
-}
-df1['country_name'] = df1['Country Code'].apply(lambda x: COUNTRIES.get(x, 'Unknown'))
-
-COLORS = {
-    "3F7E00": 'darkgreen',
-    "5BA829": 'green',
-    "9ACD32": 'lightgreen',
-    "CDD614": 'orange',
-    "FFBA00": 'red',
-    "CBCBC8": 'darkred',
-    "FF7800": 'darkred'
-}
-df1['Colors_name'] = df1['Rating color'].apply(lambda x: COLORS.get(x, 'Unknown'))
-
-# Definindo as cores e seus significados de rating
-RATING_MEANING = {
-    "darkgreen": "Excelente (4.5 - 5.0)",
-    "green": "Muito bom (4.0 - 4.5)",
-    "lightgreen": "Bom (3.5 - 4.0)",
-    "orange": "Médio (3.0 - 3.5)",
-    "red": "Ruim (2.5 - 3.0)",
-    "darkred": "Péssimo (1.5 - 2.5)",
-    "Unknown": "Desconhecido"
-}
-
-# Criando a coluna 'Rating_description' baseada na 'Colors_name'
-df1['Rating_description'] = df1['Colors_name'].apply(lambda x: RATING_MEANING.get(x, 'Desconhecido'))
-
-df2 = rename_columns(df1)
-df2['cuisines'] = df2.loc[:, "cuisines"].apply(lambda x: x.split(",")[0])
-df3 = df2.drop('switch_to_order_menu', axis=1)
-df4 = df3.drop_duplicates()
-
-# Barra lateral
-st.sidebar.markdown('# FOME ZERO!')
-st.sidebar.markdown('---')
-
-# 1. Filtro de países
-unique_countries = df4['country_name'].unique()
-selected_countries = st.sidebar.multiselect(
-    "Escolha os países que deseja visualizar os restaurantes:",
-    options=unique_countries,
-    default=unique_countries  # Preseleciona todos os países
-)
-
-# 2. Caixa de seleção para o tipo de culinária
-unique_cuisines = df4['cuisines'].dropna().unique()
-cuisine_selected = st.sidebar.multiselect(
-    "Escolha o tipo de culinária",
-    options=unique_cuisines,
-    default=['Home-made', 'BBQ', 'Japanese', 'Brazilian', 'Arabian', 'American', 'Italian']  # Preseleciona todos os países
-)
-
-st.sidebar.markdown('---')
-st.sidebar.markdown('### Powered by Lucy Souza')
-
-# Filtrar o DataFrame com base nos países selecionados
-filtered_df_country = df4[df4['country_name'].isin(selected_countries)]
-
-# Filtro para o tipo de culinária selecionado
-filtered_df_cuisines = df4[df4['cuisines'].isin(cuisine_selected)]
-
-# Layout principal
-tab1, = st.tabs(['Visão Principal'])
-
-with tab1:
-    with st.container():
-        melhor = best_restaurants_by_cuisine(filtered_df_cuisines, top_n_cuisines=5)
-        st.write("# Melhores restaurantes dos principais tipos culinários", melhor)
-
-    with st.container():
-        top = top_10_restaurants(filtered_df_country)
-        st.write("# Top 10 restaurantes e culinárias", top)
-
-    with st.container():
-        fig = top_10_cuisines_by_rating(filtered_df_cuisines, top_or_bottom='top')
-        st.plotly_chart( fig, use_container_width=True)
-
-    with st.container():
-        fig = top_10_cuisines_by_rating(filtered_df_cuisines, top_or_bottom='bottom')
-        st.plotly_chart( fig, use_container_width=True)
\ No newline at end of file
+# Rerun cronometrado: registrado mesmo se falhar ou for interrompido
+with timer:
+    # Importando dados
+    df4 = load_data()
+    filter_index = load_filter_index()
+    timer.lap('carga')
+
+    # Barra lateral
+    st.sidebar.markdown('# FOME ZERO!')
+    st.sidebar.markdown('---')
+
+    # 1. Filtro de países
+    unique_countries = df4['country_name'].unique()
+    selected_countries = st.sidebar.multiselect(
+        "Escolha os países que deseja visualizar os restaurantes:",
+        options=unique_countries,
+        default=unique_countries  # Preseleciona todos os países
+    )
+
+    # 2. Modo de culinárias: apenas a principal ou todas as servidas por cada restaurante
+    all_cuisines = st.sidebar.checkbox(
+        "Considerar todas as culinárias de cada restaurante",
+        value=False
+    )
+
+    # 3. Caixa de seleção para o tipo de culinária
+    if all_cuisines:
+        unique_cuisines = load_cuisine_index().cuisines
+    else:
+        unique_cuisines = df4['cuisines'].dropna().unique()
+    cuisine_selected = st.sidebar.multiselect(
+        "Escolha o tipo de culinária",
+        options=unique_cuisines,
+        default=['Home-made', 'BBQ', 'Japanese', 'Brazilian', 'Arabian', 'American', 'Italian']  # Preseleciona todos os países
+    )
+
+    st.sidebar.markdown('---')
+    st.sidebar.markdown('### Powered by Lucy Souza')
+    timer.lap('barra_lateral')
+
+    # Filtro para o tipo de culinária selecionado (no modo de todas as culinárias,
+    # a tabela de associação seleciona os restaurantes de cada tipo)
+    if not all_cuisines:
+        filtered_df_cuisines = filter_index.filter(df4, cuisines=cuisine_selected)
+    cuisine_selection = selection_key(cuisine_selected)
+    timer.lap('filtros')
+
+    # Layout principal
+    tab1, = st.tabs(['Visão Principal'])
+
+    with tab1:
+        with st.container():
+            if all_cuisines:
+                melhor = best_restaurants_by_all_cuisines(df4, cuisine_selected, top_n_cuisines=5)
+            else:
+                melhor = best_restaurants_by_cuisine(filtered_df_cuisines, top_n_cuisines=5)
+            st.write("# Melhores restaurantes dos principais tipos culinários", melhor)
+        timer.lap('melhores_restaurantes')
+
+        with st.container():
+            top = top_10_restaurants(df4, selected_countries)
+            st.write("# Top 10 restaurantes e culinárias", top)
+        timer.lap('top_restaurantes')
+
+        with st.container():
+            fig = top_10_cuisines_by_rating(cuisine_selected, top_or_bottom='top', all_cuisines=all_cuisines, cache_key=cuisine_selection)
+            st.plotly_chart( fig, use_container_width=True)
+        timer.lap('top_culinarias')
+
+        with st.container():
+            fig = top_10_cuisines_by_rating(cuisine_selected, top_or_bottom='bottom', all_cuisines=all_cuisines, cache_key=cuisine_selection)
+            st.plotly_chart( fig, use_container_width=True)
+        timer.lap('piores_culinarias')
\ No newline at end of file
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+# Importação de bibliotecas
+import pandas as pd
+import numpy as np
+import streamlit as st
+import streamlit.components.v1 as components
+
+from utils.instrumentation import RunTimer
+from utils.maps import render_map_html
+from utils.pipeline import load_data
+from utils.spatial import load_city_centers, load_spatial_index
+
+# Configuração inicial do Streamlit
+st.set_page_config(page_title='Nearby Views', layout='wide')
+
+# Cronômetro das etapas deste rerun
+timer = RunTimer('Nearby Views')
+
+# Funções
+def nearby_restaurants(df, spatial_index, latitude, longitude, radius_km, top_n=10):
+    """
+    Encontra os restaurantes mais bem avaliados a até radius_km de um ponto.
+
+    Parâmetros:
+        df (pd.DataFrame): O DataFrame tratado completo.
+        spatial_index (SpatialIndex): Índice espacial do mesmo dataset (utils.spatial).
+        latitude (float): Latitude do ponto de referência.
+        longitude (float): Longitude do ponto de referência.
+        radius_km (float): Raio da busca, em km.
+        top_n (int): Quantidade de restaurantes retornados.
+
+    Retorna:
+        pd.DataFrame: Restaurantes por avaliação (desempate pela distância), com a distância em km.
+    """
+    # Apenas as linhas das células próximas ao ponto são consultadas
+    distances = spatial_index.query(latitude, longitude, radius_km)
+    nearby = df.iloc[distances.index].assign(distance_km=distances.round(2).to_numpy())
+
+    # Ordenar por avaliação e, em caso de empate, pela distância
+    result = nearby.sort_values(
+        by=['aggregate_rating', 'distance_km'], ascending=[False, True], kind='stable'
+    ).head(top_n)
+
+    return result
+
+# Rerun cronometrado: registrado mesmo se falhar ou for interrompido
+with timer:
+    # Importando dados
+    df4 = load_data()
+    spatial_index = load_spatial_index()
+    centers = load_city_centers()
+    timer.lap('carga')
+
+    # Barra lateral
+    st.sidebar.markdown('# FOME ZERO!')
+    st.sidebar.markdown('---')
+
+    # Ponto de referência: centro de uma cidade ou coordenadas informadas
+    reference = st.sidebar.radio(
+        "Buscar restaurantes próximos de:",
+        options=['Centro de uma cidade', 'Coordenadas']
+    )
+
+    if reference == 'Centro de uma cidade':
+        city = st.sidebar.selectbox("Escolha a cidade:", options=centers.index)
+        latitude, longitude = centers.loc[city, ['latitude', 'longitude']]
+    else:
+        latitude = st.sidebar.number_input("Latitude", min_value=-90.0, max_value=90.0, value=-22.9068, format="%.4f")
+        longitude = st.sidebar.number_input("Longitude", min_value=-180.0, max_value=180.0, value=-43.1729, format="%.4f")
+
+    radius_km = st.sidebar.slider("Raio da busca (km)", min_value=1, max_value=100, value=5)
+    top_n = st.sidebar.slider("Quantidade de restaurantes", min_value=5, max_value=50, value=10)
+
+    st.sidebar.markdown('---')
+    st.sidebar.markdown('### Powered by Lucy Souza')
+    timer.lap('barra_lateral')
+
+    # Consulta por raio no índice espacial
+    result = nearby_restaurants(df4, spatial_index, latitude, longitude, radius_km, top_n)
+    timer.lap('consulta')
+
+    # Layout principal
+    tab1, = st.tabs(['Visão Principal'])
+
+    with tab1:
+        with st.container():
+            st.markdown(f'# Restaurantes mais bem avaliados a até {radius_km} km')
+            st.caption(f'Ponto de referência: {latitude:.4f}, {longitude:.4f}')
+
+            if result.empty:
+                st.warning("Nenhum restaurante encontrado no raio especificado.")
+            else:
+                st.dataframe(
+                    result[['restaurant_name', 'city', 'cuisines', 'aggregate_rating', 'distance_km']],
+                    hide_index=True,
+                    use_container_width=True
+                )
+        timer.lap('tabela')
+
+        with st.container():
+            if not result.empty:
+                components.html(render_map_html(result, 'fast'), width=1024, height=600 + 10)
+        timer.lap('mapa')
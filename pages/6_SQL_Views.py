@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+# Importação de bibliotecas
+import pandas as pd
+import streamlit as st
+
+from utils.instrumentation import RunTimer
+from utils.sql import MAX_ROWS, QUERY_TIMEOUT, SQL_ENGINE, TABLE_NAME, load_database, run_query
+
+# Configuração inicial do Streamlit
+st.set_page_config(page_title='SQL Views', layout='wide')
+
+# Cronômetro das etapas deste rerun
+timer = RunTimer('SQL Views')
+
+# Consulta exibida ao abrir a página
+DEFAULT_QUERY = f"""SELECT city, country_name, COUNT(*) AS restaurants, ROUND(AVG(aggregate_rating), 2) AS average_rating
+FROM {TABLE_NAME}
+GROUP BY city, country_name
+ORDER BY restaurants DESC, city
+LIMIT 10"""
+
+# Rerun cronometrado: registrado mesmo se falhar ou for interrompido
+with timer:
+    # Importando dados
+    database = load_database()
+    timer.lap('carga')
+
+    # Barra lateral
+    st.sidebar.markdown('# FOME ZERO!')
+    st.sidebar.markdown('---')
+    st.sidebar.caption(f'Motor SQL: {SQL_ENGINE}')
+    st.sidebar.caption(f'Resultados limitados a {MAX_ROWS} linhas.')
+    st.sidebar.caption(f'Tempo limite por consulta: {QUERY_TIMEOUT:g} s.')
+    st.sidebar.markdown('---')
+    st.sidebar.markdown('### Powered by Lucy Souza')
+    timer.lap('barra_lateral')
+
+    # Layout principal
+    st.markdown(f'# Consultas SQL sobre a tabela `{TABLE_NAME}`')
+
+    with st.expander('Colunas da tabela'):
+        st.dataframe(database.schema(), hide_index=True, use_container_width=True)
+
+    query = st.text_area('Consulta (apenas SELECT):', value=DEFAULT_QUERY, height=160)
+
+    # Executar a consulta; erros de sintaxe, comandos de escrita e o tempo limite viram mensagens
+    result, truncated, error = pd.DataFrame(), False, None
+    try:
+        result, truncated = run_query(query)
+    except Exception as exc:  # Erros do motor SQL variam entre DuckDB e SQLite
+        error = str(exc)
+    timer.lap('consulta')
+
+    with st.container():
+        if error is not None:
+            st.error(error)
+        else:
+            if truncated:
+                st.warning(f"O resultado foi limitado às primeiras {MAX_ROWS} linhas.")
+            st.caption(f'{len(result)} linhas')
+            st.dataframe(result, hide_index=True, use_container_width=True)
+    timer.lap('tabela')
@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+"""Módulos compartilhados pelas páginas do Fome Zero Growth Dashboard."""
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+Motor de consultas das perguntas de negócio (perguntas_de_negocios.ipynb).
+
+Responde em lote as perguntas das visões geral, país, cidade, culinária e
+restaurante sobre o dataset tratado, sem Streamlit. As condições usadas
+pelas perguntas (faixa de preço 4, entrega, reservas, notas...) viram
+colunas 0/1 uma única vez; cada nível de agrupamento é então percorrido por
+um único groupby com todas as agregações nomeadas, e as respostas são
+lidas dessas tabelas.
+
+O resultado é um dict serializável em JSON, emitido pela CLI:
+
+    python -m utils.analytics [--csv zomato.csv] [--output respostas.json]
+"""
+
+# Importação de bibliotecas
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from utils.pipeline import DATA_PATH, load_data
+
+# Níveis de agrupamento e a coluna de cada um
+GROUP_LEVELS = {
+    'country': 'country_name',
+    'city': 'city',
+    'cuisine': 'cuisines',
+}
+
+# Agregações nomeadas calculadas em cada nível (as que usam a própria
+# coluna do nível são omitidas)
+AGGREGATIONS = {
+    'restaurants': ('restaurant_id', 'size'),
+    'cities': ('city', 'nunique'),
+    'cuisines': ('cuisines', 'nunique'),
+    'votes': ('votes', 'sum'),
+    'votes_mean': ('votes', 'mean'),
+    'rating_mean': ('aggregate_rating', 'mean'),
+    'cost_mean': ('average_cost_for_two', 'mean'),
+    'cost_usd_mean': ('average_cost_for_two_usd', 'mean'),
+    'price_4': ('price_4', 'sum'),
+    'delivering': ('is_delivering_now', 'sum'),
+    'booking': ('has_table_booking', 'sum'),
+    'online': ('has_online_delivery', 'sum'),
+    'online_delivering': ('online_delivering', 'sum'),
+    'rating_above_4': ('rating_above_4', 'sum'),
+    'rating_below_2_5': ('rating_below_2_5', 'sum'),
+    'best_row': ('aggregate_rating', 'idxmax'),
+    'worst_row': ('aggregate_rating', 'idxmin'),
+}
+
+# Culinárias das perguntas de melhor e pior restaurante
+CUISINE_QUESTIONS = ['Italian', 'American', 'Arabian', 'Japanese', 'Home-made']
+
+
+# Funções
+def _plain(value):
+    # Converte escalares numpy/pandas em tipos JSON (NaN vira None)
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+def _top(table, column, largest=True):
+    # Grupo com o maior (ou menor) valor da coluna; empates ficam com o primeiro grupo
+    index = table[column].idxmax() if largest else table[column].idxmin()
+    return {'name': _plain(index), 'value': _plain(table.at[index, column])}
+
+
+def _restaurant(df, label, column):
+    # Nome e valor de um restaurante identificado pelo rótulo da linha
+    return {'name': _plain(df.at[label, 'restaurant_name']), 'value': _plain(df.at[label, column])}
+
+
+def indicator_columns(df):
+    """
+    Acrescenta as colunas 0/1 das condições usadas pelas perguntas.
+
+    Parâmetros:
+        df (pd.DataFrame): O DataFrame tratado.
+
+    Retorna:
+        pd.DataFrame: Cópia rasa do DataFrame com as colunas de indicadores.
+    """
+    return df.assign(
+        price_4=(df['price_range'] == 4).astype('int64'),
+        online_delivering=((df['has_online_delivery'] == 1) & (df['is_delivering_now'] == 1)).astype('int64'),
+        rating_above_4=(df['aggregate_rating'] >= 4).astype('int64'),
+        rating_below_2_5=(df['aggregate_rating'] <= 2.5).astype('int64'),
+    )
+
+
+def summarize(df, column):
+    """
+    Calcula todas as agregações de um nível em um único groupby.
+
+    Parâmetros:
+        df (pd.DataFrame): O DataFrame tratado, com as colunas de indicador_columns.
+        column (str): Coluna de agrupamento.
+
+    Retorna:
+        pd.DataFrame: Uma linha por grupo, com uma coluna por agregação.
+    """
+    aggregations = {name: spec for name, spec in AGGREGATIONS.items() if spec[0] != column}
+    return df.groupby(column, observed=True).agg(**aggregations)
+
+
+def overview_answers(df):
+    # Visão geral: totais do dataset
+    return {
+        'restaurants': df['restaurant_id'].nunique(),
+        'countries': df['country_code'].nunique(),
+        'cities': df['city'].nunique(),
+        'votes': _plain(df['votes'].sum()),
+        'cuisines': df['cuisines'].nunique(),
+    }
+
+
+def country_answers(table):
+    # Visão país, a partir do resumo por país
+    return {
+        'most_cities': _top(table, 'cities'),
+        'most_restaurants': _top(table, 'restaurants'),
+        'most_price_range_4': _top(table, 'price_4'),
+        'most_cuisines': _top(table, 'cuisines'),
+        'most_votes': _top(table, 'votes'),
+        'most_delivering': _top(table, 'delivering'),
+        'most_table_booking': _top(table, 'booking'),
+        'highest_votes_mean': _top(table, 'votes_mean'),
+        'highest_rating_mean': _top(table, 'rating_mean'),
+        'lowest_rating_mean': _top(table, 'rating_mean', largest=False),
+        'average_cost_for_two': {
+            country: {'local': _plain(row.cost_mean), 'usd': _plain(row.cost_usd_mean)}
+            for country, row in table.iterrows()
+        },
+    }
+
+
+def city_answers(table):
+    # Visão cidade, a partir do resumo por cidade (custos em dólares)
+    return {
+        'most_restaurants': _top(table, 'restaurants'),
+        'most_rating_above_4': _top(table, 'rating_above_4'),
+        'most_rating_below_2_5': _top(table, 'rating_below_2_5'),
+        'highest_cost_usd_mean': _top(table, 'cost_usd_mean'),
+        'most_cuisines': _top(table, 'cuisines'),
+        'most_table_booking': _top(table, 'booking'),
+        'most_delivering': _top(table, 'delivering'),
+        'most_online_delivery': _top(table, 'online'),
+    }
+
+
+def cuisine_answers(df, table, cuisines=CUISINE_QUESTIONS):
+    # Visão culinária, a partir do resumo por culinária (custos em dólares)
+    answers = {
+        cuisine: {
+            'best': _restaurant(df, table.at[cuisine, 'best_row'], 'aggregate_rating'),
+            'worst': _restaurant(df, table.at[cuisine, 'worst_row'], 'aggregate_rating'),
+        }
+        for cuisine in cuisines if cuisine in table.index
+    }
+    return {
+        'best_and_worst_restaurants': answers,
+        'highest_cost_usd_mean': _top(table, 'cost_usd_mean'),
+        'highest_rating_mean': _top(table, 'rating_mean'),
+        'most_online_delivering': _top(table, 'online_delivering'),
+    }
+
+
+def _filtered_restaurant(df, mask, column, largest=True):
+    # Restaurante com o maior (ou menor) valor da coluna entre as linhas filtradas; None se nenhuma linha
+    values = df.loc[mask, column]
+    if values.empty:
+        return None
+    return _restaurant(df, values.idxmax() if largest else values.idxmin(), column)
+
+
+def restaurant_answers(df):
+    # Visão restaurante: extremos do dataset e comparações entre grupos
+    online = df.groupby('has_online_delivery')['votes'].mean()
+    booking = df.groupby('has_table_booking')['average_cost_for_two_usd'].mean()
+    brazilian = df['cuisines'] == 'Brazilian'
+    usa = df['country_name'] == 'United States of America'
+    usa_cost = {
+        cuisine: _plain(df.loc[usa & (df['cuisines'] == cuisine), 'average_cost_for_two_usd'].mean())
+        for cuisine in ('Japanese', 'BBQ')
+    }
+    return {
+        'most_votes': _restaurant(df, df['votes'].idxmax(), 'votes'),
+        'highest_rating': _restaurant(df, df['aggregate_rating'].idxmax(), 'aggregate_rating'),
+        'highest_cost_usd': _restaurant(df, df['average_cost_for_two_usd'].idxmax(), 'average_cost_for_two_usd'),
+        'brazilian_lowest_rating': _filtered_restaurant(df, brazilian, 'aggregate_rating', largest=False),
+        'brazilian_in_brazil_highest_rating': _filtered_restaurant(df, brazilian & (df['country_name'] == 'Brazil'), 'aggregate_rating'),
+        'votes_mean_by_online_delivery': {str(key): _plain(value) for key, value in online.items()},
+        'cost_usd_mean_by_table_booking': {str(key): _plain(value) for key, value in booking.items()},
+        'usa_cost_usd_mean_japanese_vs_bbq': usa_cost,
+    }
+
+
+def answer_questions(df, cuisines=CUISINE_QUESTIONS):
+    """
+    Responde todas as perguntas de negócio sobre o dataset tratado.
+
+    Parâmetros:
+        df (pd.DataFrame): O DataFrame tratado.
+        cuisines (list): Culinárias das perguntas de melhor e pior restaurante.
+
+    Retorna:
+        dict: Respostas por visão, serializáveis em JSON.
+    """
+    rows = indicator_columns(df)
+    tables = {level: summarize(rows, column) for level, column in GROUP_LEVELS.items()}
+
+    return {
+        'dataset': {'rows': len(df)},
+        'overview': overview_answers(df),
+        'country': country_answers(tables['country']),
+        'city': city_answers(tables['city']),
+        'cuisine': cuisine_answers(df, tables['cuisine'], cuisines),
+        'restaurant': restaurant_answers(df),
+    }
+
+
+def main(argv=None):
+    # CLI para o relatório noturno: respostas em JSON
+    parser = argparse.ArgumentParser(description="Responde as perguntas de negócio e emite JSON.")
+    parser.add_argument("--csv", default=DATA_PATH, help="CSV de origem (padrão: zomato.csv)")
+    parser.add_argument("--output", help="Arquivo de saída (padrão: saída padrão)")
+    parser.add_argument("--cuisines", nargs="+", default=CUISINE_QUESTIONS,
+                        help="Culinárias das perguntas de melhor e pior restaurante")
+    args = parser.parse_args(argv)
+
+    answers = answer_questions(load_data(args.csv), args.cuisines)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(answers, file, ensure_ascii=False, indent=2)
+    else:
+        json.dump(answers, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+Cubo de métricas pré-agregadas por país × cidade × culinária × faixa de preço.
+
+Cada célula guarda somas e contagens aditivas, de forma que qualquer
+combinação de filtros de país/cidade/culinária é respondida somando
+células, sem reprocessar os restaurantes a cada rerun. Linhas acrescentadas
+ao dataset são incorporadas somando o cubo delas ao cubo atual.
+"""
+
+# Importação de bibliotecas
+import pandas as pd
+
+from utils.pipeline import DATA_PATH, load_artifact
+
+# Dimensões do cubo
+CUBE_KEYS = ['country_name', 'city', 'cuisines', 'price_range']
+
+# aggregate_rating tem uma casa decimal: a soma é guardada em décimos
+# (inteiro), o que a torna exata e independente da ordem das células
+RATING_SCALE = 10
+
+# Custos em dólares têm duas casas decimais: a soma é guardada em centavos
+USD_SCALE = 100
+
+# Mensagem do erro quando o dataset repete restaurant_id
+DUPLICATE_ID_ERROR = "O cubo exige restaurant_id único: a soma de 'restaurant_count' entre células contaria o mesmo restaurante mais de uma vez."
+
+# Medidas aditivas de cada célula ('rating_sum' em décimos de ponto,
+# 'cost_usd_sum' em centavos de dólar)
+MEASURES = [
+    'count', 'restaurant_count', 'votes_sum',
+    'rating_sum', 'rating_count', 'cost_sum', 'cost_count',
+    'cost_usd_sum', 'cost_usd_count'
+]
+
+
+# Funções
+def build_cube(df):
+    """
+    Constrói o cubo a partir do DataFrame tratado.
+
+    'restaurant_count' é o número de restaurant_id distintos da célula. A
+    soma entre células só é exata se nenhum restaurant_id aparecer em mais de
+    uma linha (o drop_duplicates do pipeline remove apenas linhas idênticas),
+    por isso a unicidade é verificada aqui e um ValueError é levantado caso
+    contrário.
+
+    'first_row' é a posição da primeira linha da célula no dataset e permite
+    reproduzir agregações do tipo first() (ex.: cor representativa).
+
+    Parâmetros:
+        df (pd.DataFrame): O DataFrame tratado.
+
+    Retorna:
+        pd.DataFrame: Uma linha por célula não vazia, com chaves e medidas.
+    """
+    if not df['restaurant_id'].is_unique:
+        raise ValueError(DUPLICATE_ID_ERROR)
+
+    rows = df.assign(
+        first_row=range(len(df)),
+        rating_scaled=(df['aggregate_rating'] * RATING_SCALE).round().astype('int64'),
+        cost_usd_scaled=(df['average_cost_for_two_usd'] * USD_SCALE).round().fillna(0).astype('int64'),
+    )
+
+    cube = (
+        rows.groupby(CUBE_KEYS, observed=True)
+        .agg(
+            count=('restaurant_id', 'size'),
+            restaurant_count=('restaurant_id', 'nunique'),
+            votes_sum=('votes', 'sum'),
+            rating_sum=('rating_scaled', 'sum'),
+            rating_count=('aggregate_rating', 'count'),
+            cost_sum=('average_cost_for_two', 'sum'),
+            cost_count=('average_cost_for_two', 'count'),
+            cost_usd_sum=('cost_usd_scaled', 'sum'),
+            cost_usd_count=('average_cost_for_two_usd', 'count'),
+            first_row=('first_row', 'min'),
+            rating_color=('rating_color', 'first'),
+        )
+        .reset_index()
+    )
+
+    return cube
+
+
+def update_cube(cube, df, delta, start):
+    """
+    Incorpora ao cubo as linhas acrescentadas ao final do dataset.
+
+    O resultado é igual ao build_cube do dataset atualizado, com custo
+    proporcional às linhas novas e à quantidade de células (mais a checagem
+    de que as linhas novas não repetem restaurant_id do dataset anterior).
+
+    Parâmetros:
+        cube (pd.DataFrame): O cubo do dataset antes das linhas novas.
+        df (pd.DataFrame): O dataset atualizado.
+        delta (pd.DataFrame): As linhas acrescentadas.
+        start (int): Posição da primeira linha acrescentada.
+
+    Retorna:
+        pd.DataFrame: O cubo atualizado.
+    """
+    if delta['restaurant_id'].isin(df['restaurant_id'].iloc[:start]).any():
+        raise ValueError(DUPLICATE_ID_ERROR)
+
+    delta_cube = build_cube(delta)
+    delta_cube['first_row'] += start
+
+    # Mesmas categorias nos dois cubos (as do dataset atualizado)
+    cube = cube.copy(deep=False)
+    for coluna in cube.columns[[isinstance(dtype, pd.CategoricalDtype) for dtype in cube.dtypes]]:
+        cube[coluna] = cube[coluna].cat.set_categories(df[coluna].cat.categories)
+        delta_cube[coluna] = delta_cube[coluna].cat.set_categories(df[coluna].cat.categories)
+
+    # Células do cubo atual vêm antes: 'first' mantém a cor da primeira linha
+    combined = pd.concat([cube, delta_cube], ignore_index=True).sort_values('first_row', kind='stable')
+    grouped = combined.groupby(CUBE_KEYS, observed=True)
+
+    updated = grouped[MEASURES].sum()
+    updated['first_row'] = grouped['first_row'].min()
+    updated['rating_color'] = grouped['rating_color'].first()
+
+    return updated.reset_index()[cube.columns]
+
+
+def load_cube(path=DATA_PATH):
+    # Cubo do dataset atual, construído uma única vez por versão do CSV
+    return load_artifact('metrics_cube', build_cube, path, updater=update_cube)
+
+
+def filter_cube(cube, **filters):
+    """
+    Seleciona as células que atendem aos filtros informados.
+
+    Parâmetros:
+        cube (pd.DataFrame): O cubo de métricas.
+        **filters: Dimensão -> valores aceitos (ex.: country_name=['Brazil']).
+
+    Retorna:
+        pd.DataFrame: As células selecionadas.
+    """
+    mask = pd.Series(True, index=cube.index)
+    for coluna, valores in filters.items():
+        mask &= cube[coluna].isin(valores)
+    return cube[mask]
+
+
+def rollup(cube, by):
+    """
+    Soma as células do cubo por uma ou mais dimensões.
+
+    Além das medidas aditivas, retorna as médias de avaliação e de custo
+    (na moeda local e em dólares) e a
+    'rating_color' da primeira linha do grupo, na mesma ordem de um groupby.
+
+    Parâmetros:
+        cube (pd.DataFrame): O cubo (ou um recorte dele).
+        by (str | list): Dimensão(ões) de agrupamento.
+
+    Retorna:
+        pd.DataFrame: Uma linha por grupo, indexada pelas dimensões.
+    """
+    ordered = cube.sort_values('first_row', kind='stable')
+    grouped = ordered.groupby(by, observed=True)
+
+    result = grouped[MEASURES].sum()
+    result['rating_color'] = grouped['rating_color'].first()
+    result['average_rating'] = (result['rating_sum'] / RATING_SCALE) / result['rating_count']
+    result['average_cost_for_two'] = result['cost_sum'] / result['cost_count']
+    result['average_cost_for_two_usd'] = (result['cost_usd_sum'] / USD_SCALE) / result['cost_usd_count']
+
+    return result
+
+
+def distinct_count(cube, by, column):
+    """
+    Conta os valores distintos de uma dimensão dentro de cada grupo.
+
+    Parâmetros:
+        cube (pd.DataFrame): O cubo (ou um recorte dele).
+        by (str): Dimensão de agrupamento.
+        column (str): Dimensão cujos valores distintos são contados.
+
+    Retorna:
+        pd.Series: Quantidade de valores distintos por grupo.
+    """
+    return cube.groupby(by, observed=True)[column].nunique()
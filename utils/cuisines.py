@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+Tabela de associação restaurante x culinária (modo "todas as culinárias").
+
+O dataset tratado guarda em 'cuisines' apenas a culinária principal de cada
+restaurante; a lista completa fica em 'all_cuisines'. Este módulo constrói,
+uma única vez por versão do dataset, a tabela de associação entre posições
+de linhas e códigos inteiros de culinária nos dois sentidos, no formato CSR:
+
+- por restaurante: as culinárias de cada linha (na ordem da lista);
+- por culinária: as posições ordenadas das linhas que a servem.
+
+Contagens, médias e filtros sobre todas as culinárias viram bincounts e
+fatias desses arrays, sem explode do DataFrame a cada rerun. A lista de cada
+valor distinto de 'all_cuisines' é separada uma única vez.
+"""
+
+# Importação de bibliotecas
+import numpy as np
+import pandas as pd
+
+from utils.pipeline import DATA_PATH, load_artifact
+
+
+# Funções
+def split_cuisines(value):
+    # Culinárias distintas de uma lista separada por vírgulas, na ordem original
+    return list(dict.fromkeys(token.strip() for token in str(value).split(',') if token.strip()))
+
+
+def _associate(values):
+    """
+    Expande uma coluna de listas de culinárias em pares (linha, culinária).
+
+    Parâmetros:
+        values (pd.Series): Coluna 'all_cuisines'.
+
+    Retorna:
+        tuple: (culinárias encontradas, ordenadas, deslocamentos por linha,
+        códigos das culinárias de cada par).
+    """
+    values = values.astype('category')
+    lists = [split_cuisines(value) for value in values.cat.categories]
+    cuisines = pd.Index(sorted({cuisine for cuisine_list in lists for cuisine in cuisine_list}))
+
+    # Códigos de cada valor distinto, concatenados, e o deslocamento de cada valor
+    value_lengths = np.array([len(cuisine_list) for cuisine_list in lists], dtype=np.int64)
+    value_offsets = np.concatenate([[0], np.cumsum(value_lengths)])
+    value_cuisines = cuisines.get_indexer([cuisine for cuisine_list in lists for cuisine in cuisine_list])
+
+    # Expande para as linhas pelos códigos da categórica (valores ausentes: sem culinárias)
+    codes = values.cat.codes.to_numpy()
+    lengths = np.where(codes >= 0, value_lengths[codes.clip(min=0)], 0)
+    row_offsets = np.concatenate([[0], np.cumsum(lengths)])
+    within = np.arange(row_offsets[-1]) - np.repeat(row_offsets[:-1], lengths)
+    row_cuisines = value_cuisines[np.repeat(value_offsets[codes.clip(min=0)], lengths) + within]
+
+    return cuisines, row_offsets, row_cuisines
+
+
+class CuisineIndex:
+    """
+    Associação restaurante x culinária em CSR, nos dois sentidos.
+
+    Parâmetros:
+        df (pd.DataFrame): O DataFrame tratado.
+        column (str): Coluna com a lista completa de culinárias.
+    """
+
+    def __init__(self, df, column='all_cuisines'):
+        self.column = column
+        self.cuisines, self.row_offsets, self.row_cuisines = _associate(df[column])
+
+        # Linha de cada par e posições das linhas agrupadas por culinária
+        self.n_rows = len(df)
+        self.pair_rows = np.repeat(np.arange(self.n_rows), np.diff(self.row_offsets))
+
+        order = np.argsort(self.row_cuisines, kind='stable')
+        self.cuisine_rows = self.pair_rows[order]
+        self.cuisine_offsets = np.searchsorted(self.row_cuisines[order], np.arange(len(self.cuisines) + 1))
+
+    def extended(self, delta, start):
+        """
+        Retorna um novo índice que inclui as linhas acrescentadas ao final do dataset.
+
+        Parâmetros:
+            delta (pd.DataFrame): As linhas acrescentadas.
+            start (int): Posição da primeira linha acrescentada.
+
+        Retorna:
+            CuisineIndex: O índice atualizado (o atual não é modificado).
+        """
+        delta_index = CuisineIndex(delta, self.column)
+        merged = self.cuisines.union(delta_index.cuisines)
+
+        index = CuisineIndex.__new__(CuisineIndex)
+        index.column = self.column
+        index.cuisines = merged
+        index.n_rows = start + delta_index.n_rows
+        index.row_offsets = np.concatenate([self.row_offsets, self.row_offsets[-1] + delta_index.row_offsets[1:]])
+        index.row_cuisines = np.concatenate([
+            merged.get_indexer(self.cuisines)[self.row_cuisines],
+            merged.get_indexer(delta_index.cuisines)[delta_index.row_cuisines],
+        ])
+        index.pair_rows = np.concatenate([self.pair_rows, start + delta_index.pair_rows])
+
+        # Para cada culinária: posições antigas seguidas das novas
+        parts = []
+        sizes = np.zeros(len(merged), dtype=np.int64)
+        old_codes = self.cuisines.get_indexer(merged)
+        new_codes = delta_index.cuisines.get_indexer(merged)
+        for code, (old, new) in enumerate(zip(old_codes, new_codes)):
+            for source, source_code, offset in ((self, old, 0), (delta_index, new, start)):
+                if source_code >= 0:
+                    fatia = source.cuisine_rows[source.cuisine_offsets[source_code]:source.cuisine_offsets[source_code + 1]]
+                    parts.append(offset + fatia)
+                    sizes[code] += len(fatia)
+
+        index.cuisine_rows = np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+        index.cuisine_offsets = np.concatenate([[0], np.cumsum(sizes)])
+        return index
+
+    def codes(self, cuisines):
+        # Códigos das culinárias informadas (as desconhecidas são ignoradas)
+        codes = np.unique(self.cuisines.get_indexer(pd.Index(list(cuisines), dtype=object)))
+        return codes[codes >= 0]
+
+    def rows(self, cuisines):
+        """
+        Retorna as posições das linhas que servem alguma das culinárias informadas.
+
+        Parâmetros:
+            cuisines (iterable): Culinárias aceitas.
+
+        Retorna:
+            np.ndarray: Posições ordenadas e distintas das linhas selecionadas.
+        """
+        codes = self.codes(cuisines)
+        if len(codes) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        fatias = [self.cuisine_rows[self.cuisine_offsets[code]:self.cuisine_offsets[code + 1]] for code in codes]
+        return np.unique(np.concatenate(fatias))
+
+    def filter(self, df, cuisines):
+        # Recorte do DataFrame com os restaurantes que servem alguma das culinárias
+        return df.iloc[self.rows(cuisines)]
+
+    def _pair_mask(self, rows):
+        # Pares pertencentes às linhas informadas (None: todos)
+        if rows is None:
+            return slice(None)
+        selected = np.zeros(self.n_rows, dtype=bool)
+        selected[rows] = True
+        return selected[self.pair_rows]
+
+    def counts(self, rows=None):
+        """
+        Conta os restaurantes que servem cada culinária.
+
+        Parâmetros:
+            rows (np.ndarray): Posições das linhas consideradas (None considera todas).
+
+        Retorna:
+            pd.Series: Quantidade de restaurantes por culinária.
+        """
+        codes = self.row_cuisines[self._pair_mask(rows)]
+        return pd.Series(np.bincount(codes, minlength=len(self.cuisines)), index=self.cuisines, name='count')
+
+    def mean(self, values, rows=None):
+        """
+        Média de uma coluna numérica entre os restaurantes que servem cada culinária.
+
+        Parâmetros:
+            values (pd.Series): Coluna alinhada às linhas do DataFrame tratado.
+            rows (np.ndarray): Posições das linhas consideradas (None considera todas).
+
+        Retorna:
+            pd.Series: Média por culinária (apenas culinárias com restaurantes).
+        """
+        mask = self._pair_mask(rows)
+        codes = self.row_cuisines[mask]
+        weights = values.to_numpy(dtype='float64')[self.pair_rows[mask]]
+
+        counts = np.bincount(codes, minlength=len(self.cuisines))
+        sums = np.bincount(codes, weights=weights, minlength=len(self.cuisines))
+        present = counts > 0
+        return pd.Series(sums[present] / counts[present], index=self.cuisines[present], name=values.name)
+
+    def distinct_count(self, groups):
+        """
+        Conta as culinárias distintas servidas em cada grupo (ex.: cidade).
+
+        Parâmetros:
+            groups (pd.Series): Coluna de agrupamento alinhada às linhas do DataFrame tratado.
+
+        Retorna:
+            pd.Series: Quantidade de culinárias distintas por grupo, na ordem das categorias.
+        """
+        groups = groups.astype('category')
+        group_codes = groups.cat.codes.to_numpy().astype(np.int64)[self.pair_rows]
+
+        # Pares (grupo, culinária) distintos
+        pairs = np.unique(group_codes * len(self.cuisines) + self.row_cuisines)
+        counts = np.bincount(pairs // len(self.cuisines), minlength=len(groups.cat.categories))
+
+        present = counts > 0
+        return pd.Series(counts[present], index=pd.Index(groups.cat.categories[present], name=groups.name))
+
+    def best(self, values, cuisines):
+        """
+        Encontra, para cada culinária, a linha de maior valor entre os restaurantes que a servem.
+
+        Empates ficam com a primeira linha do dataset, como o idxmax.
+
+        Parâmetros:
+            values (pd.Series): Coluna alinhada às linhas do DataFrame tratado.
+            cuisines (iterable): Culinárias consultadas, na ordem desejada.
+
+        Retorna:
+            pd.Series: Posição da melhor linha, indexada pela culinária.
+        """
+        values = values.to_numpy()
+        best = {}
+        for cuisine in cuisines:
+            code = self.cuisines.get_loc(cuisine)
+            rows = self.cuisine_rows[self.cuisine_offsets[code]:self.cuisine_offsets[code + 1]]
+            if len(rows):
+                best[cuisine] = rows[np.argmax(values[rows])]
+        return pd.Series(best, dtype=np.int64)
+
+
+def load_cuisine_index(path=DATA_PATH):
+    # Associação do dataset atual, construída uma única vez por versão do CSV
+    return load_artifact('cuisine_index', CuisineIndex, path,
+                         updater=lambda index, df, delta, start: index.extended(delta, start))
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Tabela de câmbio local para normalizar custos em dólares americanos (USD).
+
+'average_cost_for_two' vem na moeda local de cada restaurante, então médias
+entre países só são comparáveis depois da conversão. A conversão é feita uma
+única vez na limpeza (coluna 'average_cost_for_two_usd'), a partir das
+cotações de referência abaixo, sem consulta a serviços externos.
+
+A tabela é versionada por RATES_VERSION, que compõe a versão do cache
+colunar (utils.storage): atualizar as cotações exige alterar a versão, o
+que invalida o cache e refaz a conversão.
+"""
+
+# Importação de bibliotecas
+import numpy as np
+import pandas as pd
+
+# Data de referência das cotações; alterar sempre que USD_RATES mudar
+RATES_VERSION = "2024-06-28"
+
+# USD por unidade de cada moeda, como rotulada no dataset
+USD_RATES = {
+    "Dollar($)": 1.0,
+    "Indian Rupees(Rs.)": 0.0120,
+    "Brazilian Real(R$)": 0.1790,
+    "Pounds(£)": 1.2650,
+    "Indonesian Rupiah(IDR)": 0.0000611,
+    "NewZealand($)": 0.6090,
+    "Botswana Pula(P)": 0.0737,
+    "Qatari Rial(QR)": 0.2747,
+    "Rand(R)": 0.0548,
+    "Sri Lankan Rupee(LKR)": 0.00327,
+    "Turkish Lira(TL)": 0.0305,
+    "Emirati Diram(AED)": 0.2723,
+}
+
+# Rótulos ambíguos do dataset: "Dollar($)" é usado para dólares de vários
+# países e os preços das Filipinas vêm rotulados como pula (são pesos)
+COUNTRY_USD_RATES = {
+    ("Australia", "Dollar($)"): 0.6670,
+    ("Canada", "Dollar($)"): 0.7310,
+    ("Singapore", "Dollar($)"): 0.7380,
+    ("Philippines", "Botswana Pula(P)"): 0.0171,
+}
+
+
+# Funções
+def usd_rate(country, currency):
+    # Cotação de um par (país, moeda); NaN para moedas fora da tabela
+    return COUNTRY_USD_RATES.get((country, currency), USD_RATES.get(currency, np.nan))
+
+
+def usd_rates(countries, currencies):
+    """
+    Cotação em USD de cada linha, avaliada uma única vez por par (país, moeda).
+
+    Parâmetros:
+        countries (pd.Series): Nome do país de cada linha.
+        currencies (pd.Series): Moeda de cada linha.
+
+    Retorna:
+        pd.Series: USD por unidade da moeda local, com o índice das entradas.
+    """
+    codes, uniques = pd.factorize(pd.MultiIndex.from_arrays([countries, currencies]))
+    rates = np.array([usd_rate(country, currency) for country, currency in uniques], dtype='float64')
+    return pd.Series(rates[codes] if len(codes) else rates[:0], index=countries.index)
+
+
+def to_usd(costs, countries, currencies):
+    """
+    Converte custos na moeda local para USD.
+
+    Parâmetros:
+        costs (pd.Series): Custos na moeda local.
+        countries (pd.Series): Nome do país de cada linha.
+        currencies (pd.Series): Moeda de cada linha.
+
+    Retorna:
+        pd.Series: Custos em USD, arredondados em centavos (NaN para moedas desconhecidas).
+    """
+    return (costs * usd_rates(countries, currencies)).round(2)
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Memorização dos gráficos Plotly das páginas.
+
+As funções que montam gráficos recebem o recorte de dados já filtrado; com
+o decorador memoize_figure o gráfico é guardado como JSON, chaveado pela
+função, pelos demais parâmetros e pela impressão digital da seleção de
+filtros, e reaproveitado por todas as sessões do processo.
+"""
+
+# Importação de bibliotecas
+import functools
+import hashlib
+
+import plotly.io as pio
+
+from utils.memo import BoundedCache
+from utils.pipeline import DATA_PATH, dataset_version
+
+# JSON dos gráficos já construídos, compartilhado entre as sessões
+FIGURE_CACHE = BoundedCache(max_entries=512, max_bytes=64 * 2**20)
+
+
+# Funções
+def selection_key(*selections, path=DATA_PATH):
+    """
+    Impressão digital de uma seleção de filtros na versão atual do dataset.
+
+    Parâmetros:
+        *selections: Listas de valores selecionados (a ordem não importa).
+        path (str): Caminho do CSV de origem.
+
+    Retorna:
+        str: Hash hexadecimal da seleção.
+    """
+    digest = hashlib.sha1(repr(dataset_version(path)).encode('utf-8'))
+    for selection in selections:
+        for value in sorted(set(map(str, selection))):
+            digest.update(value.encode('utf-8') + b'\0')
+        digest.update(b'\1')
+    return digest.hexdigest()
+
+
+def memoize_figure(func):
+    """
+    Decorador que memoriza o gráfico retornado por func.
+
+    A função decorada aceita o argumento extra cache_key (ver selection_key),
+    que representa o recorte de dados passado no primeiro argumento. Com
+    cache_key informado, retorna o gráfico reconstruído do JSON em cache
+    (go.Figure, como func); sem ele, chama func normalmente. Resultados None não são memorizados.
+    """
+    @functools.wraps(func)
+    def wrapper(data, *args, cache_key=None, **kwargs):
+        if cache_key is None:
+            return func(data, *args, **kwargs)
+
+        # As páginas rodam como __main__: o arquivo identifica a função
+        key = (func.__code__.co_filename, func.__qualname__, cache_key, args, tuple(sorted(kwargs.items())))
+        fig_json = FIGURE_CACHE.get(key)
+
+        if fig_json is None:
+            fig = func(data, *args, **kwargs)
+            if fig is None:
+                return None
+            fig_json = FIGURE_CACHE.put(key, fig.to_json())
+
+        return pio.from_json(fig_json)
+
+    return wrapper
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+Índice invertido para os filtros da barra lateral.
+
+Para cada coluna indexada (país, cidade, culinária) guarda, por valor, o
+array ordenado das posições das linhas com aquele valor, no formato CSR
+(posições ordenadas por código + deslocamentos). Aplicar um filtro vira
+união de fatias desses arrays e filtros combinados viram interseções, sem
+comparar strings linha a linha. Linhas acrescentadas ao dataset são
+incorporadas por extended(), sem reordenar as posições já indexadas.
+"""
+
+# Importação de bibliotecas
+import numpy as np
+import pandas as pd
+
+from utils.pipeline import DATA_PATH, load_artifact
+
+# Colunas com índice invertido
+INDEXED_COLUMNS = ['country_name', 'city', 'cuisines']
+
+
+class FilterIndex:
+    """
+    Índice invertido valor -> posições das linhas do DataFrame tratado.
+
+    Parâmetros:
+        df (pd.DataFrame): O DataFrame tratado.
+        columns (list): Colunas a indexar.
+    """
+
+    def __init__(self, df, columns=INDEXED_COLUMNS):
+        self.n_rows = len(df)
+        self._columns = {}
+
+        for coluna in columns:
+            values = df[coluna].astype('category')
+            codes = values.cat.codes.to_numpy()
+
+            # Posições agrupadas por código, em ordem crescente dentro de cada valor
+            order = np.argsort(codes, kind='stable')
+            offsets = np.searchsorted(codes[order], np.arange(len(values.cat.categories) + 1))
+
+            self._columns[coluna] = (values.cat.categories, order, offsets)
+
+    def extended(self, delta, start):
+        """
+        Retorna um novo índice que inclui as linhas acrescentadas ao final do dataset.
+
+        Para cada valor, as posições novas (já ordenadas) são concatenadas às
+        existentes; apenas as linhas novas são ordenadas.
+
+        Parâmetros:
+            delta (pd.DataFrame): As linhas acrescentadas.
+            start (int): Posição da primeira linha acrescentada.
+
+        Retorna:
+            FilterIndex: O índice atualizado (o atual não é modificado).
+        """
+        index = FilterIndex.__new__(FilterIndex)
+        index.n_rows = start + len(delta)
+        index._columns = {}
+
+        for coluna, (categories, order, offsets) in self._columns.items():
+            values = delta[coluna].astype('category')
+            merged = categories.union(values.cat.categories)
+
+            codes = merged.get_indexer(values)
+            delta_order = np.argsort(codes, kind='stable')
+            delta_offsets = np.searchsorted(codes[delta_order], np.arange(len(merged) + 1))
+
+            # Para cada valor: posições antigas seguidas das novas
+            old = categories.get_indexer(merged)
+            parts = []
+            for code, old_code in enumerate(old):
+                if old_code >= 0:
+                    parts.append(order[offsets[old_code]:offsets[old_code + 1]])
+                parts.append(start + delta_order[delta_offsets[code]:delta_offsets[code + 1]])
+
+            sizes = np.diff(delta_offsets) + np.where(old >= 0, np.diff(offsets)[old.clip(min=0)], 0)
+            index._columns[coluna] = (
+                merged,
+                np.concatenate(parts),
+                np.concatenate([[0], np.cumsum(sizes)]),
+            )
+
+        return index
+
+    def rows(self, coluna, valores):
+        """
+        Retorna as posições das linhas cujo valor está em valores.
+
+        Parâmetros:
+            coluna (str): Coluna indexada.
+            valores (iterable): Valores aceitos.
+
+        Retorna:
+            np.ndarray: Posições ordenadas das linhas selecionadas.
+        """
+        categories, order, offsets = self._columns[coluna]
+        codes = np.unique(categories.get_indexer(pd.Index(list(valores))))
+        codes = codes[codes >= 0]
+
+        # Todos os valores selecionados (padrão das páginas): sem união
+        if len(codes) == len(categories):
+            return np.arange(self.n_rows)
+
+        if len(codes) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        fatias = [order[offsets[code]:offsets[code + 1]] for code in codes]
+        return np.sort(np.concatenate(fatias))
+
+    def select(self, **filters):
+        """
+        Interseção dos filtros informados (ex.: country_name=[...], cuisines=[...]).
+
+        Parâmetros:
+            **filters: Coluna indexada -> valores aceitos.
+
+        Retorna:
+            np.ndarray: Posições ordenadas das linhas que atendem a todos os filtros.
+        """
+        rows = None
+        for coluna, valores in filters.items():
+            selected = self.rows(coluna, valores)
+            rows = selected if rows is None else np.intersect1d(rows, selected, assume_unique=True)
+        return np.arange(self.n_rows) if rows is None else rows
+
+    def filter(self, df, **filters):
+        # Recorte do DataFrame equivalente a df[df[coluna].isin(valores) & ...]
+        rows = self.select(**filters)
+        if len(rows) == self.n_rows:
+            return df
+        return df.iloc[rows]
+
+
+def load_filter_index(path=DATA_PATH):
+    # Índice do dataset atual, construído uma única vez por versão do CSV
+    return load_artifact('filter_index', FilterIndex, path,
+                         updater=lambda index, df, delta, start: index.extended(delta, start))
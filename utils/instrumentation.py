@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentação dos reruns das páginas.
+
+Cada página cria um RunTimer no início do script, executa o restante dentro
+de um bloco `with timer:` e marca o fim de cada etapa (carga, filtros,
+gráficos, mapa...). Ao final do rerun, inclusive quando ele falha ou é
+interrompido (st.stop, novo rerun), os tempos e o status são anexados a um
+log JSON lines. O log é opcional (ZOMATO_PROFILE_LOG=<arquivo>), é rotacionado
+ao passar de ZOMATO_PROFILE_LOG_MAX_MB e pode ser agregado entre sessões com:
+
+    python -m utils.instrumentation [--log .cache/timings.jsonl]
+
+Com ?debug=1 na URL (ou ZOMATO_DEBUG=1) a página também exibe os tempos em
+um painel na barra lateral.
+"""
+
+# Importação de bibliotecas
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from utils.storage import CACHE_DIR
+
+# Log dos tempos por rerun (desativado se ZOMATO_PROFILE_LOG estiver ausente ou vazio)
+DEFAULT_LOG = os.path.join(CACHE_DIR, "timings.jsonl")
+PROFILE_LOG = os.environ.get("ZOMATO_PROFILE_LOG", "")
+
+# Tamanho a partir do qual o log é rotacionado (uma cópia anterior, '.1')
+MAX_LOG_BYTES = int(float(os.environ.get("ZOMATO_PROFILE_LOG_MAX_MB", "10")) * 2**20)
+
+# Painel de depuração ligado para todas as sessões
+DEBUG = os.environ.get("ZOMATO_DEBUG", "") == "1"
+
+# Serializa as escritas no log entre as sessões do processo
+_LOG_LOCK = threading.Lock()
+
+
+class RunTimer:
+    """
+    Cronômetro das etapas de um rerun de página.
+
+    Parâmetros:
+        page (str): Nome da página.
+        log_path (str): Arquivo JSON lines de destino (None ou vazio desativa).
+    """
+
+    def __init__(self, page, log_path=PROFILE_LOG):
+        self.page = page
+        self.log_path = log_path
+        self.stages = {}
+        self._started = self._last = time.perf_counter()
+
+    def lap(self, name):
+        # Registra o tempo decorrido desde a marca anterior como a etapa name
+        now = time.perf_counter()
+        self.stages[name] = self.stages.get(name, 0.0) + now - self._last
+        self._last = now
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        # Registra o rerun mesmo se ele falhou ou foi interrompido; a exceção segue adiante
+        self.finish('ok' if exc_type is None else exc_type.__name__)
+        return False
+
+    def record(self, status='ok'):
+        """
+        Monta o registro do rerun.
+
+        Parâmetros:
+            status (str): 'ok' ou o nome da exceção que encerrou o rerun.
+
+        Retorna:
+            dict: Data, página, sessão, status, tempo total e tempo por etapa (segundos).
+        """
+        return {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+            'page': self.page,
+            'session': _session_id(),
+            'status': status,
+            'total': round(time.perf_counter() - self._started, 6),
+            'stages': {name: round(seconds, 6) for name, seconds in self.stages.items()},
+        }
+
+    def finish(self, status='ok'):
+        """
+        Encerra o rerun: grava o registro no log e, em modo debug, exibe o painel.
+
+        Parâmetros:
+            status (str): 'ok' ou o nome da exceção que encerrou o rerun
+                (o painel só é exibido nos reruns concluídos).
+
+        Retorna:
+            dict: O registro do rerun.
+        """
+        record = self.record(status)
+        append_log(record, self.log_path)
+        if status == 'ok' and debug_enabled():
+            show_panel(record)
+        return record
+
+
+# Funções
+def _session_id():
+    # Identificador da sessão do Streamlit (None fora do servidor)
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+    except ImportError:
+        return None
+    return ctx.session_id if ctx is not None else None
+
+
+def debug_enabled():
+    # Painel ligado pelo ambiente ou por ?debug=1 na URL
+    if DEBUG:
+        return True
+    import streamlit as st
+    if hasattr(st, 'query_params'):
+        return st.query_params.get('debug') == '1'
+    # Streamlit < 1.30
+    return st.experimental_get_query_params().get('debug', [None])[0] == '1'
+
+
+def append_log(record, log_path=PROFILE_LOG):
+    """
+    Anexa o registro ao log JSON lines (melhor esforço: falhas de escrita são ignoradas).
+
+    Ao passar de MAX_LOG_BYTES, o log vira '<arquivo>.1' (substituindo a cópia
+    anterior) e um novo é iniciado, de forma que o espaço em disco é limitado.
+
+    Parâmetros:
+        record (dict): Registro do rerun (ver RunTimer.record).
+        log_path (str): Arquivo de destino (None ou vazio desativa).
+    """
+    if not log_path:
+        return
+
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+    try:
+        os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
+        with _LOG_LOCK:
+            if os.path.exists(log_path) and os.path.getsize(log_path) >= MAX_LOG_BYTES:
+                os.replace(log_path, log_path + ".1")
+            with open(log_path, "a", encoding="utf-8") as file:
+                file.write(line)
+    except OSError:
+        pass
+
+
+def show_panel(record):
+    """
+    Exibe os tempos do rerun em um painel na barra lateral.
+
+    Parâmetros:
+        record (dict): Registro do rerun (ver RunTimer.record).
+    """
+    import streamlit as st
+
+    stages = pd.DataFrame(list(record['stages'].items()), columns=['etapa', 'segundos'])
+    stages['%'] = (100 * stages['segundos'] / record['total']).round(1)
+
+    with st.sidebar.expander("Tempos de execução", expanded=True):
+        st.caption(f"{record['page']} - total {record['total'] * 1000:.0f} ms")
+        st.dataframe(stages, hide_index=True, use_container_width=True)
+
+
+def load_log(log_path=PROFILE_LOG):
+    """
+    Lê o log de tempos em formato longo (uma linha por etapa de cada rerun).
+
+    Parâmetros:
+        log_path (str): Arquivo JSON lines.
+
+    Retorna:
+        pd.DataFrame: Colunas timestamp, page, session, status, stage e seconds.
+    """
+    rows = []
+    with open(log_path, encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            base = {key: record.get(key) for key in ('timestamp', 'page', 'session')}
+            base['status'] = record.get('status', 'ok')
+            rows.append({**base, 'stage': 'total', 'seconds': record['total']})
+            rows.extend({**base, 'stage': name, 'seconds': seconds} for name, seconds in record['stages'].items())
+    return pd.DataFrame(rows, columns=['timestamp', 'page', 'session', 'status', 'stage', 'seconds'])
+
+
+def summarize(log):
+    """
+    Agrega os tempos por página e etapa.
+
+    Parâmetros:
+        log (pd.DataFrame): Log em formato longo (ver load_log).
+
+    Retorna:
+        pd.DataFrame: Reruns, reruns com falha ou interrompidos, sessões,
+        média, mediana, p95 e máximo (em ms).
+    """
+    grouped = log.assign(falhas=log['status'] != 'ok').groupby(['page', 'stage'], sort=False)
+    summary = pd.DataFrame({
+        'reruns': grouped['seconds'].size(),
+        'falhas': grouped['falhas'].sum(),
+        'sessoes': grouped['session'].nunique(),
+        'media_ms': grouped['seconds'].mean() * 1000,
+        'p50_ms': grouped['seconds'].median() * 1000,
+        'p95_ms': grouped['seconds'].quantile(0.95) * 1000,
+        'max_ms': grouped['seconds'].max() * 1000,
+    })
+    return summary.round(1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resume o log de tempos das páginas do dashboard.")
+    parser.add_argument("--log", default=PROFILE_LOG or DEFAULT_LOG, help="Arquivo JSON lines com os tempos")
+    parser.add_argument("--page", help="Mostra apenas a página informada")
+    args = parser.parse_args(argv)
+
+    log = load_log(args.log)
+    if args.page:
+        log = log[log['page'] == args.page]
+    print(summarize(log).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Rankings (top-K) pré-computados por partição.
+
+Para cada partição (país, culinária, cidade...) são guardados, uma única vez
+por versão do dataset, os K melhores e os K piores itens. Um ranking para
+qualquer seleção de partições é a mescla desses rankings parciais, com custo
+proporcional a partições selecionadas x K, sem ordenar o recorte inteiro a
+cada rerun.
+
+Linhas acrescentadas ao dataset entram nos rankings de linhas mesclando-as
+aos rankings parciais existentes (TopK.extended); os rankings de grupos do
+cubo, pequenos, são recalculados.
+
+Empates são desempatados pela ordem dos itens (ordem das linhas no dataset
+ou dos grupos no cubo), como em uma ordenação estável.
+"""
+
+# Importação de bibliotecas
+import copy
+
+import numpy as np
+import pandas as pd
+
+from utils.cube import distinct_count, load_cube, rollup
+from utils.pipeline import DATA_PATH, load_artifact
+
+# Itens mantidos por partição em cada sentido
+TOP_K = 10
+
+
+class TopK:
+    """
+    Rankings parciais por partição, mesclados sob demanda.
+
+    Parâmetros:
+        scores (pd.Series): Pontuação de cada item, indexada pelo rótulo do item.
+        partitions (array-like): Partição de cada item (ex.: o país de cada restaurante).
+        k (int): Quantidade de itens mantidos por partição em cada sentido.
+    """
+
+    def __init__(self, scores, partitions, k=TOP_K):
+        self.k = k
+        self.scores = scores
+        self._values = scores.to_numpy(dtype='float64')
+
+        codes, uniques = pd.factorize(np.asarray(partitions, dtype=object))
+        self.partitions = pd.Index(uniques)
+
+        # Ordena por partição, pontuação e posição; guarda as K primeiras de cada partição
+        positions = np.arange(len(self._values))
+        offsets = np.searchsorted(np.sort(codes), np.arange(len(self.partitions) + 1))
+        self._heads = {}
+        for ascending, key in ((False, -self._values), (True, self._values)):
+            order = np.lexsort((positions, key, codes))
+            self._heads[ascending] = [
+                order[start:min(start + k, end)] for start, end in zip(offsets[:-1], offsets[1:])
+            ]
+
+    def extended(self, scores, partitions):
+        """
+        Retorna um novo TopK que inclui itens acrescentados após os atuais.
+
+        Os rankings parciais de cada partição são mesclados aos dos itens
+        novos; o custo é proporcional aos itens novos e a partições x K.
+
+        Parâmetros:
+            scores (pd.Series): Pontuação dos itens novos.
+            partitions (array-like): Partição de cada item novo.
+
+        Retorna:
+            TopK: O ranking atualizado (o atual não é modificado).
+        """
+        delta = TopK(scores, partitions, self.k)
+        start = len(self._values)
+
+        merged = copy.copy(self)
+        merged.scores = pd.concat([self.scores, delta.scores])
+        merged._values = np.concatenate([self._values, delta._values])
+        merged.partitions = self.partitions.append(delta.partitions.difference(self.partitions))
+
+        empty = np.empty(0, dtype=np.int64)
+        old_codes = self.partitions.get_indexer(merged.partitions)
+        new_codes = delta.partitions.get_indexer(merged.partitions)
+        merged._heads = {}
+        for ascending in (False, True):
+            heads = []
+            for old, new in zip(old_codes, new_codes):
+                candidates = np.concatenate([
+                    self._heads[ascending][old] if old >= 0 else empty,
+                    start + delta._heads[ascending][new] if new >= 0 else empty,
+                ])
+                key = merged._values[candidates]
+                heads.append(candidates[np.lexsort((candidates, key if ascending else -key))[:self.k]])
+            merged._heads[ascending] = heads
+
+        return merged
+
+    def top(self, selected=None, k=None, ascending=False):
+        """
+        Retorna os k melhores (ou piores) itens das partições selecionadas.
+
+        Parâmetros:
+            selected (iterable): Partições consideradas (None considera todas).
+            k (int): Tamanho do ranking (no máximo o K da construção).
+            ascending (bool): Se True, retorna os itens de menor pontuação.
+
+        Retorna:
+            pd.Series: Pontuações dos itens, na ordem do ranking.
+        """
+        k = self.k if k is None else k
+        if k > self.k:
+            raise ValueError(f"Ranking limitado a {self.k} itens.")
+
+        heads = self._heads[ascending]
+        if selected is None:
+            codes = np.arange(len(self.partitions))
+        else:
+            codes = np.unique(self.partitions.get_indexer(pd.Index(list(selected), dtype=object)))
+            codes = codes[codes >= 0]
+
+        if len(codes) == 0:
+            return self.scores.iloc[:0]
+
+        # Mescla os rankings parciais (no máximo partições x K candidatos)
+        candidates = np.concatenate([heads[code] for code in codes])
+        key = self._values[candidates]
+        order = np.lexsort((candidates, key if ascending else -key))[:k]
+
+        return self.scores.iloc[candidates[order]]
+
+
+# Funções
+def build_leaderboards(df, cube):
+    """
+    Constrói os rankings usados pelas páginas.
+
+    Parâmetros:
+        df (pd.DataFrame): O DataFrame tratado.
+        cube (pd.DataFrame): O cubo de métricas do mesmo dataset.
+
+    Retorna:
+        dict: Nome do ranking -> TopK.
+    """
+    return {
+        # Restaurantes por avaliação, particionados por país e por culinária
+        'restaurants_by_country': TopK(df['aggregate_rating'], df['country_name']),
+        'restaurants_by_cuisine': TopK(df['aggregate_rating'], df['cuisines']),
+        **group_leaderboards(cube),
+    }
+
+
+def group_leaderboards(cube):
+    # Rankings dos grupos do cubo (cada grupo é a sua própria partição)
+    by_city = rollup(cube, 'city')
+    cuisines_by_city = distinct_count(cube, 'city', 'cuisines')
+    by_cuisine = rollup(cube, 'cuisines')
+
+    return {
+        'cities_by_restaurants': TopK(by_city['count'], by_city.index),
+        'cities_by_cuisines': TopK(cuisines_by_city, cuisines_by_city.index),
+        'cuisines_by_rating': TopK(by_cuisine['average_rating'], by_cuisine.index),
+    }
+
+
+def update_leaderboards(leaderboards, delta, cube):
+    """
+    Incorpora aos rankings as linhas acrescentadas ao final do dataset.
+
+    Parâmetros:
+        leaderboards (dict): Rankings antes das linhas novas.
+        delta (pd.DataFrame): As linhas acrescentadas.
+        cube (pd.DataFrame): O cubo de métricas já atualizado.
+
+    Retorna:
+        dict: Os rankings atualizados.
+    """
+    return {
+        'restaurants_by_country': leaderboards['restaurants_by_country'].extended(delta['aggregate_rating'], delta['country_name']),
+        'restaurants_by_cuisine': leaderboards['restaurants_by_cuisine'].extended(delta['aggregate_rating'], delta['cuisines']),
+        **group_leaderboards(cube),
+    }
+
+
+def load_leaderboards(path=DATA_PATH):
+    # Rankings do dataset atual, construídos uma única vez por versão do CSV
+    return load_artifact(
+        'leaderboards',
+        lambda df: build_leaderboards(df, load_cube(path)),
+        path,
+        updater=lambda leaderboards, df, delta, start: update_leaderboards(leaderboards, delta, load_cube(path)),
+    )
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+Construção dos mapas de restaurantes.
+
+Em vez de um folium.Marker (com HTML próprio) por restaurante, os pontos
+são enviados como um único array JavaScript (FastMarkerCluster) ou
+agregados no servidor em uma grade, de forma que o tamanho da página
+acompanha o número de clusters e não o de restaurantes.
+
+No modo 'viewport' o mapa é interativo (st_folium): os limites e o zoom
+voltam do navegador a cada movimento e apenas os restaurantes da área
+visível, limitados por nível de zoom, viram marcadores.
+"""
+
+# Importação de bibliotecas
+import numpy as np
+import pandas as pd
+import folium
+from folium.plugins import FastMarkerCluster
+
+from utils.memo import BoundedCache
+
+# Modos de mapa disponíveis (chave -> rótulo exibido na barra lateral)
+MAP_MODES = {
+    'fast': 'Marcadores agrupados no navegador',
+    'grid': 'Grade agregada no servidor',
+    'viewport': 'Marcadores da área visível (interativo)',
+}
+
+# Quantidade de divisões da grade no maior lado da área dos restaurantes
+GRID_DIVISIONS = 40
+
+# Marcadores materializados no modo 'viewport': dobra a cada nível de zoom, entre os limites
+VIEWPORT_MIN_MARKERS = 100
+VIEWPORT_MAX_MARKERS = 1000
+
+# Cor do marcador de acordo com a nota média (mesmas faixas de RATING_MEANING)
+RATING_BINS = [-np.inf, 2.5, 3.0, 3.5, 4.0, 4.5, np.inf]
+RATING_BIN_COLORS = ['darkred', 'red', 'orange', 'lightgreen', 'green', 'darkgreen']
+
+# HTML dos mapas já renderizados, compartilhado entre as sessões
+MAP_CACHE = BoundedCache(max_entries=32, max_bytes=128 * 2**20)
+
+# Cria cada marcador no navegador a partir de [lat, lon, popup, cor]
+_MARKER_CALLBACK = """
+function (row) {
+    var icon = L.AwesomeMarkers.icon({markerColor: row[3], iconColor: 'white'});
+    var marker = L.marker(new L.LatLng(row[0], row[1]), {icon: icon});
+    marker.bindPopup(row[2]);
+    return marker;
+}
+"""
+
+
+# Funções
+def _coordinates(df):
+    # Latitude/longitude em float64 arredondadas (~1 m), para um JSON enxuto
+    return (
+        df['latitude'].astype('float64').round(5),
+        df['longitude'].astype('float64').round(5),
+    )
+
+
+def marker_rows(df):
+    """
+    Monta as linhas [lat, lon, popup, cor] usadas pelo FastMarkerCluster.
+
+    Parâmetros:
+        df (pd.DataFrame): Restaurantes a exibir.
+
+    Retorna:
+        list: Uma lista por restaurante.
+    """
+    latitude, longitude = _coordinates(df)
+    popup = (
+        "Restaurante: " + df['restaurant_name'].astype(str)
+        + "<br>País: " + df['country_name'].astype(str)
+        + "<br>Rating: " + df['aggregate_rating'].astype(str)
+        + " (" + df['rating_text'].astype(str) + ")"
+    )
+
+    rows = pd.DataFrame({
+        'latitude': latitude,
+        'longitude': longitude,
+        'popup': popup,
+        'color': df['colors_name'].astype(str),
+    })
+    return rows.values.tolist()
+
+
+def grid_clusters(df, divisions=GRID_DIVISIONS):
+    """
+    Agrega os restaurantes em células de uma grade regular de latitude/longitude.
+
+    O tamanho da célula é derivado da extensão dos pontos, então a quantidade
+    de clusters fica limitada a divisions x divisions.
+
+    Parâmetros:
+        df (pd.DataFrame): Restaurantes a agregar.
+        divisions (int): Quantidade de células no maior lado da área.
+
+    Retorna:
+        pd.DataFrame: Uma linha por célula, com centróide, contagem, nota média e cor.
+    """
+    latitude, longitude = _coordinates(df)
+    span = max(np.ptp(latitude.to_numpy()), np.ptp(longitude.to_numpy())) if len(df) else 0
+    cell = max(span / divisions, 1e-6)
+
+    cells = pd.DataFrame({
+        'cell_lat': np.floor(latitude / cell).astype('int64'),
+        'cell_lon': np.floor(longitude / cell).astype('int64'),
+        'latitude': latitude,
+        'longitude': longitude,
+        'aggregate_rating': df['aggregate_rating'],
+    })
+
+    clusters = (
+        cells.groupby(['cell_lat', 'cell_lon'])
+        .agg(
+            latitude=('latitude', 'mean'),
+            longitude=('longitude', 'mean'),
+            count=('aggregate_rating', 'size'),
+            average_rating=('aggregate_rating', 'mean'),
+        )
+        .reset_index(drop=True)
+    )
+    clusters['color'] = pd.cut(clusters['average_rating'], RATING_BINS,
+                               labels=RATING_BIN_COLORS, right=False).astype(str)
+
+    return clusters
+
+
+def marker_limit(zoom):
+    # Quantidade máxima de marcadores para o nível de zoom (zoom 2 = mundo inteiro)
+    zoom = 2 if zoom is None else zoom
+    return int(np.clip(VIEWPORT_MIN_MARKERS * 2.0 ** (zoom - 2), VIEWPORT_MIN_MARKERS, VIEWPORT_MAX_MARKERS))
+
+
+def viewport_markers(df, spatial_index, rows, bounds=None, zoom=None):
+    """
+    Seleciona os restaurantes da área visível do mapa, limitados pelo nível de zoom.
+
+    Quando a área tem mais restaurantes que o limite, ficam os de maior
+    avaliação (desempate pela ordem no dataset).
+
+    Parâmetros:
+        df (pd.DataFrame): O DataFrame tratado completo.
+        spatial_index (SpatialIndex): Índice espacial do mesmo dataset (utils.spatial).
+        rows (np.ndarray): Posições das linhas que passam pelos filtros da página.
+        bounds (dict): Limites retornados pelo Leaflet ('_southWest'/'_northEast'
+            com 'lat' e 'lng'); None considera o mundo inteiro.
+        zoom (int): Nível de zoom atual do mapa.
+
+    Retorna:
+        tuple: (restaurantes a exibir, total de restaurantes na área visível).
+    """
+    try:
+        south_west, north_east = bounds['_southWest'], bounds['_northEast']
+        area = (float(south_west['lat']), float(south_west['lng']), float(north_east['lat']), float(north_east['lng']))
+    except (KeyError, TypeError, ValueError):
+        area = (-90.0, -180.0, 90.0, 180.0)
+
+    visible = spatial_index.within_bounds(*area)
+    if len(rows) < len(df):
+        visible = np.intersect1d(visible, rows, assume_unique=True)
+
+    # Melhores avaliações primeiro, até o limite do zoom
+    ratings = df['aggregate_rating'].to_numpy()[visible]
+    selected = visible[np.lexsort((visible, -ratings))[:marker_limit(zoom)]]
+
+    return df.iloc[np.sort(selected)], len(visible)
+
+
+def marker_layer(df):
+    """
+    Cria a camada com um marcador por restaurante, adicionada dinamicamente ao mapa interativo.
+
+    Parâmetros:
+        df (pd.DataFrame): Restaurantes a exibir (já limitados, ver viewport_markers).
+
+    Retorna:
+        folium.FeatureGroup: A camada de marcadores.
+    """
+    layer = folium.FeatureGroup(name='Restaurantes')
+    for latitude, longitude, popup, color in marker_rows(df):
+        folium.CircleMarker(
+            location=[latitude, longitude],
+            radius=6,
+            color=color,
+            fill=True,
+            fill_opacity=0.8,
+            popup=folium.Popup(popup, max_width=300),
+        ).add_to(layer)
+    return layer
+
+
+def build_map(df, mode='fast'):
+    """
+    Cria o mapa folium dos restaurantes no modo escolhido.
+
+    Parâmetros:
+        df (pd.DataFrame): Restaurantes a exibir.
+        mode (str): 'fast' (array JS agrupado no navegador) ou 'grid' (grade agregada no servidor).
+
+    Retorna:
+        folium.Map: O mapa pronto para renderização.
+    """
+    # Criando o mapa base
+    map = folium.Map()
+
+    if mode == 'fast':
+        FastMarkerCluster(marker_rows(df), callback=_MARKER_CALLBACK).add_to(map)
+
+    elif mode == 'grid':
+        clusters = grid_clusters(df)
+        for cluster in clusters.itertuples(index=False):
+            folium.CircleMarker(
+                location=[cluster.latitude, cluster.longitude],
+                radius=4 + 3 * np.log1p(cluster.count),
+                color=cluster.color,
+                fill=True,
+                fill_opacity=0.7,
+                tooltip=f"{cluster.count} restaurantes - nota média {cluster.average_rating:.2f}",
+            ).add_to(map)
+
+    else:
+        raise ValueError("Modo de mapa inválido. Use 'fast' ou 'grid'.")
+
+    return map
+
+
+def render_map_html(df, mode='fast', cache_key=None):
+    """
+    Retorna o HTML completo do mapa, memorizado por cache_key e modo.
+
+    Parâmetros:
+        df (pd.DataFrame): Restaurantes a exibir.
+        mode (str): Modo do mapa (ver build_map).
+        cache_key (hashable): Identifica o recorte exibido (ex.: frozenset dos
+            países selecionados e a versão do dataset); None desativa o cache.
+
+    Retorna:
+        str: Documento HTML do mapa.
+    """
+    def render():
+        return folium.Figure().add_child(build_map(df, mode)).render()
+
+    if cache_key is None:
+        return render()
+
+    return MAP_CACHE.get_or_create((cache_key, mode), render)
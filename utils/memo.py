@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Cache LRU limitado por quantidade de entradas e por memória.
+
+Usado para memorizar artefatos renderizados (HTML de mapas, JSON de
+gráficos) compartilhados entre sessões do mesmo processo.
+"""
+
+# Importação de bibliotecas
+import threading
+from collections import OrderedDict
+
+
+class BoundedCache:
+    """
+    Cache LRU seguro para threads, com limite de entradas e de bytes.
+
+    Parâmetros:
+        max_entries (int): Quantidade máxima de entradas mantidas.
+        max_bytes (int): Soma máxima do tamanho das entradas.
+        sizeof (callable): Função que mede o tamanho (em bytes) de um valor.
+    """
+
+    def __init__(self, max_entries=64, max_bytes=64 * 2**20, sizeof=len):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        # Retorna o valor e o marca como usado mais recentemente
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        # Armazena o valor, descartando os menos usados se passar dos limites
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._entries.pop(key)[1]
+
+            # Valores maiores que o limite total não são armazenados
+            if size > self.max_bytes:
+                return value
+
+            self._entries[key] = (value, size)
+            self.nbytes += size
+
+            while len(self._entries) > self.max_entries or self.nbytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.nbytes -= evicted_size
+
+        return value
+
+    def get_or_create(self, key, factory):
+        """
+        Retorna o valor em cache ou o cria com factory() e o armazena.
+
+        Parâmetros:
+            key (hashable): Chave da entrada.
+            factory (callable): Função sem argumentos que cria o valor.
+
+        Retorna:
+            object: O valor em cache ou recém-criado.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = self.put(key, factory())
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+
+# Sentinela para distinguir "ausente" de um valor None armazenado
+_MISSING = object()
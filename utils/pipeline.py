@@ -0,0 +1,841 @@
+# -*- coding: utf-8 -*-
+"""
+Pipeline de carga e limpeza do dataset Zomato.
+
+Concentra a ETL que antes era copiada em todas as páginas
+(read_csv -> dropna -> mapeamentos -> rename_columns -> culinária principal
+-> drop_duplicates) e mantém o resultado em memória uma única vez por
+processo, chaveado pela assinatura (mtime/tamanho) do CSV de origem.
+
+Quando o CSV apenas recebe linhas novas no final, somente essas linhas são
+lidas e limpas; o DataFrame, o cache em disco e os artefatos que sabem se
+atualizar (índices, cubo, rankings) são estendidos em vez de reconstruídos.
+
+Na partida a frio o DataFrame é lido do cache colunar (ver utils.storage),
+que pode ser pré-gerado no deploy com:
+
+    python -m utils.pipeline [--csv zomato.csv] [--force]
+
+Com ZOMATO_SHARED_DATASET=1 (vários processos do Streamlit na mesma
+máquina), o DataFrame de cada processo referencia o cache mapeado em
+memória em vez de copiá-lo, e a memória do dataset não cresce com a
+quantidade de workers. Um cache recém-gravado também é reaberto assim.
+
+Com ZOMATO_REFRESH_INTERVAL=<segundos>, uma thread em segundo plano verifica
+o CSV e constrói a nova versão do dataset e dos artefatos fora do caminho
+das requisições, publicando-a de uma só vez; cada rerun continua com a
+versão que encontrou ao começar.
+"""
+
+# Importação de bibliotecas
+import argparse
+import io
+import logging
+import os
+import re
+import threading
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from utils import storage
+from utils.currency import to_usd
+
+# Caminho padrão do dataset (relativo à raiz do projeto)
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "zomato.csv")
+
+# Configurações iniciais
+COUNTRIES = {
+    1: "India",
+    14: "Australia",
+    30: "Brazil",
+    37: "Canada",
+    94: "Indonesia",
+    148: "New Zealand",
+    162: "Philippines",
+    166: "Qatar",
+    184: "Singapore",
+    189: "South Africa",
+    191: "Sri Lanka",
+    208: "Turkey",
+    214: "United Arab Emirates",
+    215: "England",
+    216: "United States of America"
+}
+
+COLORS = {
+    "3F7E00": 'darkgreen',
+    "5BA829": 'green',
+    "9ACD32": 'lightgreen',
+    "CDD614": 'orange',
+    "FFBA00": 'red',
+    "CBCBC8": 'darkred',
+    "FF7800": 'darkred'
+}
+
+# Definindo as cores e seus significados de rating
+RATING_MEANING = {
+    "darkgreen": "Excelente (4.5 - 5.0)",
+    "green": "Muito bom (4.0 - 4.5)",
+    "lightgreen": "Bom (3.5 - 4.0)",
+    "orange": "Médio (3.0 - 3.5)",
+    "red": "Ruim (2.5 - 3.0)",
+    "darkred": "Péssimo (1.5 - 2.5)",
+    "Unknown": "Desconhecido"
+}
+
+# Tamanho de bloco para a leitura em blocos do CSV (0/ausente: leitura única)
+CHUNKSIZE = int(os.environ.get("ZOMATO_CHUNKSIZE", 0)) or None
+
+# Dataset compartilhado entre processos via cache mapeado em memória (0/ausente: cópia por processo)
+SHARED_DATASET = os.environ.get("ZOMATO_SHARED_DATASET", "0") != "0"
+
+# Segundos entre as verificações do CSV pelo atualizador em segundo plano (0/ausente: desligado)
+REFRESH_INTERVAL = float(os.environ.get("ZOMATO_REFRESH_INTERVAL", 0))
+
+# Esquema compacto do DataFrame tratado
+CATEGORY_COLUMNS = [
+    'country_name', 'city', 'locality', 'cuisines', 'all_cuisines', 'currency',
+    'rating_color', 'rating_text', 'colors_name', 'rating_description'
+]
+INT8_COLUMNS = ['price_range', 'has_table_booking', 'has_online_delivery', 'is_delivering_now']
+INT16_COLUMNS = ['country_code']
+FLOAT32_COLUMNS = ['latitude', 'longitude']
+
+# Cache do processo: {caminho absoluto: (assinatura, DataFrame limpo, assinatura da origem)}
+_CACHE = {}
+# Artefatos derivados: {(caminho absoluto, nome): (assinatura, artefato, atualizador)}
+_ARTIFACTS = {}
+# Hashes ordenados das linhas do DataFrame limpo, calculados na primeira atualização
+_ROW_HASHES = {}
+_CACHE_LOCK = threading.RLock()
+
+# Construtores registrados: {(caminho absoluto, nome): (construtor, atualizador)}
+_BUILDERS = {}
+# Artefatos de versões anteriores, usados por reruns que ainda servem essas
+# versões (os mais antigos são descartados além de MAX_RETIRED)
+_RETIRED = {}
+MAX_RETIRED = 32
+# Atualizadores em segundo plano: {caminho absoluto: (thread, evento de parada)}
+_REFRESHERS = {}
+# Por thread: versões fixadas ({caminho: (rerun, (assinatura, DataFrame))}) e artefatos em preparação
+_LOCAL = threading.local()
+
+logger = logging.getLogger(__name__)
+
+
+# Funções
+def rename_columns(dataframe):
+    # Renomeia colunas
+    renamed_dataframe = dataframe.copy()
+
+    # Funções de transformação para as colunas
+    title = lambda x: x.title()
+    snakecase = lambda x: re.sub(r'([a-z])([A-Z])', r'\1_\2', x).lower().replace(" ", "_")
+    spaces = lambda x: x.replace(" ", "")
+
+    cols_old = [title(str(x)) for x in renamed_dataframe.columns]
+    cols_old = [spaces(x) for x in cols_old]
+    cols_new = [snakecase(x) for x in cols_old]
+
+    renamed_dataframe.columns = cols_new
+    return renamed_dataframe
+
+
+def _lookup(series, func):
+    """
+    Equivalente vetorizado de series.apply(func) para colunas de baixa cardinalidade.
+
+    A função é avaliada apenas uma vez por valor distinto e o resultado é
+    expandido para todas as linhas pelos códigos do factorize.
+
+    Parâmetros:
+        series (pd.Series): Coluna de entrada.
+        func (callable): Transformação aplicada a cada valor distinto.
+
+    Retorna:
+        pd.Series: Coluna transformada, com o mesmo índice da entrada.
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    values = pd.Index([func(value) for value in uniques])
+    return pd.Series(values.take(codes), index=series.index, name=series.name)
+
+
+def country_names(codes):
+    # Nome do país a partir do 'Country Code'
+    return _lookup(codes, lambda x: COUNTRIES.get(x, 'Unknown'))
+
+
+def color_names(rating_colors):
+    # Nome da cor a partir do código hexadecimal do rating
+    return _lookup(rating_colors, lambda x: COLORS.get(x, 'Unknown'))
+
+
+def rating_descriptions(colors_names):
+    # Significado do rating a partir do nome da cor
+    return _lookup(colors_names, lambda x: RATING_MEANING.get(x, 'Desconhecido'))
+
+
+def first_cuisine(cuisines):
+    # Mantém apenas o primeiro tipo de culinária da lista separada por vírgulas
+    return _lookup(cuisines, lambda x: x.split(",")[0])
+
+
+def optimize_dtypes(df):
+    """
+    Converte o DataFrame tratado para o esquema compacto.
+
+    Colunas de texto repetitivas viram categóricas, flags e faixa de preço
+    viram inteiros de 8 bits e as coordenadas viram float32.
+
+    Parâmetros:
+        df (pd.DataFrame): O DataFrame tratado.
+
+    Retorna:
+        pd.DataFrame: O DataFrame com os dtypes compactos.
+    """
+    dtypes = {}
+    dtypes.update({coluna: 'category' for coluna in CATEGORY_COLUMNS})
+    dtypes.update({coluna: 'int8' for coluna in INT8_COLUMNS})
+    dtypes.update({coluna: 'int16' for coluna in INT16_COLUMNS})
+    dtypes.update({coluna: 'float32' for coluna in FLOAT32_COLUMNS})
+
+    return df.astype({coluna: dtype for coluna, dtype in dtypes.items() if coluna in df.columns})
+
+
+def memory_usage_mb(df):
+    # Memória ocupada pelo DataFrame, incluindo o conteúdo das strings
+    return df.memory_usage(deep=True).sum() / 2**20
+
+
+def clean_data(df, optimize=True):
+    """
+    Aplica a limpeza padrão do dashboard sobre o dataset bruto.
+
+    Parâmetros:
+        df (pd.DataFrame): O DataFrame lido diretamente do CSV.
+        optimize (bool): Se True, aplica o esquema compacto (optimize_dtypes).
+
+    Retorna:
+        pd.DataFrame: O DataFrame tratado (equivalente ao antigo 'df4').
+    """
+    df3 = clean_rows(df)
+    df4 = df3.drop_duplicates()
+
+    # Libera o intermediário antes da conversão de tipos
+    del df3
+
+    return optimize_dtypes(df4) if optimize else df4
+
+
+def clean_rows(df):
+    """
+    Limpeza linha a linha, sem a remoção de duplicados.
+
+    Parâmetros:
+        df (pd.DataFrame): O DataFrame (ou bloco) lido do CSV.
+
+    Retorna:
+        pd.DataFrame: As linhas tratadas (equivalente ao antigo 'df3').
+    """
+    df1 = df.dropna().copy()
+
+    df1['country_name'] = country_names(df1['Country Code'])
+    df1['Colors_name'] = color_names(df1['Rating color'])
+
+    # Criando a coluna 'Rating_description' baseada na 'Colors_name'
+    df1['Rating_description'] = rating_descriptions(df1['Colors_name'])
+
+    df2 = rename_columns(df1)
+
+    # Lista completa preservada em 'all_cuisines' (ver utils.cuisines)
+    df2['all_cuisines'] = df2['cuisines']
+    df2['cuisines'] = first_cuisine(df2['cuisines'])
+
+    # Custo em dólares, comparável entre países (ver utils.currency)
+    df2['average_cost_for_two_usd'] = to_usd(
+        df2['average_cost_for_two'], df2['country_name'], df2['currency']
+    )
+    df3 = df2.drop('switch_to_order_menu', axis=1)
+
+    return df3
+
+
+def clean_chunks(path, chunksize=CHUNKSIZE or 100_000):
+    """
+    Lê o CSV em blocos e aplica a limpeza a cada um, sem carregar o arquivo inteiro.
+
+    Duplicados são removidos entre blocos por um conjunto com o hash do
+    conteúdo de cada linha já emitida, mantendo a primeira ocorrência como
+    o drop_duplicates faz (colisões de hash de 64 bits são desprezadas).
+
+    Parâmetros:
+        path (str): Caminho do CSV de origem.
+        chunksize (int): Quantidade de linhas lidas por bloco.
+
+    Retorna:
+        generator: Blocos tratados, já no esquema compacto.
+    """
+    seen = set()
+
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        rows = clean_rows(chunk)
+        hashes = pd.util.hash_pandas_object(rows, index=False).to_numpy()
+
+        # Primeira ocorrência dentro do bloco e ainda não vista nos anteriores
+        first = ~pd.Series(hashes).duplicated().to_numpy()
+        unseen = np.fromiter((value not in seen for value in hashes.tolist()), dtype=bool, count=len(hashes))
+        keep = first & unseen
+
+        seen.update(hashes[keep].tolist())
+        yield optimize_dtypes(rows[keep])
+
+
+def sort_categories(df):
+    # Ordena as categorias (como o astype('category') faz), se necessário
+    df = df.copy(deep=False)
+    for coluna in df.columns[[isinstance(dtype, pd.CategoricalDtype) for dtype in df.dtypes]]:
+        categories = df[coluna].cat.categories
+        if not categories.is_monotonic_increasing:
+            df[coluna] = df[coluna].cat.reorder_categories(categories.sort_values())
+    return df
+
+
+def file_signature(path):
+    """
+    Retorna a assinatura usada para invalidar o cache de um arquivo.
+
+    Parâmetros:
+        path (str): Caminho do arquivo.
+
+    Retorna:
+        tuple: (mtime em nanossegundos, tamanho em bytes).
+    """
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def build_cache_chunked(path=DATA_PATH, chunksize=CHUNKSIZE or 100_000, cache_path=None):
+    """
+    Gera o cache colunar bloco a bloco, com memória limitada ao bloco atual
+    (mais o conjunto de hashes e os dicionários das categóricas).
+
+    Parâmetros:
+        path (str): Caminho do CSV de origem.
+        chunksize (int): Quantidade de linhas lidas por bloco.
+        cache_path (str): Destino do arquivo; padrão em storage.CACHE_DIR.
+
+    Retorna:
+        str: Caminho do cache gravado.
+    """
+    with storage.ChunkedCacheWriter(path, cache_path) as writer:
+        for chunk in clean_chunks(path, chunksize):
+            writer.write(chunk)
+    return writer.cache_path
+
+
+def read_appended_rows(path, offset, first_row):
+    """
+    Lê apenas as linhas do CSV a partir de offset bytes (com o cabeçalho do arquivo).
+
+    Parâmetros:
+        path (str): Caminho do CSV de origem.
+        offset (int): Posição do início das linhas novas (ver storage.appended_offset).
+        first_row (int): Número da primeira linha nova, usado como rótulo do índice.
+
+    Retorna:
+        pd.DataFrame: As linhas novas, com os rótulos que teriam na leitura completa.
+    """
+    with open(path, "rb") as file:
+        header = file.readline()
+        file.seek(offset)
+        raw = pd.read_csv(io.BytesIO(header + file.read()))
+
+    raw.index = pd.RangeIndex(first_row, first_row + len(raw))
+    return raw
+
+
+def row_hashes(df):
+    # Hashes ordenados do conteúdo de cada linha (no esquema compacto)
+    return np.sort(pd.util.hash_pandas_object(df, index=False).to_numpy())
+
+
+def append_rows(df, raw, hashes):
+    """
+    Limpa as linhas novas do CSV e as acrescenta ao DataFrame tratado.
+
+    Linhas repetidas entre si ou já presentes no DataFrame são descartadas
+    pelo hash do conteúdo, mantendo a primeira ocorrência como o
+    drop_duplicates faz. As categorias das colunas categóricas são unidas e
+    mantidas ordenadas.
+
+    Parâmetros:
+        df (pd.DataFrame): O DataFrame tratado atual.
+        raw (pd.DataFrame): As linhas novas, como lidas do CSV.
+        hashes (np.ndarray): Hashes ordenados das linhas de df (ver row_hashes).
+
+    Retorna:
+        tuple: (DataFrame atualizado, linhas acrescentadas, hashes atualizados).
+    """
+    rows = optimize_dtypes(clean_rows(raw))
+    rows = rows.astype({coluna: dtype for coluna, dtype in df.dtypes.items()
+                        if not isinstance(dtype, pd.CategoricalDtype)})
+
+    # Primeira ocorrência entre as linhas novas e ainda ausente do DataFrame
+    new_hashes = pd.util.hash_pandas_object(rows, index=False).to_numpy()
+    known = np.zeros(len(rows), dtype=bool)
+    if len(hashes):
+        known = hashes[np.searchsorted(hashes, new_hashes).clip(max=len(hashes) - 1)] == new_hashes
+    keep = ~pd.Series(new_hashes).duplicated().to_numpy() & ~known
+
+    rows = rows.loc[keep].copy()
+    new_hashes = np.sort(new_hashes[keep])
+
+    df = df.copy(deep=False)
+    for coluna in df.columns[[isinstance(dtype, pd.CategoricalDtype) for dtype in df.dtypes]]:
+        categories = df[coluna].cat.categories.union(rows[coluna].cat.categories)
+        if not categories.equals(df[coluna].cat.categories):
+            df[coluna] = df[coluna].cat.set_categories(categories)
+        rows[coluna] = rows[coluna].cat.set_categories(categories)
+
+    updated = pd.concat([df, rows])
+    hashes = np.insert(hashes, np.searchsorted(hashes, new_hashes), new_hashes)
+
+    return updated, updated.iloc[len(df):], hashes
+
+
+def apply_append(path, df, source, hashes=None):
+    """
+    Incorpora ao DataFrame tratado as linhas acrescentadas ao CSV desde a assinatura source.
+
+    Parâmetros:
+        path (str): Caminho do CSV de origem.
+        df (pd.DataFrame): O DataFrame tratado correspondente a source.
+        source (dict): Assinatura do CSV quando df foi gerado (ver storage.source_metadata).
+        hashes (np.ndarray): Hashes das linhas de df; calculados se ausentes.
+
+    Retorna:
+        tuple | None: (DataFrame atualizado, linhas acrescentadas, hashes,
+        nova assinatura), ou None se o CSV não apenas recebeu linhas novas.
+    """
+    offset = storage.appended_offset(path, source)
+    if offset is None:
+        return None
+
+    raw = read_appended_rows(path, offset, source["rows"])
+    updated, delta, hashes = append_rows(df, raw, row_hashes(df) if hashes is None else hashes)
+
+    return updated, delta, hashes, storage.source_metadata(path, rows=source["rows"] + len(raw))
+
+
+def _write_cache(df, path, cache_path, source):
+    # Grava o cache colunar (melhor esforço) e retorna a assinatura da origem
+    try:
+        storage.write_cache(df, path, cache_path, source)
+    except OSError:
+        # Sem permissão de escrita: segue apenas com o cache em memória
+        pass
+    return source
+
+
+def _read_cache(cache_path):
+    # Lê o cache colunar, compartilhado entre processos se SHARED_DATASET
+    return sort_categories(storage.read_cache(cache_path, shared=SHARED_DATASET))
+
+
+def _attach(df, cache_path, source):
+    # No modo compartilhado, troca o DataFrame recém-gravado pelo cache mapeado
+    if not SHARED_DATASET or storage.read_cache_metadata(cache_path) != source:
+        return df
+    return _read_cache(cache_path)
+
+
+def build_dataset(path=DATA_PATH, use_cache=True, force=False, chunksize=CHUNKSIZE):
+    """
+    Constrói o dataset tratado, reaproveitando o cache colunar quando válido.
+
+    Se o CSV apenas recebeu linhas novas desde a geração do cache, somente
+    essas linhas são limpas e acrescentadas.
+
+    Parâmetros:
+        path (str): Caminho do CSV de origem.
+        use_cache (bool): Se True, lê/grava o cache colunar em disco.
+        force (bool): Se True, ignora o cache existente e o regrava.
+        chunksize (int): Se informado, o cache é gerado em blocos (CSV maior que a memória).
+
+    Retorna:
+        pd.DataFrame: O DataFrame tratado.
+    """
+    return _build_dataset(path, use_cache, force, chunksize)[0]
+
+
+def _build_dataset(path, use_cache=True, force=False, chunksize=CHUNKSIZE):
+    # Igual a build_dataset, retornando também a assinatura da origem (ou None)
+    if not use_cache:
+        return clean_data(pd.read_csv(path)), None
+
+    cache_path = storage.cache_path_for(path)
+    if not force:
+        source = storage.read_cache_metadata(cache_path)
+        if storage.is_cache_valid(path, cache_path):
+            return _read_cache(cache_path), source
+
+        # CSV que apenas cresceu: limpa só as linhas novas
+        if storage.appended_offset(path, source) is not None:
+            df, _, _, source = apply_append(path, _read_cache(cache_path), source)
+            source = _write_cache(df, path, cache_path, source)
+            return _attach(df, cache_path, source), source
+
+    if chunksize:
+        # A quantidade de linhas do CSV não fica registrada: sem atualização incremental
+        build_cache_chunked(path, chunksize, cache_path)
+        return _read_cache(cache_path), storage.read_cache_metadata(cache_path)
+
+    raw = pd.read_csv(path)
+    df = clean_data(raw)
+    source = _write_cache(df, path, cache_path, storage.source_metadata(path, rows=len(raw)))
+    return _attach(df, cache_path, source), source
+
+
+def _refresh(path, signature, cached):
+    """
+    Atualiza o dataset em memória quando o CSV apenas recebeu linhas novas.
+
+    Os artefatos registrados com atualizador são estendidos com as linhas
+    novas; os demais são descartados e reconstruídos sob demanda.
+
+    Parâmetros:
+        path (str): Caminho absoluto do CSV.
+        signature (tuple): Assinatura atual do CSV (ver file_signature).
+        cached (tuple): Entrada atual de _CACHE.
+
+    Retorna:
+        tuple | None: A nova entrada de _CACHE, ou None se é preciso reconstruir tudo.
+    """
+    old_signature, df, source = cached
+    appended = apply_append(path, df, source, _ROW_HASHES.get(path))
+    if appended is None:
+        return None
+
+    updated, delta, _ROW_HASHES[path], source = appended
+    source = _write_cache(updated, path, storage.cache_path_for(path), source)
+    updated = _attach(updated, storage.cache_path_for(path), source)
+    _CACHE[path] = cached = (signature, updated, source)
+
+    for key in [key for key in _ARTIFACTS if key[0] == path]:
+        artifact_signature, artifact, updater = _ARTIFACTS.get(key, (signature, None, None))
+        if artifact_signature == signature:
+            # Já atualizado (ex.: por um atualizador que depende deste artefato)
+            continue
+        if updater is None or artifact_signature != old_signature:
+            del _ARTIFACTS[key]
+        else:
+            _ARTIFACTS[key] = (signature, updater(artifact, updated, delta, len(df)), updater)
+
+    return cached
+
+
+def _current_run():
+    # Identifica o rerun em andamento: o dict de cursores do ScriptRunContext é
+    # recriado a cada rerun, mesmo quando o ScriptRunner reaproveita a thread.
+    # Fora do Streamlit, a própria thread (None na thread principal).
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx(suppress_warning=True)
+    except ImportError:
+        ctx = None
+    if ctx is not None:
+        return ctx.cursors
+    thread = threading.current_thread()
+    return None if thread is threading.main_thread() else thread
+
+
+def _retire(key, entry):
+    # Guarda o artefato de uma versão anterior, descartando os mais antigos além de MAX_RETIRED
+    _RETIRED.pop(key, None)
+    _RETIRED[key] = entry
+    while len(_RETIRED) > MAX_RETIRED:
+        del _RETIRED[next(iter(_RETIRED))]
+
+
+def _cached_dataset(path):
+    # Retorna (assinatura, DataFrame tratado), atualizando ou reconstruindo se o CSV mudou
+    path = os.path.abspath(path)
+    pins = getattr(_LOCAL, 'pinned', {})
+    run = _current_run()
+    if path in pins:
+        pinned_run, pinned = pins[path]
+        if pinned_run is run:
+            return pinned
+        del pins[path]  # Fixada por um rerun anterior desta thread
+
+    with _CACHE_LOCK:
+        cached = _CACHE.get(path)
+        # Sem atualizador em segundo plano, ou sem versão publicada (ex.: após
+        # clear_cache), a verificação e a construção são feitas aqui
+        if cached is None or path not in _REFRESHERS:
+            signature = file_signature(path)
+            if cached is None or cached[0] != signature:
+                refreshed = _refresh(path, signature, cached) if cached is not None else None
+                if refreshed is None:
+                    _ROW_HASHES.pop(path, None)
+                    refreshed = (signature, *_build_dataset(path))
+                _CACHE[path] = cached = refreshed
+
+        if REFRESH_INTERVAL and path not in _REFRESHERS:
+            start_refresher(path, REFRESH_INTERVAL)
+
+    # Com o atualizador ligado, cada rerun fica com a versão que encontrou,
+    # mesmo que uma nova seja publicada no meio dele; o próximo rerun da
+    # mesma sessão (na mesma thread) lê a versão publicada
+    if path in _REFRESHERS and run is not None:
+        _LOCAL.__dict__.setdefault('pinned', {})[path] = (run, cached[:2])
+
+    return cached[:2]
+
+
+def _prepare_version(path, signature, cached):
+    """
+    Constrói, fora do lock, a próxima versão do dataset e de todos os artefatos registrados.
+
+    Se o CSV apenas recebeu linhas novas, o dataset e os artefatos com
+    atualizador são estendidos; os demais são reconstruídos.
+
+    Parâmetros:
+        path (str): Caminho absoluto do CSV.
+        signature (tuple): Assinatura atual do CSV (ver file_signature).
+        cached (tuple): Entrada atual de _CACHE.
+
+    Retorna:
+        tuple: (nova entrada de _CACHE, hashes das linhas ou None, artefatos novos).
+    """
+    old_signature, df, source = cached
+    appended = apply_append(path, df, source, _ROW_HASHES.get(path))
+
+    if appended is None:
+        updated, source = _build_dataset(path)
+        hashes, delta = None, None
+    else:
+        updated, delta, hashes, source = appended
+        source = _write_cache(updated, path, storage.cache_path_for(path), source)
+        updated = _attach(updated, storage.cache_path_for(path), source)
+
+    # Os load_artifact desta thread enxergam a nova versão e gravam em staging
+    staging = {}
+    _LOCAL.pinned = {path: (_current_run(), (signature, updated))}
+    _LOCAL.staging = (staging, old_signature, delta, len(df))
+    try:
+        for (artifact_path, name), (builder, updater) in list(_BUILDERS.items()):
+            if artifact_path == path:
+                load_artifact(name, builder, path, updater)
+    finally:
+        del _LOCAL.pinned, _LOCAL.staging
+
+    return (signature, updated, source), hashes, staging
+
+
+def refresh_dataset(path=DATA_PATH):
+    """
+    Publica uma nova versão do dataset se o CSV mudou, sem bloquear as sessões.
+
+    A nova versão (dataset e artefatos) é construída fora do lock e trocada
+    de uma vez; os reruns em andamento continuam com a versão anterior.
+
+    Parâmetros:
+        path (str): Caminho do CSV de origem.
+
+    Retorna:
+        bool: True se uma nova versão foi publicada.
+    """
+    path = os.path.abspath(path)
+    signature = file_signature(path)
+    cached = _CACHE.get(path)
+    if cached is None or cached[0] == signature:
+        return False
+
+    entry, hashes, staging = _prepare_version(path, signature, cached)
+
+    with _CACHE_LOCK:
+        if _CACHE.get(path) is not cached:
+            # Outra versão foi publicada enquanto esta era construída
+            return False
+
+        for key in [key for key in _ARTIFACTS if key[0] == path]:
+            _retire(key, _ARTIFACTS.pop(key))
+        _ARTIFACTS.update(staging)
+        if hashes is None:
+            _ROW_HASHES.pop(path, None)
+        else:
+            _ROW_HASHES[path] = hashes
+        _CACHE[path] = entry
+
+    return True
+
+
+def _refresh_loop(path, interval, stop):
+    # Verifica o CSV a cada interval segundos até stop ser sinalizado
+    while not stop.wait(interval):
+        try:
+            refresh_dataset(path)
+        except Exception:
+            # A versão atual continua publicada; nova tentativa na próxima verificação
+            logger.exception("Falha ao atualizar o dataset %s", path)
+
+
+def start_refresher(path=DATA_PATH, interval=REFRESH_INTERVAL or 30.0):
+    """
+    Inicia o atualizador em segundo plano do dataset (uma vez por processo e CSV).
+
+    Com o atualizador ligado, as sessões não verificam mais o CSV: apenas
+    leem a versão publicada, e cada rerun mantém a versão que encontrou.
+
+    Parâmetros:
+        path (str): Caminho do CSV de origem.
+        interval (float): Segundos entre as verificações do CSV.
+
+    Retorna:
+        threading.Thread: A thread do atualizador.
+    """
+    path = os.path.abspath(path)
+
+    with _CACHE_LOCK:
+        if path in _REFRESHERS:
+            return _REFRESHERS[path][0]
+
+        stop = threading.Event()
+        thread = threading.Thread(
+            target=_refresh_loop, args=(path, interval, stop),
+            name=f"zomato-refresher:{os.path.basename(path)}", daemon=True
+        )
+        _REFRESHERS[path] = (thread, stop)
+        thread.start()
+
+    return thread
+
+
+def stop_refresher(path=DATA_PATH):
+    # Para o atualizador em segundo plano; as sessões voltam a verificar o CSV
+    with _CACHE_LOCK:
+        thread, stop = _REFRESHERS.pop(os.path.abspath(path), (None, None))
+    if thread is not None:
+        stop.set()
+        thread.join()
+
+
+def load_data(path=DATA_PATH):
+    """
+    Retorna o dataset tratado, construído no máximo uma vez por processo.
+
+    O resultado fica em cache enquanto a assinatura do CSV não mudar; cada
+    chamada recebe uma cópia rasa, de forma que colunas criadas pelas páginas
+    não vazam para as demais sessões.
+
+    Parâmetros:
+        path (str): Caminho do CSV de origem.
+
+    Retorna:
+        pd.DataFrame: Visão do DataFrame tratado.
+    """
+    return _cached_dataset(path)[1].copy(deep=False)
+
+
+def dataset_version(path=DATA_PATH):
+    # Assinatura da versão em memória do dataset, para compor chaves de cache
+    return _cached_dataset(path)[0]
+
+
+def load_artifact(name, builder, path=DATA_PATH, updater=None):
+    """
+    Retorna um artefato derivado do dataset (agregados, índices...),
+    construído no máximo uma vez por versão do CSV.
+
+    Parâmetros:
+        name (str): Nome único do artefato.
+        builder (callable): Função que recebe o DataFrame tratado e constrói o artefato.
+        path (str): Caminho do CSV de origem.
+        updater (callable): Opcional. Recebe (artefato, DataFrame atualizado,
+            linhas novas, posição da primeira linha nova) e retorna o artefato
+            atualizado quando o CSV apenas recebe linhas novas.
+
+    Retorna:
+        object: O artefato construído por builder.
+    """
+    signature, df = _cached_dataset(path)
+    key = (os.path.abspath(path), name)
+
+    staging = getattr(_LOCAL, 'staging', None)
+    if staging is not None:
+        # Thread do atualizador: artefato da próxima versão, construído fora do lock
+        artifacts, old_signature, delta, start = staging
+        if key not in artifacts:
+            current = _ARTIFACTS.get(key)
+            if delta is not None and updater is not None and current is not None and current[0] == old_signature:
+                artifacts[key] = (signature, updater(current[1], df, delta, start), updater)
+            else:
+                artifacts[key] = (signature, builder(df), updater)
+        return artifacts[key][1]
+
+    with _CACHE_LOCK:
+        _BUILDERS[key] = (builder, updater)
+        cached = _ARTIFACTS.get(key)
+        if cached is None or cached[0] != signature:
+            retired = _RETIRED.get(key)
+            if retired is not None and retired[0] == signature:
+                # Rerun que ainda serve a versão anterior do dataset
+                return retired[1]
+
+            cached = (signature, builder(df), updater)
+            current = _CACHE.get(key[0])
+            if current is not None and signature == current[0]:
+                _ARTIFACTS[key] = cached
+            else:
+                _retire(key, cached)
+
+    return cached[1]
+
+
+def clear_cache():
+    # Descarta os datasets e artefatos mantidos em memória
+    with _CACHE_LOCK:
+        _CACHE.clear()
+        _ARTIFACTS.clear()
+        _ROW_HASHES.clear()
+        _BUILDERS.clear()
+        _RETIRED.clear()
+
+
+def main(argv=None):
+    # CLI para pré-gerar o cache colunar no deploy
+    parser = argparse.ArgumentParser(description="Gera o cache colunar do dataset tratado.")
+    parser.add_argument("--csv", default=DATA_PATH, help="CSV de origem (padrão: zomato.csv)")
+    parser.add_argument("--force", action="store_true", help="Regrava o cache mesmo se válido")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE,
+                        help="Gera o cache em blocos de N linhas (CSV maior que a memória)")
+    parser.add_argument("--memory", action="store_true",
+                        help="Compara a memória do esquema compacto com o original")
+    args = parser.parse_args(argv)
+
+    df = build_dataset(args.csv, force=args.force, chunksize=args.chunksize)
+    print(f"{storage.cache_path_for(args.csv)}: {len(df)} linhas")
+
+    if args.memory:
+        raw = clean_data(pd.read_csv(args.csv), optimize=False)
+        print(f"memória do dataset original: {memory_usage_mb(raw):.2f} MB")
+        print(f"memória do dataset compacto: {memory_usage_mb(df):.2f} MB")
+
+        # Memória alocada por uma nova sessão, com o dataset já em cache no
+        # processo: heap do Python/numpy (tracemalloc) mais o pool do Arrow
+        load_data(args.csv)
+        arrow_bytes = pa.total_allocated_bytes()
+        tracemalloc.start()
+        session = load_data(args.csv)
+        session_bytes = tracemalloc.get_traced_memory()[0] + pa.total_allocated_bytes() - arrow_bytes
+        tracemalloc.stop()
+        print(f"memória adicional por sessão: {session_bytes / 2**20:.2f} MB "
+              f"(medida em uma segunda chamada a load_data, {len(session)} linhas)")
+
+
+if __name__ == "__main__":
+    main()
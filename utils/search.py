@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+Busca aproximada de restaurantes por nome, localidade e endereço.
+
+O índice é construído uma única vez por versão do dataset. Para cada campo,
+os valores distintos são normalizados (minúsculas, sem acentos, pontuação
+vira espaço) e quebrados em trigramas de caracteres, codificados como
+inteiros. Os trigramas de cada valor vão para uma lista invertida
+trigrama -> valores no formato CSR.
+
+Uma busca conta, com um bincount sobre as listas dos trigramas da consulta,
+quantos trigramas cada valor compartilha com ela. A similaridade é a fração
+dos trigramas da consulta encontrados no valor. A última palavra da consulta
+conta como prefixo, e erros de digitação custam apenas os trigramas que
+tocam a letra errada. Dos valores que passam do limiar, apenas os
+MAX_VALUES melhores de cada campo (maior similaridade, depois maior
+avaliação entre as suas linhas) são expandidos para as linhas, o que limita
+o custo de termos curtos e comuns ("bar", "the"); as MAX_VALUES primeiras
+linhas do resultado não mudam com o limite. O resultado é ordenado por
+similaridade ponderada pelo campo e depois pela avaliação.
+"""
+
+# Importação de bibliotecas
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from utils.pipeline import DATA_PATH, load_artifact
+
+# Campos indexados e o peso de cada um na pontuação
+SEARCH_FIELDS = {
+    'restaurant_name': 1.0,
+    'locality_verbose': 0.7,
+    'address': 0.6,
+}
+
+# Fração mínima dos trigramas da consulta presentes no valor
+MIN_SIMILARITY = 0.5
+
+# Valores distintos de cada campo expandidos para as linhas por busca
+MAX_VALUES = 200
+
+# Alfabeto após a normalização: espaço, a-z e 0-9
+ALPHABET = 37
+_CHAR_CODES = np.zeros(256, dtype=np.int64)
+_CHAR_CODES[np.frombuffer(b'abcdefghijklmnopqrstuvwxyz0123456789', dtype=np.uint8)] = np.arange(1, ALPHABET)
+
+
+# Funções
+def normalize(values):
+    """
+    Normaliza textos para a busca: minúsculas, sem acentos e palavras separadas por um espaço.
+
+    Parâmetros:
+        values (pd.Series): Textos.
+
+    Retorna:
+        pd.Series: Textos normalizados, com um espaço no início e no fim.
+    """
+    text = (
+        values.astype(str)
+        .str.normalize('NFKD')
+        .str.encode('ascii', errors='ignore')
+        .str.decode('ascii')
+        .str.lower()
+        .str.replace(r'[^a-z0-9]+', ' ', regex=True)
+        .str.strip()
+    )
+    return ' ' + text + ' '
+
+
+def _trigrams(text):
+    # Códigos dos trigramas de um texto normalizado (ASCII)
+    codes = _CHAR_CODES[np.frombuffer(text.encode('ascii'), dtype=np.uint8)]
+    return codes[:-2] * ALPHABET ** 2 + codes[1:-1] * ALPHABET + codes[2:]
+
+
+def query_trigrams(query):
+    """
+    Trigramas distintos de uma consulta; a última palavra é tratada como prefixo.
+
+    Parâmetros:
+        query (str): Texto digitado.
+
+    Retorna:
+        np.ndarray: Códigos dos trigramas (vazio se a consulta tem menos de 2 caracteres úteis).
+    """
+    text = unicodedata.normalize('NFKD', str(query)).encode('ascii', errors='ignore').decode('ascii')
+    text = ' ' + re.sub(r'[^a-z0-9]+', ' ', text.lower()).strip() + ' '
+    if len(text.strip()) < 2:
+        return np.empty(0, dtype=np.int64)
+
+    # Sem o espaço final: "piz" encontra "pizza"
+    return np.unique(_trigrams(text.rstrip()))
+
+
+class FieldIndex:
+    """
+    Lista invertida trigrama -> valores distintos de um campo, com os valores -> linhas.
+
+    Parâmetros:
+        values (pd.Series): O campo, alinhado às linhas do DataFrame tratado.
+        ratings (pd.Series): Avaliação de cada linha, usada para escolher os
+            valores expandidos quando passam de MAX_VALUES.
+    """
+
+    def __init__(self, values, ratings):
+        codes, uniques = pd.factorize(values.astype(str))
+        self.n_values = len(uniques)
+
+        # Linhas de cada valor distinto (CSR)
+        self.value_rows = np.argsort(codes, kind='stable')
+        self.value_offsets = np.searchsorted(codes[self.value_rows], np.arange(self.n_values + 1))
+
+        # Posição de cada valor no ranking das linhas: maior avaliação entre as
+        # suas linhas (todo valor tem ao menos uma) e depois a posição da
+        # primeira linha com essa avaliação
+        row_ratings = ratings.to_numpy(dtype='float64')[self.value_rows]
+        lengths = np.diff(self.value_offsets)
+        value_ratings = np.maximum.reduceat(row_ratings, self.value_offsets[:-1]) if self.n_values else row_ratings
+        best = np.flatnonzero(row_ratings == np.repeat(value_ratings, lengths))
+        owners = np.repeat(np.arange(self.n_values), lengths)[best]
+        best_rows = self.value_rows[best[np.r_[True, owners[1:] != owners[:-1]][:len(best)]]]
+        self.value_rank = np.empty(self.n_values, dtype=np.int64)
+        self.value_rank[np.lexsort((best_rows, -value_ratings))] = np.arange(self.n_values)
+
+        # Todos os valores normalizados em um único buffer; posição -> valor
+        text = normalize(pd.Series(uniques))
+        lengths = text.str.len().to_numpy()
+        buffer = np.frombuffer(''.join(text.tolist()).encode('ascii'), dtype=np.uint8)
+        owner = np.repeat(np.arange(self.n_values), lengths)
+
+        # Trigramas que não atravessam a fronteira entre dois valores
+        chars = _CHAR_CODES[buffer]
+        trigrams = chars[:-2] * ALPHABET ** 2 + chars[1:-1] * ALPHABET + chars[2:]
+        valid = owner[:-2] == owner[2:]
+
+        # Pares (trigrama, valor) distintos, ordenados por trigrama: os códigos
+        # cabem em 16 bits (ordenação estável por radix) e os valores já estão
+        # em ordem crescente, então pares repetidos ficam adjacentes
+        trigrams, owner = trigrams[valid].astype(np.uint16), owner[:-2][valid]
+        order = np.argsort(trigrams, kind='stable')
+        trigrams, owner = trigrams[order], owner[order]
+        distinct = np.r_[True, (trigrams[1:] != trigrams[:-1]) | (owner[1:] != owner[:-1])][:len(owner)]
+
+        self.postings = owner[distinct]
+        self.offsets = np.searchsorted(trigrams[distinct], np.arange(ALPHABET ** 3 + 1))
+
+    def similarity(self, trigrams):
+        """
+        Fração dos trigramas da consulta presentes em cada valor distinto.
+
+        Parâmetros:
+            trigrams (np.ndarray): Trigramas distintos da consulta.
+
+        Retorna:
+            np.ndarray: Similaridade de cada valor distinto (0 a 1).
+        """
+        postings = [self.postings[self.offsets[code]:self.offsets[code + 1]] for code in trigrams]
+        matches = np.bincount(np.concatenate(postings), minlength=self.n_values)
+        return matches / len(trigrams)
+
+    def best_values(self, value_ids, similarity, max_values):
+        """
+        Limita os valores encontrados aos max_values melhores.
+
+        Parâmetros:
+            value_ids (np.ndarray): Valores que passam do limiar de similaridade.
+            similarity (np.ndarray): Similaridade de cada valor distinto.
+            max_values (int): Quantidade máxima de valores mantidos.
+
+        Retorna:
+            np.ndarray: Os valores de maior similaridade (em qualquer ordem),
+            desempatados como o ranking das linhas: pela maior avaliação entre
+            as suas linhas e depois pela posição da primeira linha com essa avaliação.
+        """
+        if len(value_ids) <= max_values:
+            return value_ids
+
+        # Todos os valores acima da max_values-ésima similaridade; entre os
+        # empatados nela, os primeiros do ranking (seleção parcial, sem ordenar)
+        values = similarity[value_ids]
+        cutoff = np.partition(values, len(values) - max_values)[len(values) - max_values]
+        above, tied = value_ids[values > cutoff], value_ids[values == cutoff]
+        missing = max_values - len(above)
+        if len(tied) > missing:
+            tied = tied[np.argpartition(self.value_rank[tied], missing - 1)[:missing]]
+        return np.concatenate([above, tied])
+
+    def rows(self, value_ids):
+        # Linhas dos valores informados e o valor de cada linha
+        lengths = self.value_offsets[value_ids + 1] - self.value_offsets[value_ids]
+        starts = np.repeat(self.value_offsets[value_ids], lengths)
+        within = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        return self.value_rows[starts + within], np.repeat(value_ids, lengths)
+
+
+class SearchIndex:
+    """
+    Índice de busca aproximada sobre os campos de SEARCH_FIELDS.
+
+    Parâmetros:
+        df (pd.DataFrame): O DataFrame tratado.
+        fields (dict): Campo -> peso na pontuação.
+    """
+
+    def __init__(self, df, fields=SEARCH_FIELDS):
+        self.fields = {
+            field: (weight, FieldIndex(df[field], df['aggregate_rating'])) for field, weight in fields.items()
+        }
+
+    def search(self, query, min_similarity=MIN_SIMILARITY, max_values=MAX_VALUES):
+        """
+        Encontra as linhas cujos campos se parecem com a consulta.
+
+        Parâmetros:
+            query (str): Texto digitado.
+            min_similarity (float): Fração mínima dos trigramas da consulta presentes no campo.
+            max_values (int): Valores distintos de cada campo expandidos para as
+                linhas (as max_values primeiras linhas por pontuação e avaliação
+                são as mesmas da busca sem limite).
+
+        Retorna:
+            pd.Series: Pontuação (similaridade x peso do campo; a melhor entre
+            os campos) de cada linha encontrada, indexada pela posição da linha.
+        """
+        trigrams = query_trigrams(query)
+        if len(trigrams) == 0:
+            return pd.Series(dtype='float64', name='score')
+
+        rows, scores = [], []
+        for weight, index in self.fields.values():
+            similarity = index.similarity(trigrams)
+            value_ids = index.best_values(np.flatnonzero(similarity >= min_similarity), similarity, max_values)
+            field_rows, field_values = index.rows(value_ids)
+            rows.append(field_rows)
+            scores.append(weight * similarity[field_values])
+
+        rows, scores = np.concatenate(rows), np.concatenate(scores)
+
+        # Melhor pontuação de cada linha entre os campos
+        order = np.lexsort((-scores, rows))
+        rows, scores = rows[order], scores[order]
+        first = np.r_[True, rows[1:] != rows[:-1]] if len(rows) else np.empty(0, dtype=bool)
+
+        return pd.Series(scores[first], index=rows[first], name='score')
+
+
+def load_search_index(path=DATA_PATH):
+    # Índice do dataset atual, construído uma única vez por versão do CSV
+    return load_artifact('search_index', SearchIndex, path)
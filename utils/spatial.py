@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+Índice espacial dos restaurantes para consultas por raio.
+
+As coordenadas são distribuídas em células de uma grade regular de
+latitude/longitude (CELL_DEGREES graus). Cada célula guarda, no formato
+CSR, as posições das suas linhas; uma consulta "restaurantes a até N km de
+um ponto" seleciona apenas as células que intersectam o retângulo que
+envolve o círculo e calcula a distância de haversine só para as linhas
+dessas células, sem percorrer o dataset inteiro. A área visível de um mapa
+(within_bounds) é respondida da mesma forma.
+"""
+
+# Importação de bibliotecas
+import numpy as np
+import pandas as pd
+
+from utils.pipeline import DATA_PATH, load_artifact
+
+# Lado das células da grade, em graus (~5,5 km de latitude)
+CELL_DEGREES = 0.05
+
+# Raio médio da Terra, em km
+EARTH_RADIUS_KM = 6371.0088
+
+# Quantidade de células de longitude por faixa de latitude (chave = faixa x LON_CELLS + coluna)
+LON_CELLS = int(np.ceil(360 / CELL_DEGREES)) + 1
+
+
+# Funções
+def haversine_km(latitude, longitude, latitudes, longitudes):
+    """
+    Distância de haversine entre um ponto e um conjunto de pontos.
+
+    Parâmetros:
+        latitude (float): Latitude do ponto de referência, em graus.
+        longitude (float): Longitude do ponto de referência, em graus.
+        latitudes (np.ndarray): Latitudes dos pontos, em graus.
+        longitudes (np.ndarray): Longitudes dos pontos, em graus.
+
+    Retorna:
+        np.ndarray: Distâncias em km.
+    """
+    lat1, lon1 = np.radians(latitude), np.radians(longitude)
+    lat2, lon2 = np.radians(latitudes), np.radians(longitudes)
+
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def _cell_keys(latitudes, longitudes):
+    # Chave inteira da célula de cada ponto
+    rows = np.floor((latitudes + 90) / CELL_DEGREES).astype(np.int64)
+    columns = np.floor(np.mod(longitudes + 180, 360) / CELL_DEGREES).astype(np.int64)
+    return rows * LON_CELLS + columns
+
+
+class SpatialIndex:
+    """
+    Grade de latitude/longitude com as posições das linhas de cada célula.
+
+    Parâmetros:
+        df (pd.DataFrame): O DataFrame tratado.
+    """
+
+    def __init__(self, df):
+        self.latitude = df['latitude'].to_numpy(dtype='float64')
+        self.longitude = df['longitude'].to_numpy(dtype='float64')
+
+        keys = _cell_keys(self.latitude, self.longitude)
+        self._order = np.argsort(keys, kind='stable')
+        self._keys = keys[self._order]
+        self._index_cells()
+
+    def _index_cells(self):
+        # Células não vazias e deslocamentos das suas linhas em _order
+        self.n_rows = len(self._order)
+        starts = np.flatnonzero(np.r_[True, self._keys[1:] != self._keys[:-1]])[:self.n_rows]
+        self._cells = self._keys[starts]
+        self._offsets = np.r_[starts, self.n_rows]
+
+        # Faixa de latitude e coluna de longitude de cada célula
+        self._cell_rows, self._cell_columns = np.divmod(self._cells, LON_CELLS)
+
+    def extended(self, delta, start):
+        """
+        Retorna um novo índice que inclui as linhas acrescentadas ao final do dataset.
+
+        As linhas novas são inseridas depois das antigas da mesma célula, sem
+        reordenar as posições já indexadas.
+
+        Parâmetros:
+            delta (pd.DataFrame): As linhas acrescentadas.
+            start (int): Posição da primeira linha acrescentada.
+
+        Retorna:
+            SpatialIndex: O índice atualizado (o atual não é modificado).
+        """
+        delta_index = SpatialIndex(delta)
+
+        index = SpatialIndex.__new__(SpatialIndex)
+        index.latitude = np.concatenate([self.latitude, delta_index.latitude])
+        index.longitude = np.concatenate([self.longitude, delta_index.longitude])
+
+        positions = np.searchsorted(self._keys, delta_index._keys, side='right')
+        index._keys = np.insert(self._keys, positions, delta_index._keys)
+        index._order = np.insert(self._order, positions, start + delta_index._order)
+        index._index_cells()
+        return index
+
+    def query(self, latitude, longitude, radius_km):
+        """
+        Encontra as linhas a até radius_km de um ponto.
+
+        Parâmetros:
+            latitude (float): Latitude do ponto, em graus.
+            longitude (float): Longitude do ponto, em graus.
+            radius_km (float): Raio da busca, em km.
+
+        Retorna:
+            pd.Series: Distância em km de cada linha encontrada, indexada pela
+            posição da linha no DataFrame tratado (em ordem crescente).
+        """
+        # Retângulo que envolve o círculo (longitude ilimitada perto dos polos)
+        delta_lat = np.degrees(radius_km / EARTH_RADIUS_KM)
+        max_lat = min(abs(latitude) + delta_lat, 90.0)
+        cos_lat = np.cos(np.radians(max_lat))
+        delta_lon = 180.0 if cos_lat < 1e-9 else min(delta_lat / cos_lat, 180.0)
+
+        # Células que intersectam o retângulo (a diferença de longitude dá a volta em ±180)
+        first_row = np.floor((latitude - delta_lat + 90) / CELL_DEGREES)
+        last_row = np.floor((latitude + delta_lat + 90) / CELL_DEGREES)
+        cell_center = (self._cell_columns + 0.5) * CELL_DEGREES - 180
+        lon_distance = np.abs(np.mod(cell_center - longitude + 180, 360) - 180)
+        selected = np.flatnonzero(
+            (self._cell_rows >= first_row) & (self._cell_rows <= last_row)
+            & (lon_distance <= delta_lon + CELL_DEGREES)
+        )
+
+        if len(selected) == 0:
+            return pd.Series(dtype='float64', name='distance_km')
+
+        candidates = np.sort(np.concatenate([
+            self._order[self._offsets[cell]:self._offsets[cell + 1]] for cell in selected
+        ]))
+        distances = haversine_km(latitude, longitude, self.latitude[candidates], self.longitude[candidates])
+        inside = distances <= radius_km
+
+        return pd.Series(distances[inside], index=candidates[inside], name='distance_km')
+
+
+    def within_bounds(self, south, west, north, east):
+        """
+        Encontra as linhas dentro de um retângulo de latitude/longitude (ex.: a área visível do mapa).
+
+        Parâmetros:
+            south (float): Latitude mínima.
+            west (float): Longitude a oeste (pode passar de ±180, como no Leaflet).
+            north (float): Latitude máxima.
+            east (float): Longitude a leste.
+
+        Retorna:
+            np.ndarray: Posições ordenadas das linhas dentro do retângulo.
+        """
+        # Largura em longitude medida a partir do oeste (a área pode cruzar ±180)
+        width = east - west
+        if width >= 360:
+            west, width = -180.0, 360.0
+        west = np.mod(west + 180, 360) - 180
+
+        # Células cuja borda oeste está entre uma célula antes do oeste e o leste
+        first_row = np.floor((south + 90) / CELL_DEGREES)
+        last_row = np.floor((north + 90) / CELL_DEGREES)
+        cell_west = self._cell_columns * CELL_DEGREES - 180
+        selected = np.flatnonzero(
+            (self._cell_rows >= first_row) & (self._cell_rows <= last_row)
+            & (np.mod(cell_west - west + CELL_DEGREES, 360) <= width + CELL_DEGREES)
+        )
+
+        if len(selected) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        candidates = np.sort(np.concatenate([
+            self._order[self._offsets[cell]:self._offsets[cell + 1]] for cell in selected
+        ]))
+        latitude, longitude = self.latitude[candidates], self.longitude[candidates]
+        inside = (latitude >= south) & (latitude <= north) & (np.mod(longitude - west, 360) <= width)
+
+        return candidates[inside]
+
+
+def city_centers(df):
+    """
+    Centro de cada cidade: a mediana das coordenadas dos seus restaurantes.
+
+    Parâmetros:
+        df (pd.DataFrame): O DataFrame tratado.
+
+    Retorna:
+        pd.DataFrame: Latitude e longitude por cidade.
+    """
+    return df.groupby('city', observed=True)[['latitude', 'longitude']].median().astype('float64')
+
+
+def load_spatial_index(path=DATA_PATH):
+    # Índice do dataset atual, construído uma única vez por versão do CSV
+    return load_artifact('spatial_index', SpatialIndex, path,
+                         updater=lambda index, df, delta, start: index.extended(delta, start))
+
+
+def load_city_centers(path=DATA_PATH):
+    # Centros das cidades do dataset atual (recalculados sob demanda a cada versão)
+    return load_artifact('city_centers', city_centers, path)
@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""
+Consultas SQL locais sobre o dataset tratado.
+
+A tabela 'restaurants' expõe todas as colunas do DataFrame tratado, mais
+'row_id' (posição da linha no dataset), e é carregada uma vez por versão do
+dataset em um banco em memória: DuckDB, se instalado (consultas vetorizadas,
+em várias threads e sem bloquear as demais sessões), ou SQLite.
+
+Apenas uma consulta de leitura (SELECT, inclusive WITH ... SELECT) é
+aceita por vez, verificada pelo próprio motor (parser do DuckDB, autorizador
+do SQLite), sem acesso a arquivos do servidor e interrompida após
+ZOMATO_SQL_TIMEOUT segundos. Com
+ZOMATO_SQL_AGGREGATIONS=1, as agregações por país e por cidade das páginas
+também passam a ser calculadas por aqui (ver SQLDatabase.rollup).
+"""
+
+# Importação de bibliotecas
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.pipeline import DATA_PATH, load_artifact
+
+try:
+    import duckdb
+except ImportError:  # Dependência opcional
+    duckdb = None
+
+# Nome da tabela com o dataset tratado
+TABLE_NAME = 'restaurants'
+
+# Motor: 'duckdb', 'sqlite' ou vazio (DuckDB se instalado)
+SQL_ENGINE = os.environ.get("ZOMATO_SQL_ENGINE", "") or ('duckdb' if duckdb is not None else 'sqlite')
+
+# Agregações das páginas calculadas via SQL (0/ausente: pelo cubo de métricas)
+SQL_AGGREGATIONS = os.environ.get("ZOMATO_SQL_AGGREGATIONS", "0") != "0"
+
+# Quantidade máxima de linhas retornadas por consulta livre
+MAX_ROWS = 10_000
+
+# Tempo máximo de uma consulta, em segundos
+QUERY_TIMEOUT = float(os.environ.get("ZOMATO_SQL_TIMEOUT", "10"))
+
+# Instruções da VM do SQLite entre duas verificações do tempo limite
+_PROGRESS_STEPS = 10_000
+
+# Ações do autorizador do SQLite permitidas: leitura de tabelas e funções
+_SQLITE_READ_ACTIONS = {sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION, sqlite3.SQLITE_RECURSIVE}
+
+# Mensagem das consultas rejeitadas
+READ_ONLY_ERROR = "Apenas uma consulta de leitura (SELECT ou WITH ... SELECT) é permitida."
+
+
+# Funções
+
+
+class SQLDatabase:
+    """
+    Banco SQL em memória com a tabela do dataset tratado.
+
+    Parâmetros:
+        df (pd.DataFrame): O DataFrame tratado.
+        engine (str): 'duckdb' ou 'sqlite'.
+        timeout (float): Tempo máximo de uma consulta, em segundos.
+    """
+
+    def __init__(self, df, engine=SQL_ENGINE, timeout=QUERY_TIMEOUT):
+        if engine == 'duckdb' and duckdb is None:
+            raise ValueError("O motor 'duckdb' exige o pacote duckdb instalado.")
+        if engine not in ('duckdb', 'sqlite'):
+            raise ValueError("Motor inválido. Use 'duckdb' ou 'sqlite'.")
+
+        self.engine = engine
+        self.timeout = timeout
+        self.columns = list(df.columns) + ['row_id']
+        table = df.reset_index(drop=True).assign(row_id=np.arange(len(df)))
+
+        # Categóricas viram texto (no DuckDB, seriam ENUMs com todos os valores)
+        table = table.astype({
+            coluna: object for coluna, dtype in table.dtypes.items()
+            if isinstance(dtype, pd.CategoricalDtype)
+        })
+
+        if engine == 'duckdb':
+            # Tabela materializada: visível nos cursores (cada consulta usa o
+            # seu), com a leitura de arquivos desligada e travada
+            self.connection = duckdb.connect(database=':memory:', config={'enable_external_access': False})
+            self.connection.register('frame', table)
+            self.connection.execute(f'CREATE TABLE {TABLE_NAME} AS SELECT * FROM frame')
+            self.connection.unregister('frame')
+            self.connection.execute('SET lock_configuration = true')
+            self._schema = self.connection.execute(
+                f"SELECT column_name, data_type FROM information_schema.columns WHERE table_name = '{TABLE_NAME}'"
+            ).df()
+        else:
+            # SQLite: texto para as demais colunas não numéricas, e uma conexão
+            # compartilhada entre as sessões
+            table = table.astype({
+                coluna: object for coluna, dtype in table.dtypes.items() if dtype.kind not in 'biufO'
+            })
+            self.connection = sqlite3.connect(':memory:', check_same_thread=False)
+            table.to_sql(TABLE_NAME, self.connection, index=False)
+            self._schema = pd.read_sql(
+                f"SELECT name AS column_name, type AS data_type FROM pragma_table_info('{TABLE_NAME}')", self.connection
+            )
+
+            # Além do query_only, o autorizador nega tudo que não seja leitura
+            # (escritas dentro de WITH, ATTACH, PRAGMA...)
+            self.connection.execute('PRAGMA query_only = ON')
+            self._denied = False
+            self.connection.set_authorizer(self._authorize)
+            self._lock = threading.Lock()
+
+            # A conexão é única: o tempo limite libera o lock para as demais sessões
+            self._deadline = None
+            self.connection.set_progress_handler(
+                lambda: self._deadline is not None and time.monotonic() > self._deadline, _PROGRESS_STEPS
+            )
+
+    def _authorize(self, action, *args):
+        # Autorizador do SQLite: apenas leituras; a negação é registrada para a mensagem de erro
+        if action in _SQLITE_READ_ACTIONS:
+            return sqlite3.SQLITE_OK
+        self._denied = True
+        return sqlite3.SQLITE_DENY
+
+    def _statement(self, query):
+        # DuckDB: a consulta deve ser um único comando SELECT, segundo o parser do motor
+        statements = self.connection.extract_statements(query)
+        if len(statements) != 1 or statements[0].type != duckdb.StatementType.SELECT:
+            raise ValueError(READ_ONLY_ERROR)
+        return statements[0]
+
+    def _fetch(self, cursor, query, params, limit):
+        # Executa a consulta e lê até limit linhas (None: todas)
+        cursor.execute(query, params)
+        if cursor.description is None:  # Consulta vazia ou só com comentários
+            raise ValueError(READ_ONLY_ERROR)
+        rows = cursor.fetchall() if limit is None else cursor.fetchmany(limit)
+        columns = [description[0] for description in cursor.description]
+        return pd.DataFrame.from_records(rows, columns=columns)
+
+    def _execute(self, query, params, limit):
+        # Executa a consulta, interrompendo-a após self.timeout segundos
+        timeout_error = TimeoutError(f"A consulta excedeu o tempo limite de {self.timeout:g} s.")
+
+        if self.engine == 'duckdb':
+            query = self._statement(query)
+            cursor = self.connection.cursor()
+            timer = threading.Timer(self.timeout, cursor.interrupt)
+            timer.start()
+            try:
+                return self._fetch(cursor, query, params, limit)
+            except duckdb.InterruptException:
+                raise timeout_error from None
+            finally:
+                timer.cancel()
+                cursor.close()
+
+        with self._lock:
+            self._deadline = time.monotonic() + self.timeout
+            self._denied = False
+            cursor = self.connection.cursor()
+            try:
+                return self._fetch(cursor, query, params, limit)
+            except sqlite3.DatabaseError:
+                if self._denied:
+                    raise ValueError(READ_ONLY_ERROR) from None
+                if time.monotonic() > self._deadline:
+                    raise timeout_error from None
+                raise
+            finally:
+                self._deadline = None
+                cursor.close()
+
+    def query(self, query, params=(), limit=None):
+        """
+        Executa uma consulta de leitura; outros comandos levantam ValueError.
+
+        Parâmetros:
+            query (str): Consulta SQL (SELECT ou WITH ... SELECT).
+            params (sequence): Valores dos parâmetros '?' da consulta.
+            limit (int): Quantidade máxima de linhas lidas (None lê todas).
+
+        Retorna:
+            pd.DataFrame: O resultado da consulta.
+        """
+        return self._execute(query, params, limit)
+
+    def schema(self):
+        # Colunas da tabela e seus tipos no motor (lidos na carga)
+        return self._schema.copy()
+
+    def rollup(self, by, **filters):
+        """
+        Agrega os restaurantes por uma dimensão via SQL, como o rollup do cubo de métricas.
+
+        As médias usam as mesmas somas inteiras do cubo (avaliação em décimos,
+        custo em centavos de dólar), então os resultados são idênticos aos dele.
+
+        Parâmetros:
+            by (str): Dimensão de agrupamento (ex.: 'country_name', 'city').
+            **filters: Dimensão -> valores aceitos (ex.: city=['Rio de Janeiro']).
+
+        Retorna:
+            pd.DataFrame: Por grupo (ordenado): quantidade de restaurantes e de
+            cidades, soma de votos, médias de avaliação e de custo (local e em
+            dólares) e a 'rating_color' da primeira linha do grupo.
+        """
+        for coluna in [by, *filters]:
+            if coluna not in self.columns:
+                raise ValueError(f"Coluna inválida: {coluna}")
+
+        conditions, params = [], []
+        for coluna, valores in filters.items():
+            valores = [str(valor) for valor in valores]
+            if not valores:
+                conditions.append('FALSE')
+                continue
+            conditions.append(f"{coluna} IN ({', '.join('?' * len(valores))})")
+            params.extend(valores)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+        query = f"""
+            WITH filtered AS (
+                SELECT * FROM {TABLE_NAME} {where}
+            ),
+            first_rows AS (
+                SELECT {by}, MIN(row_id) AS first_row FROM filtered GROUP BY {by}
+            )
+            SELECT
+                filtered.{by} AS {by},
+                COUNT(*) AS count,
+                COUNT(DISTINCT filtered.restaurant_id) AS restaurant_count,
+                COUNT(DISTINCT filtered.city) AS city_count,
+                SUM(filtered.votes) AS votes_sum,
+                (SUM(CAST(ROUND(filtered.aggregate_rating * 10) AS BIGINT)) / 10.0)
+                    / COUNT(filtered.aggregate_rating) AS average_rating,
+                CAST(SUM(filtered.average_cost_for_two) AS DOUBLE)
+                    / COUNT(filtered.average_cost_for_two) AS average_cost_for_two,
+                (SUM(CAST(ROUND(filtered.average_cost_for_two_usd * 100) AS BIGINT)) / 100.0)
+                    / COUNT(filtered.average_cost_for_two_usd) AS average_cost_for_two_usd,
+                MIN(CASE WHEN filtered.row_id = first_rows.first_row THEN filtered.rating_color END) AS rating_color
+            FROM filtered JOIN first_rows ON filtered.{by} = first_rows.{by}
+            GROUP BY filtered.{by}
+            ORDER BY filtered.{by}
+        """
+
+        return self.query(query, params).set_index(by)
+
+
+def load_database(path=DATA_PATH):
+    # Banco do dataset atual, carregado uma única vez por versão do CSV
+    return load_artifact('sql_database', SQLDatabase, path)
+
+
+def run_query(query, path=DATA_PATH, limit=MAX_ROWS):
+    """
+    Executa uma consulta livre sobre a tabela 'restaurants'.
+
+    Parâmetros:
+        query (str): Consulta SQL de leitura.
+        path (str): Caminho do CSV de origem.
+        limit (int): Quantidade máxima de linhas retornadas.
+
+    Retorna:
+        tuple: (resultado, True se o resultado foi truncado em limit linhas).
+    """
+    result = load_database(path).query(query, limit=limit + 1)
+    return result.head(limit), len(result) > limit
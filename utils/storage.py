@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+"""
+Cache colunar (Arrow/Feather) do dataset tratado.
+
+O DataFrame limpo é gravado sem compressão, o que permite abri-lo via
+memory-map na inicialização dos workers. A assinatura do CSV de origem fica
+registrada nos metadados do arquivo e invalida o cache quando o CSV muda.
+
+O arquivo é gravado em um único bloco (record batch): no modo compartilhado
+(read_cache(shared=True)) as colunas do DataFrame apontam diretamente para
+as páginas do arquivo mapeado, que o sistema operacional compartilha entre
+todos os processos que o abrem, em vez de cada worker manter sua cópia.
+"""
+
+# Importação de bibliotecas
+import hashlib
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.ipc as ipc
+
+from utils.currency import RATES_VERSION
+
+# Diretório padrão dos artefatos gerados (relativo à raiz do projeto)
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache")
+
+# Incrementar sempre que a limpeza mudar o formato do DataFrame tratado; a
+# versão da tabela de câmbio faz parte dela (novas cotações refazem o cache)
+CACHE_VERSION = f"5+{RATES_VERSION}"
+
+# Bytes finais do conteúdo já processado, usados para reconhecer um CSV que só cresceu
+TAIL_BYTES = 1 << 16
+
+# Chave dos metadados com a assinatura da origem
+_METADATA_KEY = b"zomato_source"
+
+
+# Funções
+def source_metadata(csv_path, rows=None):
+    """
+    Calcula a assinatura do CSV de origem.
+
+    Parâmetros:
+        csv_path (str): Caminho do CSV.
+        rows (int): Quantidade de linhas de dados do CSV, se conhecida.
+
+    Retorna:
+        dict: Versão do cache, tamanho, mtime, sha256 do arquivo e dos seus
+        últimos TAIL_BYTES bytes, e a quantidade de linhas.
+    """
+    stat = os.stat(csv_path)
+    return {
+        "version": CACHE_VERSION,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": file_sha256(csv_path),
+        "tail_sha256": tail_sha256(csv_path, stat.st_size),
+        "rows": rows,
+    }
+
+
+def file_sha256(path, block_size=1 << 20):
+    # Hash do conteúdo, lido em blocos para não carregar o arquivo inteiro
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def tail_sha256(path, size, length=TAIL_BYTES):
+    # Hash dos últimos length bytes dos primeiros size bytes do arquivo
+    with open(path, "rb") as file:
+        file.seek(max(size - length, 0))
+        return hashlib.sha256(file.read(min(size, length))).hexdigest()
+
+
+def appended_offset(csv_path, source):
+    """
+    Verifica se o CSV apenas recebeu linhas novas desde a assinatura source.
+
+    O conteúdo já processado é reconhecido pelo tamanho e pelo hash dos seus
+    últimos bytes, que devem terminar em uma quebra de linha.
+
+    Parâmetros:
+        csv_path (str): Caminho do CSV de origem.
+        source (dict): Assinatura gravada (ver source_metadata).
+
+    Retorna:
+        int | None: Posição (em bytes) do início das linhas novas, ou None se
+        o CSV não é uma extensão do conteúdo já processado.
+    """
+    if not source or source.get("version") != CACHE_VERSION or source.get("rows") is None:
+        return None
+
+    size = source["size"]
+    if os.stat(csv_path).st_size <= size or tail_sha256(csv_path, size) != source.get("tail_sha256"):
+        return None
+
+    with open(csv_path, "rb") as file:
+        file.seek(size - 1)
+        if file.read(1) != b"\n":
+            return None
+
+    return size
+
+
+def cache_path_for(csv_path, cache_dir=CACHE_DIR):
+    # Caminho do arquivo colunar correspondente ao CSV; o hash do caminho
+    # absoluto separa CSVs de mesmo nome em diretórios diferentes
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    digest = hashlib.sha256(os.path.abspath(csv_path).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(cache_dir, f"{name}-{digest}.feather")
+
+
+def read_cache_metadata(cache_path):
+    """
+    Lê apenas os metadados de origem gravados no arquivo colunar.
+
+    Parâmetros:
+        cache_path (str): Caminho do arquivo Feather.
+
+    Retorna:
+        dict | None: Metadados gravados, ou None se ausentes/ilegíveis.
+    """
+    try:
+        with pa.memory_map(cache_path) as source:
+            schema = ipc.open_file(source).schema
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+    raw = (schema.metadata or {}).get(_METADATA_KEY)
+    return json.loads(raw) if raw else None
+
+
+def is_cache_valid(csv_path, cache_path):
+    """
+    Verifica se o arquivo colunar corresponde ao CSV atual.
+
+    Tamanho e mtime iguais bastam; se apenas o mtime mudou (ex.: novo
+    checkout no deploy), o sha256 do conteúdo decide.
+
+    Parâmetros:
+        csv_path (str): Caminho do CSV de origem.
+        cache_path (str): Caminho do arquivo Feather.
+
+    Retorna:
+        bool: True se o cache pode ser reutilizado.
+    """
+    cached = read_cache_metadata(cache_path)
+    if cached is None or cached.get("version") != CACHE_VERSION:
+        return False
+
+    stat = os.stat(csv_path)
+    if cached.get("size") != stat.st_size:
+        return False
+    if cached.get("mtime_ns") == stat.st_mtime_ns:
+        return True
+
+    return cached.get("sha256") == file_sha256(csv_path)
+
+
+def write_cache(df, csv_path, cache_path=None, source=None):
+    """
+    Grava o DataFrame tratado no formato colunar, de forma atômica.
+
+    Parâmetros:
+        df (pd.DataFrame): O DataFrame tratado.
+        csv_path (str): Caminho do CSV de origem (para a assinatura).
+        cache_path (str): Destino do arquivo; padrão em CACHE_DIR.
+        source (dict): Assinatura já calculada do CSV (padrão: source_metadata(csv_path)).
+
+    Retorna:
+        str: Caminho do arquivo gravado.
+    """
+    cache_path = cache_path or cache_path_for(csv_path)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    metadata = dict(table.schema.metadata or {})
+    metadata[_METADATA_KEY] = json.dumps(source or source_metadata(csv_path)).encode("utf-8")
+    table = table.replace_schema_metadata(metadata)
+
+    # Grava em arquivo temporário e troca, para nunca expor um cache parcial
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    feather.write_feather(table, tmp_path, compression="uncompressed", chunksize=max(len(table), 1))
+    os.replace(tmp_path, cache_path)
+
+    return cache_path
+
+
+def _shared_frame(table):
+    # DataFrame cujas colunas referenciam os buffers do arquivo mapeado
+    dictionaries = [
+        field.name for field in table.schema
+        if pa.types.is_dictionary(field.type)
+        and table.column(field.name).num_chunks == 1 and table.column(field.name).null_count == 0
+    ]
+    df = table.drop_columns(dictionaries).to_pandas(split_blocks=True)
+    columns = [name for name in table.column_names if name in df.columns or name in dictionaries]
+
+    # Categóricas: os códigos são os índices do dicionário, sem conversão
+    for coluna in dictionaries:
+        chunk = table.column(coluna).chunk(0)
+        dtype = pd.CategoricalDtype(pd.Index(chunk.dictionary.to_pandas()), ordered=chunk.type.ordered)
+        codes = chunk.indices.to_numpy(zero_copy_only=True)
+        df[coluna] = pd.Series(pd.Categorical.from_codes(codes, dtype=dtype), index=df.index, copy=False)
+
+    return df[columns]
+
+
+def read_cache(cache_path, shared=False):
+    """
+    Abre o arquivo colunar via memory-map e o converte em DataFrame.
+
+    Com shared=True, as colunas numéricas, de texto e os códigos das
+    categóricas ficam apontando para o arquivo mapeado (somente leitura),
+    sem cópia; apenas os índices e dicionários pequenos são materializados.
+    Caches gravados em vários blocos (ChunkedCacheWriter) são copiados.
+
+    Parâmetros:
+        cache_path (str): Caminho do arquivo Feather.
+        shared (bool): Se True, referencia o arquivo mapeado em vez de copiá-lo.
+
+    Retorna:
+        pd.DataFrame: O DataFrame tratado, com os dtypes preservados.
+    """
+    with pa.memory_map(cache_path) as source:
+        table = ipc.open_file(source).read_all()
+    return _shared_frame(table) if shared else table.to_pandas()
+
+
+class ChunkedCacheWriter:
+    """
+    Grava o cache colunar incrementalmente, um bloco (chunk) por vez.
+
+    As colunas categóricas recebem dicionários que só crescem de um bloco
+    para o outro, gravados como deltas no arquivo Arrow; assim nenhum bloco
+    precisa conhecer as categorias dos seguintes e a memória fica limitada
+    ao bloco atual mais os dicionários. O arquivo só substitui o cache
+    anterior em close().
+
+    Parâmetros:
+        csv_path (str): Caminho do CSV de origem (para a assinatura).
+        cache_path (str): Destino do arquivo; padrão em CACHE_DIR.
+    """
+
+    def __init__(self, csv_path, cache_path=None):
+        self.csv_path = csv_path
+        self.cache_path = cache_path or cache_path_for(csv_path)
+        self.rows = 0
+        self._tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        self._categories = {}
+        self._schema = None
+        self._sink = None
+        self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _encode_categories(self, df):
+        # Recodifica as categóricas contra dicionários que apenas crescem
+        df = df.copy(deep=False)
+        for coluna in df.columns[[isinstance(dtype, pd.CategoricalDtype) for dtype in df.dtypes]]:
+            known = self._categories.get(coluna, pd.Index([], dtype=df[coluna].cat.categories.dtype))
+            values = df[coluna].astype(df[coluna].cat.categories.dtype)
+            new = pd.Index(values[~values.isin(known)].dropna().unique())
+            categories = known.append(new)
+            self._categories[coluna] = categories
+            df[coluna] = pd.Categorical.from_codes(categories.get_indexer(values), categories)
+        return df
+
+    def write(self, df):
+        """
+        Acrescenta um bloco do DataFrame tratado ao arquivo.
+
+        Parâmetros:
+            df (pd.DataFrame): Bloco já limpo, com o mesmo esquema dos anteriores.
+        """
+        table = pa.Table.from_pandas(self._encode_categories(df), preserve_index=True)
+
+        if self._writer is None:
+            # O esquema do primeiro bloco vale para todos; índices de dicionário em int32
+            fields = [
+                pa.field(field.name, pa.dictionary(pa.int32(), field.type.value_type))
+                if pa.types.is_dictionary(field.type) else field
+                for field in table.schema
+            ]
+            metadata = dict(table.schema.metadata or {})
+            metadata[_METADATA_KEY] = json.dumps(source_metadata(self.csv_path)).encode("utf-8")
+            self._schema = pa.schema(fields, metadata=metadata)
+
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            self._sink = pa.OSFile(self._tmp_path, "wb")
+            options = ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+            self._writer = ipc.new_file(self._sink, self._schema, options=options)
+
+        self._writer.write_table(table.cast(self._schema))
+        self.rows += len(df)
+
+    def close(self):
+        # Finaliza o arquivo e o publica no lugar do cache anterior
+        if self._writer is None:
+            raise ValueError("Nenhum bloco foi gravado no cache.")
+        self._writer.close()
+        self._sink.close()
+        os.replace(self._tmp_path, self.cache_path)
+        return self.cache_path
+
+    def abort(self):
+        # Descarta o arquivo parcial
+        if self._writer is not None:
+            self._sink.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)